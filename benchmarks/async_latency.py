@@ -0,0 +1,80 @@
+"""Measure how long formatting a large query blocks an asyncio event loop.
+
+A query with a large basic graph pattern is formatted while a ticker task sleeps for a
+millisecond at a time and records how late it wakes up. The worst delay is the latency
+added to unrelated requests on the same loop. The query is formatted inline, on a thread
+pool and on a process pool.
+
+Usage: python benchmarks/async_latency.py [--triples N]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sparql import AsyncFormatter, format_string, format_string_async  # noqa: E402
+
+
+async def inline(query: str) -> str:
+    return format_string(query)
+
+
+async def worst_delay(format_query) -> tuple[float, float]:
+    done = False
+    delay = 0.0
+
+    async def ticker():
+        nonlocal delay
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            delay = max(delay, time.perf_counter() - start - 0.001)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await format_query()
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, delay
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triples", type=int, default=5000)
+    args = parser.parse_args()
+
+    query = "select * where {\n%s}" % "".join(
+        f"  ?s{i} <http://example.org/p> ?o{i} .\n" for i in range(args.triples)
+    )
+    # Build the parser and warm up the lexer before timing.
+    format_string(query)
+
+    with ThreadPoolExecutor(1) as threads, ProcessPoolExecutor(1) as processes:
+        thread_formatter = AsyncFormatter(threads)
+        process_formatter = AsyncFormatter(processes)
+        # Start the worker process and build its parser.
+        asyncio.run(format_string_async(query, process_formatter))
+
+        print(f"triples:                {args.triples:8d}")
+        for label, format_query in (
+            ("inline", lambda: inline(query)),
+            ("thread pool", lambda: format_string_async(query, thread_formatter)),
+            ("process pool", lambda: format_string_async(query, process_formatter)),
+        ):
+            elapsed, delay = asyncio.run(worst_delay(format_query))
+            print(
+                f"{label + ':':<24}{elapsed * 1000:8.1f} ms  "
+                f"worst loop delay {delay * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
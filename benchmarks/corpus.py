@@ -0,0 +1,226 @@
+"""Measure parse, serialize and format_string over the test corpus and large inputs.
+
+Every positive query and update request in tests/data and a fixed set of generated large
+inputs are parsed with sparql.parse, serialized with sparql.serialize and formatted with
+sparql.format_string. Each input is timed over --runs runs and its best time is kept.
+The report gives the throughput and latency percentiles of each phase, and with
+--per-file, the times of each input. With --json PATH, the results are also written as
+JSON. With --baseline PATH, the times are compared with those of the inputs in a saved
+JSON file, and the script exits with status 1 if a phase is more than --threshold
+percent slower.
+
+Usage: python benchmarks/corpus.py [--runs N] [--per-file] [--skip-generated]
+                                   [--json PATH] [--baseline PATH] [--threshold PERCENT]
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+import lark  # noqa: E402
+from lark.exceptions import LarkError  # noqa: E402
+
+import sparql  # noqa: E402
+
+PHASES = ("parse", "serialize", "format")
+
+
+def generated_inputs() -> dict[str, str]:
+    triples = " .\n".join(
+        f'  <http://example.org/s{i}> <http://example.org/p{i % 10}> "object {i}"@en'
+        for i in range(5000)
+    )
+    rows = "\n".join(f'  (<http://example.org/s{i}> "label {i}")' for i in range(10000))
+    return {
+        "generated/bgp-5000.rq": f"SELECT * WHERE {{\n{triples}\n}}",
+        "generated/insert-data-10000.ru": "INSERT DATA {\n"
+        + " .\n".join(
+            f"  <http://example.org/s{i}> <http://example.org/p{i % 10}> {i}"
+            for i in range(10000)
+        )
+        + "\n}",
+        "generated/values-10000.rq": "SELECT * WHERE { ?s ?p ?label }\n"
+        f"VALUES (?s ?label) {{\n{rows}\n}}",
+        "generated/nested-groups-500.rq": "SELECT * "
+        + "{ " * 500
+        + "?s ?p ?o"
+        + " }" * 500,
+        "generated/filter-1000.rq": "SELECT * WHERE {\n  ?s ?p ?o\n  FILTER("
+        + " || ".join(f"?o = {i}" for i in range(1000))
+        + ")\n}",
+        "generated/updates-2000.ru": " ;\n".join(
+            f"DELETE {{ ?s <http://example.org/p{i}> ?o }} WHERE {{ ?s ?p ?o }}"
+            for i in range(2000)
+        ),
+    }
+
+
+def load_inputs(skip_generated: bool) -> dict[str, str]:
+    data_dir = project_dir / "tests/data"
+    inputs = {
+        file_path.relative_to(data_dir).as_posix(): file_path.read_text(
+            encoding="utf-8"
+        )
+        for file_path in sorted(data_dir.glob("**/*.r[qu]"))
+        if "negative" not in file_path.parts
+    }
+    if not skip_generated:
+        inputs.update(generated_inputs())
+    return inputs
+
+
+def elapsed(function, argument) -> float:
+    start = time.perf_counter()
+    function(argument)
+    return time.perf_counter() - start
+
+
+def time_inputs(inputs: dict[str, str], runs: int) -> dict[str, dict[str, float]]:
+    # The first pass builds the parser and the lexers of its states, and skips the
+    # inputs that do not parse.
+    trees = {}
+    for name, text in inputs.items():
+        try:
+            trees[name] = sparql.parse(text)
+            sparql.format_string(text)
+        except LarkError:
+            continue
+
+    times = {name: dict.fromkeys(PHASES, math.inf) for name in trees}
+    for _ in range(runs):
+        for name, tree in trees.items():
+            text = inputs[name]
+            file_times = times[name]
+            for phase, function, argument in (
+                ("parse", sparql.parse, text),
+                ("serialize", sparql.serialize, tree),
+                ("format", sparql.format_string, text),
+            ):
+                file_times[phase] = min(file_times[phase], elapsed(function, argument))
+    return times
+
+
+def percentile(values: list[float], percent: float) -> float:
+    # The nearest-rank percentile of the sorted values.
+    rank = math.ceil(percent / 100 * len(values))
+    return values[max(rank - 1, 0)]
+
+
+def summarize(
+    inputs: dict[str, str], times: dict[str, dict[str, float]]
+) -> dict[str, dict[str, float]]:
+    size = sum(len(inputs[name].encode("utf-8")) for name in times)
+    phases = {}
+    for phase in PHASES:
+        phase_times = sorted(file_times[phase] for file_times in times.values())
+        total = sum(phase_times)
+        phases[phase] = {
+            "queries": len(phase_times),
+            "bytes": size,
+            "total_s": total,
+            "bytes_per_s": size / total,
+            "queries_per_s": len(phase_times) / total,
+            "p50_ms": percentile(phase_times, 50) * 1000,
+            "p90_ms": percentile(phase_times, 90) * 1000,
+            "p99_ms": percentile(phase_times, 99) * 1000,
+            "max_ms": phase_times[-1] * 1000,
+        }
+    return phases
+
+
+def compare(
+    files: dict[str, dict[str, float]],
+    baseline_files: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    # Only the inputs of both runs are compared, so the totals are of the same work.
+    names = files.keys() & baseline_files.keys()
+    if not names:
+        print("\nbaseline:       no common inputs")
+        return []
+
+    print(f"\nbaseline:       {len(names):8d} inputs in common")
+    regressions = []
+    for phase in PHASES:
+        key = f"{phase}_ms"
+        total = sum(files[name][key] for name in names)
+        baseline_total = sum(baseline_files[name][key] for name in names)
+        change = (total / baseline_total - 1) * 100
+        print(f"{phase + ':':<16}{change:+8.1f} %")
+        if change > threshold:
+            regressions.append(phase)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--per-file", action="store_true")
+    parser.add_argument("--skip-generated", action="store_true")
+    parser.add_argument("--json", type=Path, default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=10.0)
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.skip_generated)
+    times = time_inputs(inputs, args.runs)
+    phases = summarize(inputs, times)
+    files = {
+        name: {
+            "bytes": len(inputs[name].encode("utf-8")),
+            **{f"{phase}_ms": file_times[phase] * 1000 for phase in PHASES},
+        }
+        for name, file_times in times.items()
+    }
+
+    if args.per_file:
+        print(f"{'input':<72}{'parse':>10}{'serialize':>10}{'format':>10}  ms")
+        for name, file_result in files.items():
+            print(
+                f"{name:<72}{file_result['parse_ms']:10.3f}"
+                f"{file_result['serialize_ms']:10.3f}{file_result['format_ms']:10.3f}"
+            )
+        print()
+
+    print(f"inputs:         {len(times):8d} of {len(inputs)}")
+    print(f"size:           {phases['parse']['bytes'] / 2**10:8.1f} KiB")
+    for phase, result in phases.items():
+        print(
+            f"{phase + ':':<16}{result['total_s'] * 1000:8.1f} ms  "
+            f"{result['bytes_per_s'] / 2**20:6.2f} MiB/s  "
+            f"{result['queries_per_s']:8.0f} queries/s  "
+            f"p50 {result['p50_ms']:7.3f}  p90 {result['p90_ms']:7.3f}  "
+            f"p99 {result['p99_ms']:7.3f}  max {result['max_ms']:8.3f} ms"
+        )
+
+    if args.json is not None:
+        report = {
+            "python": platform.python_version(),
+            "lark": lark.__version__,
+            "platform": platform.platform(),
+            "runs": args.runs,
+            "phases": phases,
+            "files": files,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(files, baseline["files"], args.threshold)
+        if regressions:
+            print(
+                f"\nSlower than the baseline by more than {args.threshold:g} %: "
+                + ", ".join(regressions)
+            )
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure the throughput of sparql.format_many with different numbers of workers.
+
+Every query and update request in tests/data is repeated to make a batch, which is
+formatted once for each number of workers. The speedup is relative to a single worker,
+which formats in the current process.
+
+Usage: python benchmarks/format_many.py [--repeat N] [--workers N ...] [--chunksize N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sparql import format_many  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+    )
+    parser.add_argument("--chunksize", type=int, default=64)
+    args = parser.parse_args()
+
+    data_dir = project_dir / "tests/data"
+    corpus = [
+        file_path.read_text(encoding="utf-8")
+        for file_path in sorted(data_dir.glob("**/*.r[qu]"))
+    ]
+    texts = corpus * args.repeat
+
+    # The first pass over the corpus builds the parser and warms up the lexer. Forked
+    # workers inherit this state, so do it before timing the single worker too.
+    for _ in format_many(corpus, workers=1):
+        pass
+
+    print(f"queries:        {len(texts):8d}")
+    print(f"cpus:           {os.cpu_count():8d}")
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        for _ in format_many(texts, workers=workers, chunksize=args.chunksize):
+            pass
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = elapsed
+        print(
+            f"workers {workers:<7d}{elapsed:8.2f} s  "
+            f"{len(texts) / elapsed:8.0f} queries/s  {baseline / elapsed:5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
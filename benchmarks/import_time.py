@@ -0,0 +1,53 @@
+"""Measure the time it takes to import the sparql package.
+
+A cold start has no parser cache and analyses the grammar. A warm start loads the
+parse tables from the cache written by a previous run.
+
+Usage: python benchmarks/import_time.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+
+
+def time_import(cache_dir: str) -> float:
+    env = {**os.environ, "XDG_CACHE_HOME": cache_dir, "PYTHONPATH": str(project_dir)}
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import sparql"], env=env, check=True)
+    return time.perf_counter() - start
+
+
+def time_import_python() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = time_import_python()
+    cold = []
+    warm = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold.append(time_import(cache_dir))
+            warm.append(time_import(cache_dir))
+
+    print(f"python startup: {baseline * 1000:8.1f} ms")
+    print(f"cold import:    {statistics.median(cold) * 1000:8.1f} ms (median)")
+    print(f"warm import:    {statistics.median(warm) * 1000:8.1f} ms (median)")
+
+
+if __name__ == "__main__":
+    main()
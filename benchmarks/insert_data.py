@@ -0,0 +1,66 @@
+"""Measure the time it takes to format a large INSERT DATA request, with and without parsing.
+
+The request is an INSERT DATA operation of N triples in a named graph, each with a
+language-tagged literal and a number as objects. The fast path, sparql.format_data,
+formats it without building a parse tree. The full path parses it and serializes the
+tree, and is run once since it is much slower.
+
+Usage: python benchmarks/insert_data.py [--triples N] [--runs N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sparql.data import format_data  # noqa: E402
+from sparql.parser import parse  # noqa: E402
+from sparql.serializer import serialize  # noqa: E402
+
+
+def insert_data_request(triples: int) -> str:
+    patterns = "\n".join(
+        f'    <http://example.org/s{i}> <http://example.org/p{i % 10}> "object {i}"@en, {i} .'
+        for i in range(triples)
+    )
+    return f"INSERT DATA {{\n  GRAPH <http://example.org/g> {{\n{patterns}\n  }}\n}}"
+
+
+def format_full(query: str) -> str:
+    return serialize(parse(query))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triples", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    query = insert_data_request(args.triples)
+    # Build the parser and warm up the lexer before timing.
+    format_full(insert_data_request(10))
+
+    times = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        result = format_data(query)
+        times.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    full_result = format_full(query)
+    full_time = time.perf_counter() - start
+    assert result == full_result
+
+    fast_time = statistics.median(times)
+    print(f"triples:        {args.triples:8d}")
+    print(f"fast path:      {fast_time * 1000:8.1f} ms (median)")
+    print(f"full path:      {full_time * 1000:8.1f} ms")
+    print(f"speedup:        {full_time / fast_time:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
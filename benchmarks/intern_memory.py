@@ -0,0 +1,74 @@
+"""Measure the memory of the parse trees of update requests, with and without interning.
+
+Every positive update request in tests/data is parsed and all the trees are kept, like
+in a cache of parsed requests. The tree memory is what remains allocated after parsing,
+as reported by tracemalloc. With interning, equal variable, prefixed name and IRI tokens
+share one string, which matters most for typed trees, see sparql.ast.
+
+Usage: python benchmarks/intern_memory.py [--pattern GLOB]
+"""
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from lark.exceptions import LarkError  # noqa: E402
+
+from sparql.ast import from_tree  # noqa: E402
+from sparql.parser import InternPool, create_parser  # noqa: E402
+
+
+def load_texts(pattern: str) -> list[str]:
+    texts = []
+    data_dir = project_dir / "tests/data"
+    for file_path in sorted(data_dir.glob(pattern)):
+        if "negative" not in file_path.parts:
+            texts.append(file_path.read_text(encoding="utf-8"))
+    return texts
+
+
+def tree_memory(texts: list[str], intern: bool, typed: bool) -> int:
+    pool = InternPool() if intern else None
+    parser = create_parser("update_unit", intern_pool=pool)
+    parsed_texts = []
+    for text in texts:
+        # Parse each text once beforehand, the lexer allocates on first use.
+        try:
+            parser.parse(text)
+        except LarkError:
+            continue
+        parsed_texts.append(text)
+    if pool is not None:
+        pool.clear()
+
+    tracemalloc.start()
+    trees = []
+    for text in parsed_texts:
+        tree = parser.parse(text)
+        trees.append(from_tree(tree) if typed else tree)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pattern", default="**/*.ru")
+    args = parser.parse_args()
+
+    texts = load_texts(args.pattern)
+    print(f"requests:               {len(texts):8d}")
+    for typed in (False, True):
+        label = "typed trees" if typed else "trees"
+        plain = tree_memory(texts, intern=False, typed=typed)
+        interned = tree_memory(texts, intern=True, typed=typed)
+        print(f"{label + ':':<24}{plain / 2**20:8.2f} MiB")
+        print(f"{label + ', interned:':<24}{interned / 2**20:8.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Measure the parse time and peak memory of a query with a large basic graph pattern.
+
+The query is a SELECT query whose WHERE clause is a single basic graph pattern of N
+triples. The peak memory is the largest amount allocated by Python while parsing,
+including the tree, and the tree memory is what remains allocated after parsing, as
+reported by tracemalloc. With --typed, the tree is converted with sparql.ast.from_tree.
+
+Usage: python benchmarks/parse_bgp.py [--triples N] [--backend lalr|earley] [--runs N]
+                                      [--typed]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sparql.ast import from_tree  # noqa: E402
+from sparql.parser import create_parser  # noqa: E402
+
+
+def bgp_query(triples: int) -> str:
+    patterns = "\n".join(
+        f"    ?s{i} <http://example.org/p{i % 10}> ?o{i} ." for i in range(triples)
+    )
+    return f"SELECT * WHERE {{\n{patterns}\n}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triples", type=int, default=10000)
+    parser.add_argument("--backend", choices=["lalr", "earley"], default="lalr")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--typed", action="store_true")
+    args = parser.parse_args()
+
+    sparql_parser = create_parser("query_unit", backend=args.backend)
+    query = bgp_query(args.triples)
+
+    times = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        sparql_parser.parse(query)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    tree = sparql_parser.parse(query)
+    if args.typed:
+        tree = from_tree(tree)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    depth = 0
+    stack = [(sparql_parser.parse(query), 1)]
+    while stack:
+        node, level = stack.pop()
+        depth = max(depth, level)
+        stack.extend((child, level + 1) for child in getattr(node, "children", []))
+
+    print(f"triples:        {args.triples:8d}")
+    print(f"tree depth:     {depth:8d}")
+    print(f"parse:          {statistics.median(times) * 1000:8.1f} ms (median)")
+    print(f"peak memory:    {peak / 2**20:8.1f} MiB")
+    print(f"tree memory:    {size / 2**20:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
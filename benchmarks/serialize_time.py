@@ -0,0 +1,98 @@
+"""Measure the time it takes to serialize the parse trees of the test corpus.
+
+Every positive query and update request in tests/data is parsed once, and then the
+whole set of trees is serialized on each run. With --compact, the trees are compact
+expression trees. With --largest N, only the N largest files are serialized. With
+--repeat N, each update request is repeated N times in a single request, which makes
+payloads like those of bulk INSERT DATA requests. The time per node is the serialize
+time divided by the number of trees and tokens in the parse trees.
+
+Usage: python benchmarks/serialize_time.py [--runs N] [--compact] [--largest N]
+                                           [--repeat N]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from lark import Tree  # noqa: E402
+from lark.exceptions import LarkError  # noqa: E402
+
+from sparql.parser import parse  # noqa: E402
+from sparql.serializer import serialize  # noqa: E402
+
+
+def load_trees(
+    compact: bool = False, largest: int | None = None, repeat: int = 1
+) -> list[Tree]:
+    data_dir = project_dir / "tests/data"
+    file_paths = [
+        file_path
+        for file_path in sorted(data_dir.glob("**/*.r[qu]"))
+        if "negative" not in file_path.parts
+    ]
+    if largest is not None:
+        file_paths.sort(key=lambda file_path: file_path.stat().st_size, reverse=True)
+        file_paths = file_paths[:largest]
+
+    trees = []
+    for file_path in file_paths:
+        text = file_path.read_text(encoding="utf-8")
+        if file_path.suffix == ".ru":
+            text = " ;\n".join([text] * repeat)
+        try:
+            trees.append(parse(text, compact=compact))
+        except LarkError:
+            pass
+    return trees
+
+
+def count_nodes(trees: list[Tree]) -> int:
+    nodes = 0
+    for tree in trees:
+        for subtree in tree.iter_subtrees():
+            nodes += 1 + sum(
+                1 for child in subtree.children if not isinstance(child, Tree)
+            )
+    return nodes
+
+
+def time_serialize(trees: list[Tree]) -> tuple[float, int]:
+    size = 0
+    start = time.perf_counter()
+    for tree in trees:
+        size += len(serialize(tree))
+    return time.perf_counter() - start, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--largest", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    trees = load_trees(args.compact, args.largest, args.repeat)
+    times = []
+    for _ in range(args.runs):
+        elapsed, size = time_serialize(trees)
+        times.append(elapsed)
+
+    nodes = count_nodes(trees)
+    print(f"trees:          {len(trees):8d}")
+    print(f"nodes:          {nodes:8d}")
+    print(f"output:         {size / 2**10:8.1f} KiB")
+    print(f"serialize:      {statistics.median(times) * 1000:8.1f} ms (median)")
+    print(f"serialize:      {min(times) * 1000:8.1f} ms (best)")
+    print(f"per node:       {min(times) * 10**9 / nodes:8.1f} ns (best)")
+    print(f"throughput:     {size / 2**20 / min(times):8.2f} MiB/s")
+
+
+if __name__ == "__main__":
+    main()
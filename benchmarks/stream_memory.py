@@ -0,0 +1,80 @@
+"""Measure the peak memory of serializing a large update request, with and without a stream.
+
+The request is an INSERT DATA operation of N triples. It is parsed once, and the peak
+memory is the largest amount allocated by Python while serializing the tree, as reported
+by tracemalloc. The time is measured on a separate run, without tracemalloc. Without a
+stream, the output is built in memory and read from the result. With a stream, the
+output is written to the null device in chunks of the buffer size.
+
+Usage: python benchmarks/stream_memory.py [--triples N] [--buffer-size N]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from lark import Tree  # noqa: E402
+
+from sparql.parser import parse  # noqa: E402
+from sparql.serializer import SparqlSerializer  # noqa: E402
+
+
+def insert_data_request(triples: int) -> str:
+    patterns = "\n".join(
+        f'    <http://example.org/s{i}> <http://example.org/p{i % 10}> "object {i}" .'
+        for i in range(triples)
+    )
+    return f"INSERT DATA {{\n{patterns}\n}}"
+
+
+def serialize(tree: Tree, buffer_size: int | None):
+    if buffer_size is None:
+        sparql_serializer = SparqlSerializer()
+        sparql_serializer.serialize(tree)
+        sparql_serializer.result
+    else:
+        with open(os.devnull, "w", encoding="utf-8") as stream:
+            sparql_serializer = SparqlSerializer(stream, buffer_size)
+            sparql_serializer.serialize(tree)
+
+
+def measure(tree: Tree, buffer_size: int | None) -> tuple[float, int]:
+    # Time a run without tracemalloc, which slows down allocations.
+    start = time.perf_counter()
+    serialize(tree, buffer_size)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    serialize(tree, buffer_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--triples", type=int, default=50000)
+    parser.add_argument("--buffer-size", type=int, default=65536)
+    args = parser.parse_args()
+
+    tree = parse(insert_data_request(args.triples))
+    # Serialize once beforehand, so that one-off allocations are not counted.
+    serialize(tree, None)
+
+    print(f"triples:        {args.triples:8d}")
+    for label, buffer_size in (("string", None), ("stream", args.buffer_size)):
+        elapsed, peak = measure(tree, buffer_size)
+        print(
+            f"{label + ':':<16}{elapsed * 1000:8.1f} ms  "
+            f"peak memory {peak / 2**20:8.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
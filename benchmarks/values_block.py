@@ -0,0 +1,77 @@
+"""Measure the time it takes to format a query with a large VALUES block, by row count.
+
+The query joins a basic graph pattern with a VALUES block of N rows, each an IRI and a
+language-tagged literal, or only an IRI with --one-var. The fast path,
+sparql.parse_with_values, reads the rows with a scanner and parses the rest of the
+query. The full path parses the whole query, and is run once per row count since it is
+much slower. Use --skip-full to time the fast path only.
+
+Usage: python benchmarks/values_block.py [--rows N,N,...] [--one-var] [--runs N] [--skip-full]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+project_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(project_dir))
+
+from sparql.parser import parse  # noqa: E402
+from sparql.serializer import serialize  # noqa: E402
+from sparql.values import parse_with_values  # noqa: E402
+
+
+def values_query(rows: int, one_var: bool) -> str:
+    if one_var:
+        values = "\n".join(f"    <http://example.org/s{i}>" for i in range(rows))
+        return f"SELECT * WHERE {{\n  ?s ?p ?o .\n  VALUES ?s {{\n{values}\n  }}\n}}"
+
+    values = "\n".join(
+        f'  (<http://example.org/s{i}> "label {i}"@en)' for i in range(rows)
+    )
+    return f"SELECT * WHERE {{\n  ?s ?p ?label .\n}}\nVALUES (?s ?label) {{\n{values}\n}}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="1000,10000,100000")
+    parser.add_argument("--one-var", action="store_true")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-full", action="store_true")
+    args = parser.parse_args()
+
+    # Build the parser and warm up the lexer before timing.
+    query = values_query(10, args.one_var)
+    serialize(parse(query))
+    serialize(parse_with_values(query))
+
+    print(f"{'rows':>10}  {'fast path':>12}  {'full path':>12}  {'speedup':>8}")
+    for rows in map(int, args.rows.split(",")):
+        query = values_query(rows, args.one_var)
+
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = serialize(parse_with_values(query))
+            times.append(time.perf_counter() - start)
+        fast_time = statistics.median(times)
+
+        if args.skip_full:
+            print(f"{rows:10d}  {fast_time * 1000:9.1f} ms")
+            continue
+
+        start = time.perf_counter()
+        full_result = serialize(parse(query))
+        full_time = time.perf_counter() - start
+        assert result == full_result
+
+        print(
+            f"{rows:10d}  {fast_time * 1000:9.1f} ms  {full_time * 1000:9.1f} ms"
+            f"  {full_time / fast_time:7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
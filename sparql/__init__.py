@@ -1,12 +1,35 @@
 import re
-from typing import Literal
-
-from sparql.parser import sparql_parser, sparql_update_parser
-from sparql.serializer import SparqlSerializer
+from typing import Iterator, Literal, TextIO
+
+from sparql.aio import (
+    AsyncFormatter,
+    format_string_async,
+    format_string_explicit_async,
+)
+from sparql.batch import FormatResult, format_many
+from sparql.cache import CacheInfo, DiskCache, FormatCache
+from sparql.data import format_data, write_data
+from sparql.form import QueryForm, detect_form
+from sparql.formatting import _format_query
+from sparql.instrumentation import PhaseTime, Profile, instrument, timed
+from sparql.parser import get_parser, parse
+from sparql.serializer import SparqlSerializer, serialize
+from sparql.updates import iter_updates
+from sparql.values import parse_with_values
 
 ParserType = Literal["sparql", "sparql_update"]
 
 
+def __getattr__(name: str):
+    # Keep sparql.sparql_parser and sparql.sparql_update_parser importable without
+    # building the parsers when the package is imported.
+    if name == "sparql_parser":
+        return get_parser("query_unit")
+    elif name == "sparql_update_parser":
+        return get_parser("update_unit")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 def _contains(pattern: str, text: str) -> bool:
     return True if re.search(pattern, text, re.IGNORECASE) is not None else False
 
@@ -14,29 +37,15 @@ def _contains(pattern: str, text: str) -> bool:
 def format_string(query: str) -> str:
     """Parse the input string and return a formatted version of it.
 
-    It first attempts to parse the query as a SPARQL 1.1 query before
-    trying to parse it as a SPARQL 1.1 Update query.
+    The input is parsed once with the unified parser, which accepts both a SPARQL 1.1
+    query and a SPARQL 1.1 Update request. Requests of INSERT DATA and DELETE DATA
+    operations over ground triples are formatted without parsing, see format_data, and
+    the rows of VALUES data blocks are read without the parser, see parse_with_values.
 
     :param query: Input query string.
     :return: Formatted query.
     """
-    try:
-        _parser = sparql_parser
-        tree = _parser.parse(query)
-
-        sparql_serializer = SparqlSerializer()
-        sparql_serializer.visit_topdown(tree)
-
-        return sparql_serializer.result
-    except:
-        _parser = sparql_update_parser
-        tree = _parser.parse(query)
-
-        sparql_serializer = SparqlSerializer()
-        sparql_serializer.visit_topdown(tree)
-
-        return sparql_serializer.result
-
+    return _format_query(query)[0]
 
 
 def format_string_explicit(query: str, parser_type: ParserType = "sparql") -> str:
@@ -49,17 +58,25 @@ def format_string_explicit(query: str, parser_type: ParserType = "sparql") -> st
     :return: Formatted query.
     """
     if parser_type == "sparql":
-        _parser = sparql_parser
+        start = "query_unit"
     elif parser_type == "sparql_update":
-        _parser = sparql_update_parser
+        start = "update_unit"
     else:
         raise ValueError(
             f"Unexpected parser type: {parser_type}. Must be one of {ParserType}"
         )
 
-    tree = _parser.parse(query)
+    return _format_query(query, start)[0]
+
 
-    sparql_serializer = SparqlSerializer()
-    sparql_serializer.visit_topdown(tree)
+def format_updates(text_or_stream: str | TextIO) -> Iterator[str]:
+    """Parse a SPARQL 1.1 Update request and return a formatted version of each operation.
 
-    return sparql_serializer.result
+    Each operation is formatted as soon as it has been read, see sparql.iter_updates.
+    Joining the results with "; " gives the same string as format_string.
+
+    :param text_or_stream: The request as a string, or a text stream to read it from.
+    :return: An iterator of formatted operations.
+    """
+    for tree in iter_updates(text_or_stream):
+        yield serialize(tree)
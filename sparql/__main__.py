@@ -0,0 +1,5 @@
+import sys
+
+from sparql.cli import main
+
+sys.exit(main())
@@ -0,0 +1,169 @@
+import asyncio
+import os
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from threading import Lock
+from weakref import WeakKeyDictionary
+
+from lark.exceptions import LarkError
+
+import sparql
+
+_PARSER_TYPES = ("sparql", "sparql_update")
+
+
+def _format(query: str, parser_type: str | None, picklable_errors: bool) -> str:
+    try:
+        if parser_type is None:
+            return sparql.format_string(query)
+        return sparql.format_string_explicit(query, parser_type)
+    except LarkError as error:
+        if picklable_errors:
+            # Lark's exceptions cannot be pickled, so they cannot leave a worker process.
+            raise ValueError(str(error)) from None
+        raise
+
+
+def _release(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore):
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # The event loop is closed.
+        pass
+
+
+class AsyncFormatter:
+    """Format queries on an executor, without blocking the event loop.
+
+    The executor is a thread or process pool. By default, a thread pool with
+    max_concurrency threads is created on first use. A process pool keeps large queries
+    from holding the GIL of the event loop's process.
+
+    At most max_concurrency queries of an event loop are formatted at a time, by default
+    the number of CPUs, and at most max_pending more wait for their turn. Further calls
+    raise asyncio.QueueFull, so that an overloaded service can reject requests instead of
+    queueing them without bound.
+
+    Cancelling a call cancels its job if the executor has not started it. A job that has
+    started runs to completion and counts toward the limit until then.
+    """
+
+    def __init__(
+        self,
+        executor: Executor | None = None,
+        max_concurrency: int | None = None,
+        max_pending: int = 1024,
+    ):
+        if max_concurrency is None:
+            max_concurrency = os.cpu_count() or 1
+        if max_concurrency < 1:
+            raise ValueError(
+                f"Unexpected max_concurrency: {max_concurrency}. Must be at least 1"
+            )
+        if max_pending < 0:
+            raise ValueError(
+                f"Unexpected max_pending: {max_pending}. Must not be negative"
+            )
+
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self._pending = 0
+        self._semaphores: WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = WeakKeyDictionary()
+        self._lock = Lock()
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="sparql"
+                )
+            return self.executor
+
+    async def format_string(self, query: str) -> str:
+        """Format a query or update request like sparql.format_string."""
+        return await self._submit(query, None)
+
+    async def format_string_explicit(
+        self, query: str, parser_type: str = "sparql"
+    ) -> str:
+        """Format a query or update request like sparql.format_string_explicit."""
+        if parser_type not in _PARSER_TYPES:
+            raise ValueError(
+                f"Unexpected parser type: {parser_type}. Must be one of {_PARSER_TYPES}"
+            )
+        return await self._submit(query, parser_type)
+
+    async def _submit(self, query: str, parser_type: str | None) -> str:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+
+        if semaphore.locked():
+            if self._pending >= self.max_pending:
+                raise asyncio.QueueFull(
+                    f"Unexpected number of pending queries: more than {self.max_pending}"
+                )
+            self._pending += 1
+            try:
+                await semaphore.acquire()
+            finally:
+                self._pending -= 1
+        else:
+            await semaphore.acquire()
+
+        executor = self._get_executor()
+        try:
+            future: Future = executor.submit(
+                _format,
+                query,
+                parser_type,
+                isinstance(executor, ProcessPoolExecutor),
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+
+        # Release when the job is done rather than when the caller stops waiting, so a
+        # cancelled call that is still running counts toward the limit.
+        future.add_done_callback(lambda _: _release(loop, semaphore))
+        return await asyncio.wrap_future(future)
+
+
+_default_formatter = AsyncFormatter()
+
+
+async def format_string_async(
+    query: str, formatter: AsyncFormatter | None = None
+) -> str:
+    """Parse the input string and return a formatted version of it, like format_string.
+
+    The query is formatted on the formatter's executor, so the event loop keeps running.
+
+    :param query: Input query string.
+    :param formatter: The formatter to use, by default one shared by the module with a
+        thread pool.
+    :return: Formatted query.
+    """
+    if formatter is None:
+        formatter = _default_formatter
+    return await formatter.format_string(query)
+
+
+async def format_string_explicit_async(
+    query: str, parser_type: str = "sparql", formatter: AsyncFormatter | None = None
+) -> str:
+    """Parse the input string and return a formatted version of it, like
+    format_string_explicit.
+
+    :param query: Input query string.
+    :param parser_type: The parser type, either "sparql" or "sparql_update".
+    :param formatter: The formatter to use, by default one shared by the module with a
+        thread pool.
+    :return: Formatted query.
+    """
+    if formatter is None:
+        formatter = _default_formatter
+    return await formatter.format_string_explicit(query, parser_type)
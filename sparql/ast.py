@@ -0,0 +1,275 @@
+from lark import Token, Tree
+
+# The typed nodes replace the subtrees that make up most of a parse tree: the terms, the
+# triples with a single predicate and object, and the SELECT query. A variable is a single
+# Var instead of a Tree and a Token, and a triple such as "?s <p> ?o" is a single
+# TriplePattern instead of 25 nodes. The other rules are kept as lark trees.
+
+
+class Node:
+    """Base class of the typed nodes. The data attribute names the rule a node replaces."""
+
+    __slots__ = ()
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.__slots__
+        )
+
+    def __repr__(self) -> str:
+        fields = ", ".join(repr(getattr(self, name)) for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Var(Node):
+    """A variable. The name is as written, with its ? or $ sign."""
+
+    __slots__ = ("name",)
+    data = "var"
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class IRI(Node):
+    """An IRI as written: an IRI reference in angle brackets, a prefixed name, or "a"."""
+
+    __slots__ = ("value",)
+    data = "iri"
+
+    def __init__(self, value: str):
+        self.value = value
+
+
+class Literal(Node):
+    """An RDF, numeric or boolean literal.
+
+    The value is the lexical form as written, with the quotes of a string. The data
+    attribute is one of rdf_literal, numeric_literal or boolean_literal.
+    """
+
+    __slots__ = ("value", "language", "datatype", "data")
+
+    def __init__(
+        self,
+        value: str,
+        language: str | None = None,
+        datatype: IRI | None = None,
+        data: str = "rdf_literal",
+    ):
+        self.value = value
+        self.language = language
+        self.datatype = datatype
+        self.data = data
+
+
+class BlankNode(Node):
+    """A blank node label, such as _:b1, or an anonymous blank node []."""
+
+    __slots__ = ("label",)
+    data = "blank_node"
+
+    def __init__(self, label: str):
+        self.label = label
+
+
+class TriplePattern(Node):
+    """A triple with a single predicate and object.
+
+    The data attribute is triples_same_subject_path in a basic graph pattern, and
+    triples_same_subject in a template.
+    """
+
+    __slots__ = ("subject", "predicate", "object", "data")
+
+    def __init__(
+        self,
+        subject: Var | IRI | Literal | BlankNode,
+        predicate: Var | IRI,
+        object: Var | IRI | Literal | BlankNode,
+        data: str = "triples_same_subject_path",
+    ):
+        self.subject = subject
+        self.predicate = predicate
+        self.object = object
+        self.data = data
+
+
+class SelectQuery(Node):
+    """A SELECT query, without its prologue and VALUES clause."""
+
+    __slots__ = (
+        "select_clause",
+        "dataset_clauses",
+        "where_clause",
+        "solution_modifier",
+    )
+    data = "select_query"
+
+    def __init__(
+        self,
+        select_clause: Tree,
+        dataset_clauses: tuple[Tree, ...],
+        where_clause: Tree,
+        solution_modifier: Tree,
+    ):
+        self.select_clause = select_clause
+        self.dataset_clauses = dataset_clauses
+        self.where_clause = where_clause
+        self.solution_modifier = solution_modifier
+
+
+class DataBlockValues(Node):
+    """The values of a VALUES data block, as written, between its braces.
+
+    It replaces the data_block_value children of an inline_data_one_var, where rows is a
+    tuple of values, and the data_block_value_group children of an inline_data_full,
+    where rows is a tuple of rows, each a tuple of values. A value is an IRI, a literal
+    with its language tag or datatype, or UNDEF.
+    """
+
+    __slots__ = ("rows",)
+    data = "data_block_values"
+
+    def __init__(self, rows: tuple[str, ...] | tuple[tuple[str, ...], ...]):
+        self.rows = rows
+
+
+_PATH_PREDICATE = (
+    "verb_path",
+    "path",
+    "path_alternative",
+    "path_sequence",
+    "path_elt_or_inverse",
+    "path_elt",
+    "path_primary",
+)
+_PATH_OBJECT = ("object_list_path", "object_path", "graph_node_path")
+_OBJECT = ("object_list", "object", "graph_node")
+
+
+def _descend(tree: Tree | Token, rules: tuple[str, ...]) -> Tree | Token | None:
+    # Follow a chain of single-child rules, or return None if the tree has another shape.
+    for rule in rules:
+        if not isinstance(tree, Tree) or tree.data != rule or len(tree.children) != 1:
+            return None
+        tree = tree.children[0]
+    return tree
+
+
+def _term(tree: Tree) -> Var | IRI | Literal | BlankNode | None:
+    if tree.data == "var":
+        return Var(tree.children[0].value)
+    elif tree.data == "iri":
+        value = tree.children[0]
+        if isinstance(value, Tree):
+            value = value.children[0]
+        return IRI(value.value)
+    elif tree.data == "rdf_literal":
+        literal = Literal(tree.children[0].children[0].value)
+        if len(tree.children) > 1:
+            langtag_or_datatype = tree.children[1]
+            if langtag_or_datatype.data == "langtag":
+                literal.language = langtag_or_datatype.children[0].value[1:]
+            else:
+                literal.datatype = _term(langtag_or_datatype.children[0])
+        return literal
+    elif tree.data == "numeric_literal" or tree.data == "boolean_literal":
+        return Literal(tree.children[0].children[0].value, data=tree.data)
+    elif tree.data == "blank_node":
+        return BlankNode(tree.children[0].value)
+    return None
+
+
+def _var_or_term(var_or_term: Tree | Token | None):
+    value = _descend(var_or_term, ("var_or_term",))
+    if isinstance(value, Tree) and value.data == "graph_term":
+        value = value.children[0]
+    if isinstance(value, Tree):
+        return _term(value)
+    # NIL, or not a single term.
+    return None
+
+
+def _triple_pattern(tree: Tree) -> TriplePattern | None:
+    subject = _var_or_term(tree.children[0])
+    property_list = tree.children[1]
+    if subject is None or len(property_list.children) not in (1, 2):
+        return None
+
+    if tree.data == "triples_same_subject_path":
+        if len(property_list.children) != 2:
+            return None
+        verb, object_list = property_list.children
+        if verb.data == "verb_simple":
+            predicate = verb.children[0]
+        else:
+            predicate = _descend(verb, _PATH_PREDICATE)
+        obj = _var_or_term(_descend(object_list, _PATH_OBJECT))
+    else:
+        verb_object_list = _descend(property_list, ("property_list_not_empty",))
+        if (
+            not isinstance(verb_object_list, Tree)
+            or len(verb_object_list.children) != 2
+        ):
+            return None
+        verb, object_list = verb_object_list.children
+        predicate = _descend(verb, ("verb",))
+        if isinstance(predicate, Tree):
+            predicate = _descend(predicate, ("var_or_iri",))
+        obj = _var_or_term(_descend(object_list, _OBJECT))
+
+    if isinstance(predicate, Token):
+        predicate = IRI(predicate.value)
+    elif isinstance(predicate, Tree) and predicate.data in ("var", "iri"):
+        predicate = _term(predicate)
+    else:
+        return None
+
+    if obj is None:
+        return None
+    return TriplePattern(subject, predicate, obj, tree.data)
+
+
+def _typed_node(tree: Tree) -> Node | None:
+    if tree.data == "triples_same_subject_path" or tree.data == "triples_same_subject":
+        return _triple_pattern(tree)
+    elif tree.data == "select_query":
+        children = tree.children
+        return SelectQuery(
+            children[0],
+            tuple(child for child in children if child.data == "dataset_clause"),
+            children[-2],
+            children[-1],
+        )
+    return _term(tree)
+
+
+def from_tree(tree: Tree) -> Tree:
+    """Replace the subtrees of a parse tree that have a typed node class.
+
+    The tree is modified in place. The typed nodes hold less memory than the lark trees
+    they replace, but are not visited by the lark tree methods, such as iter_subtrees.
+    SparqlSerializer produces the same output from the typed tree.
+
+    :param tree: A parse tree.
+    :return: The tree with typed nodes.
+    """
+    stack = [tree]
+    while stack:
+        children = stack.pop().children
+        for i, child in enumerate(children):
+            if not isinstance(child, Tree):
+                continue
+            node = _typed_node(child)
+            if node is None:
+                stack.append(child)
+                continue
+
+            children[i] = node
+            if isinstance(node, SelectQuery):
+                stack.append(node.select_clause)
+                stack.extend(node.dataset_clauses)
+                stack.append(node.where_clause)
+                stack.append(node.solution_modifier)
+    return tree
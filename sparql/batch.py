@@ -0,0 +1,62 @@
+import os
+from multiprocessing import Pool
+from typing import Iterable, Iterator, NamedTuple
+
+from sparql.formatting import _format_query
+from sparql.parser import get_unified_parser
+
+
+class FormatResult(NamedTuple):
+    """The formatted query, or the message of the error that prevented formatting it."""
+
+    result: str | None
+    error: str | None
+
+
+def _init_worker():
+    # Build the parser once per worker process, before the first query arrives.
+    get_unified_parser()
+
+
+def _format(query: str) -> FormatResult:
+    # Lark's exceptions cannot be pickled, so errors are returned as their message.
+    try:
+        result = _format_query(query)[0]
+    except Exception as error:
+        return FormatResult(None, str(error))
+
+    return FormatResult(result, None)
+
+
+def format_many(
+    queries: Iterable[str], workers: int | None = None, chunksize: int = 64
+) -> Iterator[FormatResult]:
+    """Format many queries or update requests in parallel, like format_string.
+
+    The queries are sent to a pool of worker processes in chunks, and the results are
+    returned in the order of the input. A query that fails to parse or serialize gives a
+    result with an error message instead of stopping the batch.
+
+    :param queries: The input query strings.
+    :param workers: The number of worker processes, by default the number of CPUs. With a
+        single worker, the queries are formatted in the current process.
+    :param chunksize: The number of queries sent to a worker at a time.
+    :return: An iterator of results, one per query.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"Unexpected number of workers: {workers}. Must be at least 1")
+    if chunksize < 1:
+        raise ValueError(f"Unexpected chunksize: {chunksize}. Must be at least 1")
+
+    if workers == 1:
+        return map(_format, queries)
+    return _format_in_pool(queries, workers, chunksize)
+
+
+def _format_in_pool(
+    queries: Iterable[str], workers: int, chunksize: int
+) -> Iterator[FormatResult]:
+    with Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap(_format, queries, chunksize)
@@ -0,0 +1,221 @@
+import hashlib
+import os
+from collections import OrderedDict, namedtuple
+from importlib import metadata
+from pathlib import Path
+from threading import Lock
+
+from lark import Tree
+
+from sparql import compact, data, parser, serializer, values
+from sparql.formatting import _format_query
+from sparql.parser import default_cache_dir, grammar
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+_start_rules = {
+    None: "unit",
+    "sparql": "query_unit",
+    "sparql_update": "update_unit",
+}
+
+
+class FormatCache:
+    """A bounded, thread-safe LRU cache of formatted queries.
+
+    Entries are keyed by the exact input string and the parser type. Inputs that fail to
+    parse are not cached, so the error is raised again on the next call.
+
+    Parse trees are only kept when store_trees is True. The trees returned by get_tree are
+    shared between callers and must not be modified.
+    """
+
+    def __init__(self, maxsize: int = 1024, store_trees: bool = False):
+        if maxsize < 1:
+            raise ValueError(f"Unexpected maxsize: {maxsize}. Must be at least 1")
+
+        self._maxsize = maxsize
+        self._store_trees = store_trees
+        self._entries: OrderedDict[tuple[str | None, str], tuple[str, Tree | None]] = (
+            OrderedDict()
+        )
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def info(self) -> CacheInfo:
+        with self._lock:
+            return CacheInfo(
+                self._hits, self._misses, self._maxsize, len(self._entries)
+            )
+
+    def clear(self):
+        """Remove all entries and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def format_string(self, query: str) -> str:
+        """Cached version of sparql.format_string.
+
+        :param query: Input query string.
+        :return: Formatted query.
+        """
+        return self._get(query, None)[0]
+
+    def format_string_explicit(self, query: str, parser_type: str = "sparql") -> str:
+        """Cached version of sparql.format_string_explicit.
+
+        :param query: Input query string.
+        :param parser_type: The parser type, either "sparql" or "sparql_update".
+        :return: Formatted query.
+        """
+        return self._get(query, parser_type)[0]
+
+    def get_tree(self, query: str, parser_type: str | None = None) -> Tree:
+        """Return the cached parse tree of the input string.
+
+        :param query: Input query string.
+        :param parser_type: None for the unified parser, otherwise "sparql" or "sparql_update".
+        :return: The parse tree. It must not be modified.
+        """
+        if not self._store_trees:
+            raise ValueError("The cache was created with store_trees=False")
+
+        return self._get(query, parser_type)[1]
+
+    def _get(self, query: str, parser_type: str | None) -> tuple[str, Tree | None]:
+        if parser_type not in _start_rules:
+            raise ValueError(
+                f"Unexpected parser type: {parser_type}. Must be one of {list(_start_rules)}"
+            )
+
+        key = (parser_type, query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry
+            self._misses += 1
+
+        result, tree = _format_query(
+            query, _start_rules[parser_type], keep_tree=self._store_trees
+        )
+        entry = (result, tree if self._store_trees else None)
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+        return entry
+
+
+def _formatter_key() -> str:
+    try:
+        version = metadata.version("sparql")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+
+    # The modules that build the trees and write the output are hashed with the grammar, so
+    # that an edit to any of them in a development checkout invalidates the cache like a
+    # new release does.
+    digest = hashlib.sha256(grammar.encode("utf-8"))
+    for module in (serializer, data, values, parser, compact):
+        digest.update(Path(module.__file__).read_bytes())
+    return f"{version}-{digest.hexdigest()[:16]}"
+
+
+class DiskCache:
+    """A persistent, size-bounded record of the texts that are already formatted.
+
+    Each entry is an empty file named by the SHA-256 hash of a formatted text, in a
+    subdirectory of directory keyed by the package version and a hash of the grammar and
+    the serializer. By default, directory is sparql in $XDG_CACHE_HOME or ~/.cache.
+    Looking up a text costs a hash and a single system call, so an unchanged file does not
+    need to be parsed again.
+
+    Entries are created and removed atomically by the file system, so any number of
+    processes can share a cache without locking. An entry's modification time is updated
+    on every hit, and evict removes the least recently used entries beyond maxsize.
+    """
+
+    def __init__(self, directory: str | Path | None = None, maxsize: int = 65536):
+        if maxsize < 1:
+            raise ValueError(f"Unexpected maxsize: {maxsize}. Must be at least 1")
+
+        if directory is None:
+            directory = default_cache_dir()
+        self.directory = Path(directory) / _formatter_key()
+        self.maxsize = maxsize
+
+    def _entry_path(self, text: str) -> Path:
+        return self.directory / hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def is_formatted(self, text: str) -> bool:
+        """Return whether the text was recorded as formatted.
+
+        :param text: A query or update request.
+        :return: True if formatting the text returns it unchanged.
+        """
+        try:
+            os.utime(self._entry_path(text))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def add(self, text: str):
+        """Record that the text is formatted, that is, formatting it returns it unchanged.
+
+        :param text: A formatted query or update request.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._entry_path(text).touch()
+
+    def evict(self):
+        """Remove the least recently used entries, until at most maxsize are left."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+
+        if len(entries) <= self.maxsize:
+            return
+
+        def last_used(entry: os.DirEntry) -> float:
+            try:
+                return entry.stat().st_mtime
+            except FileNotFoundError:
+                return 0.0
+
+        entries.sort(key=last_used)
+        for entry in entries[: len(entries) - self.maxsize]:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                # Removed by another process.
+                pass
+
+    def clear(self):
+        """Remove all entries."""
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return
+
+        for entry in entries:
+            try:
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,211 @@
+import argparse
+import difflib
+import glob
+import os
+import sys
+from pathlib import Path
+from typing import Iterator, Sequence
+
+from sparql.batch import FormatResult, format_many
+from sparql.cache import DiskCache
+
+SUFFIXES = (".rq", ".ru", ".sparql")
+
+
+def _expand_paths(patterns: Sequence[str]) -> Iterator[Path]:
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            for suffix in SUFFIXES:
+                yield from sorted(path.rglob(f"*{suffix}"))
+        elif path.exists():
+            yield path
+        elif glob.has_magic(pattern):
+            for match in sorted(glob.glob(pattern, recursive=True)):
+                if Path(match).is_file():
+                    yield Path(match)
+        else:
+            raise FileNotFoundError(
+                f"Unexpected path: {pattern}. No such file or directory"
+            )
+
+
+def _collect_paths(patterns: Sequence[str]) -> list[Path]:
+    # A file given twice, directly and through a directory, is formatted once.
+    paths = {}
+    for path in _expand_paths(patterns):
+        paths.setdefault(path.resolve(), path)
+    return list(paths.values())
+
+
+def _read_texts(paths: Sequence[Path]) -> Iterator[str]:
+    for path in paths:
+        yield path.read_text(encoding="utf-8")
+
+
+def _file_text(result: str) -> str:
+    # Formatted files end with a single newline.
+    return result.rstrip("\n") + "\n"
+
+
+def _format_texts(
+    texts: Sequence[str], jobs: int | None, cache: DiskCache | None
+) -> Iterator[FormatResult]:
+    if cache is None:
+        is_formatted = [False] * len(texts)
+    else:
+        is_formatted = [cache.is_formatted(text) for text in texts]
+    uncached = [text for text, formatted in zip(texts, is_formatted) if not formatted]
+
+    # No more workers than files, a single file is formatted in this process.
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(uncached)))
+    results = format_many(uncached, workers=workers)
+    for text, formatted in zip(texts, is_formatted):
+        if formatted:
+            yield FormatResult(text, None)
+            continue
+
+        result = next(results)
+        if (
+            cache is not None
+            and result.error is None
+            and _file_text(result.result) == text
+        ):
+            cache.add(text)
+        yield result
+
+
+def _diff(path: Path, text: str, formatted: str) -> str:
+    return "".join(
+        difflib.unified_diff(
+            text.splitlines(keepends=True),
+            formatted.splitlines(keepends=True),
+            fromfile=str(path),
+            tofile=str(path),
+        )
+    )
+
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="sparql",
+        description="Format SPARQL 1.1 queries and update requests.",
+    )
+    parser.add_argument(
+        "paths",
+        nargs="+",
+        help=(
+            "Files, directories or glob patterns to format. Directories are searched "
+            f"for {', '.join(SUFFIXES)} files. Use - to read from standard input."
+        ),
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--check",
+        action="store_true",
+        help="Do not write the files, exit with status 1 if any would be reformatted.",
+    )
+    mode.add_argument(
+        "--in-place",
+        "-i",
+        action="store_true",
+        help="Write the formatted files in place instead of to standard output.",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="Write a diff of the changes instead of the formatted files.",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="The number of worker processes, by default the number of CPUs.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help=(
+            "The directory of the cache of files that are already formatted, by default "
+            "sparql in $XDG_CACHE_HOME or ~/.cache."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Format every file, without reading or writing the cache.",
+    )
+    return parser
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the sparql command, which formats query and update files.
+
+    Files whose content is recorded as formatted in the on-disk cache, see
+    sparql.DiskCache, are not parsed again.
+
+    The exit status is 0 on success and 1 if a file failed to parse, or with --check or
+    --diff, if a file would be reformatted. Usage errors exit with status 2.
+
+    :param argv: The command-line arguments, by default sys.argv[1:].
+    :return: The exit status.
+    """
+    parser = create_argument_parser()
+    args = parser.parse_args(argv)
+
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f"Unexpected number of jobs: {args.jobs}. Must be at least 1")
+
+    if args.paths == ["-"]:
+        if args.in_place:
+            parser.error("Unexpected --in-place with standard input")
+        paths = [Path("-")]
+        texts = [sys.stdin.read()]
+    elif "-" in args.paths:
+        parser.error("Unexpected -, standard input must be the only path")
+    else:
+        try:
+            paths = _collect_paths(args.paths)
+        except FileNotFoundError as error:
+            parser.error(str(error))
+        texts = list(_read_texts(paths))
+
+    cache = None if args.no_cache else DiskCache(args.cache_dir)
+
+    errors = 0
+    changed = 0
+    for path, text, (result, error) in zip(
+        paths, texts, _format_texts(texts, args.jobs, cache)
+    ):
+        if error is not None:
+            errors += 1
+            print(f"error: cannot format {path}: {error}", file=sys.stderr)
+            continue
+
+        formatted = _file_text(result)
+        if formatted != text:
+            changed += 1
+
+        if args.diff:
+            sys.stdout.write(_diff(path, text, formatted))
+        if args.check:
+            if formatted != text:
+                print(f"would reformat {path}", file=sys.stderr)
+        elif args.in_place:
+            if formatted != text:
+                path.write_text(formatted, encoding="utf-8")
+                print(f"reformatted {path}", file=sys.stderr)
+        elif not args.diff:
+            sys.stdout.write(formatted)
+
+    if cache is not None:
+        cache.evict()
+
+    if errors or ((args.check or args.diff) and changed):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
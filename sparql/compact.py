@@ -0,0 +1,104 @@
+from lark import Tree
+
+# Every expression descends through the whole chain of precedence levels, even when it has
+# no operator, so a variable in a FILTER is ten nodes deep. A compact tree keeps the
+# expression node and the nodes that hold an operator. The precedence of an operator is
+# the level of the rule of its node, which is enough to rebuild the full tree.
+EXPRESSION_PRECEDENCE = {
+    "conditional_or_expression": 1,
+    "conditional_and_expression": 2,
+    "value_logical": 3,
+    "relational_expression": 4,
+    "numeric_expression": 5,
+    "additive_expression": 6,
+    "multiplicative_expression": 7,
+    "unary_expression": 8,
+    "primary_expression": 9,
+}
+
+# The values of a primary_expression, which end an expression chain.
+PRIMARY_EXPRESSION_VALUES = frozenset(
+    (
+        "bracketted_expression",
+        "built_in_call",
+        "iri_or_function",
+        "rdf_literal",
+        "numeric_literal",
+        "boolean_literal",
+        "var",
+    )
+)
+
+_PRIMARY_LEVEL = len(EXPRESSION_PRECEDENCE) + 1
+_RULES = {level: rule for rule, level in EXPRESSION_PRECEDENCE.items()}
+
+
+def _is_pass_through(node) -> bool:
+    return (
+        isinstance(node, Tree)
+        and node.data in EXPRESSION_PRECEDENCE
+        and len(node.children) == 1
+        and isinstance(node.children[0], Tree)
+    )
+
+
+def compact_expressions(tree: Tree) -> Tree:
+    """Drop the single-child nodes of the expression chain from a tree.
+
+    The tree is modified in place. Compacting a compact tree does not change it.
+
+    :param tree: A parse tree.
+    :return: The compact tree.
+    """
+    while _is_pass_through(tree):
+        tree = tree.children[0]
+
+    stack = [tree]
+    while stack:
+        children = stack.pop().children
+        for i, child in enumerate(children):
+            if isinstance(child, Tree):
+                while _is_pass_through(child):
+                    child = child.children[0]
+                children[i] = child
+                stack.append(child)
+    return tree
+
+
+def expand_expressions(tree: Tree) -> Tree:
+    """Rebuild the full expression chain of a compact tree.
+
+    The tree is modified in place, and is then equal to the tree returned by the parser.
+    Expanding a full tree does not change it.
+
+    :param tree: A compact parse tree.
+    :return: The full tree.
+    """
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node.data == "expression":
+            level = 0
+        else:
+            level = EXPRESSION_PRECEDENCE.get(node.data)
+
+        children = node.children
+        for i, child in enumerate(children):
+            if not isinstance(child, Tree):
+                continue
+            stack.append(child)
+            if level is None:
+                continue
+
+            if child.data in EXPRESSION_PRECEDENCE:
+                child_level = EXPRESSION_PRECEDENCE[child.data]
+            elif child.data in PRIMARY_EXPRESSION_VALUES:
+                child_level = _PRIMARY_LEVEL
+            else:
+                # The expression_list operand of IN and NOT IN.
+                continue
+
+            for missing_level in range(child_level - 1, level, -1):
+                child = Tree(_RULES[missing_level], [child])
+            children[i] = child
+    return tree
@@ -0,0 +1,74 @@
+import re
+from typing import Literal
+
+QueryForm = Literal["SELECT", "CONSTRUCT", "ASK", "DESCRIBE", "UPDATE"]
+
+_QUERY_FORMS = {"SELECT", "CONSTRUCT", "ASK", "DESCRIBE"}
+
+_UPDATE_OPERATIONS = {
+    "LOAD",
+    "CLEAR",
+    "DROP",
+    "ADD",
+    "MOVE",
+    "COPY",
+    "CREATE",
+    "INSERT",
+    "DELETE",
+    "WITH",
+}
+
+_WHITESPACE_OR_COMMENTS = re.compile(r"(?:\s+|#[^\n]*)*")
+_KEYWORD = re.compile(r"[A-Za-z]+")
+_PNAME_NS = re.compile(r"[^\s:<]*:")
+_IRIREF = re.compile(r"<[^<>\"{}|^`\\\x00-\x20]*>")
+
+
+def detect_form(query: str) -> QueryForm:
+    """Return the form of a SPARQL query or update without parsing it.
+
+    The prologue and comments are skipped, and the first significant keyword decides the
+    form. An input that only contains a prologue is an empty SPARQL Update request.
+
+    The input is not validated. A string that is classified here may still fail to parse.
+
+    :param query: Input query string.
+    :return: One of "SELECT", "CONSTRUCT", "ASK", "DESCRIBE" or "UPDATE".
+    :raises ValueError: If the first keyword is neither a query form nor an update operation.
+    """
+    position = _WHITESPACE_OR_COMMENTS.match(query).end()
+
+    while position < len(query):
+        keyword_match = _KEYWORD.match(query, position)
+        if keyword_match is None:
+            raise ValueError(
+                f"Unexpected character at position {position}: {query[position]!r}"
+            )
+
+        keyword = keyword_match.group().upper()
+        position = keyword_match.end()
+
+        if keyword in _QUERY_FORMS:
+            return keyword
+        elif keyword in _UPDATE_OPERATIONS:
+            return "UPDATE"
+        elif keyword == "BASE":
+            position = _skip(_IRIREF, query, position)
+        elif keyword == "PREFIX":
+            position = _skip(_PNAME_NS, query, position)
+            position = _skip(_IRIREF, query, position)
+        else:
+            raise ValueError(f"Unexpected keyword: {keyword_match.group()}")
+
+        position = _WHITESPACE_OR_COMMENTS.match(query, position).end()
+
+    return "UPDATE"
+
+
+def _skip(pattern: re.Pattern, query: str, position: int) -> int:
+    position = _WHITESPACE_OR_COMMENTS.match(query, position).end()
+    match = pattern.match(query, position)
+    if match is None:
+        raise ValueError(f"Unexpected prologue at position {position}")
+
+    return match.end()
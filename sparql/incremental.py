@@ -0,0 +1,228 @@
+from copy import copy
+from typing import NamedTuple
+
+from lark import Token, Tree
+from lark.exceptions import UnexpectedInput
+from lark.lexer import BasicLexer, LexerThread
+from lark.utils import TextSlice
+
+from sparql.parser import START_RULES, SparqlParser, create_parser
+
+INCREMENTAL_RULES = ["group_graph_pattern", "triples_block"]
+
+
+class TextEdit(NamedTuple):
+    """A replacement of removed characters at offset with the inserted text."""
+
+    offset: int
+    removed: int
+    inserted: str
+
+    def apply(self, text: str) -> str:
+        """Return the text after the edit.
+
+        :param text: The text before the edit.
+        :return: The text after the edit.
+        """
+        return text[: self.offset] + self.inserted + text[self.offset + self.removed :]
+
+
+_incremental_parser: SparqlParser | None = None
+_boundary_lexer: BasicLexer | None = None
+
+
+def get_incremental_parser() -> SparqlParser:
+    """Return the shared LALR(1) parser used for incremental parsing, creating it on first use.
+
+    It records the position of each tree and can also start from the rules that are
+    re-parsed after an edit.
+
+    :return: The parser.
+    """
+    global _incremental_parser
+
+    if _incremental_parser is None:
+        _incremental_parser = create_parser(
+            START_RULES + INCREMENTAL_RULES, propagate_positions=True
+        )
+
+    return _incremental_parser
+
+
+def parse(text: str, start: str = "unit") -> Tree:
+    """Parse the text into a tree with positions that can be passed to reparse.
+
+    :param text: Input query string.
+    :param start: One of "unit", "query_unit" or "update_unit".
+    :return: The parse tree.
+    """
+    if start not in START_RULES:
+        raise ValueError(
+            f"Unexpected start rule: {start}. Must be one of {START_RULES}"
+        )
+
+    return get_incremental_parser().parse(text, start=start)
+
+
+def reparse(tree: Tree, text: str, edit: TextEdit) -> Tree:
+    """Update the tree of the text after an edit, re-parsing as little as possible.
+
+    The innermost group_graph_pattern or triples_block that strictly encloses the edit is
+    re-parsed and spliced into the tree. If it no longer parses, or its last token runs
+    past its end in the text after the edit, like a comment opened by the edit, the
+    enclosing candidates are tried in turn. An edit that is not enclosed by any of them,
+    such as one that crosses a brace, falls back to a full parse.
+
+    The tree is modified in place when a candidate is re-parsed, and the positions of the
+    trees and tokens after the edit are moved. The tree is left unchanged if the text
+    after the edit does not parse.
+
+    :param tree: The tree of the text before the edit, from parse or a previous reparse.
+    :param text: The text before the edit.
+    :param edit: The edit.
+    :return: The tree of the text after the edit.
+    """
+    if edit.offset < 0 or edit.removed < 0 or edit.offset + edit.removed > len(text):
+        raise ValueError(f"Unexpected edit: {edit}. Out of range for the text")
+
+    new_text = edit.apply(text)
+    parser = get_incremental_parser()
+
+    for node, parent, index in reversed(_enclosing_candidates(tree, edit)):
+        end_pos = node.meta.end_pos + len(edit.inserted) - edit.removed
+        try:
+            subtree = parser.parse(
+                new_text[node.meta.start_pos : end_pos], start=node.data
+            )
+        except UnexpectedInput:
+            continue
+        if not _ends_at_token_boundary(new_text, node.meta.start_pos, end_pos):
+            continue
+
+        _shift_positions(tree, text, new_text, edit)
+        _move_positions(subtree, node.meta.start_pos, node.meta.line, node.meta.column)
+        parent.children[index] = subtree
+        return tree
+
+    return parser.parse(new_text, start=tree.data)
+
+
+def _ends_at_token_boundary(text: str, start_pos: int, end_pos: int) -> bool:
+    # Whether the text from start_pos, lexed with the ignored tokens, has a token that ends
+    # at end_pos. Otherwise the slice up to end_pos does not lex as it does in the text.
+    global _boundary_lexer
+
+    if _boundary_lexer is None:
+        lexer_conf = copy(get_incremental_parser().lexer_conf)
+        lexer_conf.ignore = ()
+        _boundary_lexer = BasicLexer(lexer_conf)
+
+    lexer_thread = LexerThread.from_text(
+        _boundary_lexer, TextSlice(text, start_pos, None)
+    )
+    try:
+        for token in lexer_thread.lex(None):
+            if token.end_pos >= end_pos:
+                return token.end_pos == end_pos
+    except UnexpectedInput:
+        pass
+    return False
+
+
+def _enclosing_candidates(tree: Tree, edit: TextEdit) -> list[tuple[Tree, Tree, int]]:
+    # The candidates enclosing the edit, outermost first, with their parent and index.
+    start, end = edit.offset, edit.offset + edit.removed
+    candidates = []
+    node = tree
+
+    while True:
+        for index, child in enumerate(node.children):
+            if (
+                isinstance(child, Tree)
+                and not child.meta.empty
+                and child.meta.start_pos <= start
+                and end <= child.meta.end_pos
+            ):
+                if (
+                    child.data in INCREMENTAL_RULES
+                    and child.meta.start_pos < start
+                    and end < child.meta.end_pos
+                ):
+                    candidates.append((child, node, index))
+                node = child
+                break
+        else:
+            return candidates
+
+
+def _shift_positions(tree: Tree, text: str, new_text: str, edit: TextEdit):
+    # Move the positions at or after the end of the edit to their place in the new text.
+    edit_end = edit.offset + edit.removed
+    delta = len(edit.inserted) - edit.removed
+    line_delta = edit.inserted.count("\n") - text.count("\n", edit.offset, edit_end)
+    edit_end_line = text.count("\n", 0, edit_end) + 1
+
+    def shift(line: int, column: int, pos: int) -> tuple[int, int, int]:
+        if pos < edit_end:
+            return line, column, pos
+        if line == edit_end_line:
+            column = pos + delta - new_text.rfind("\n", 0, pos + delta)
+        return line + line_delta, column, pos + delta
+
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        meta = node.meta
+        if meta.empty or meta.end_pos < edit.offset:
+            continue
+
+        meta.line, meta.column, meta.start_pos = shift(
+            meta.line, meta.column, meta.start_pos
+        )
+        meta.end_line, meta.end_column, meta.end_pos = shift(
+            meta.end_line, meta.end_column, meta.end_pos
+        )
+
+        for child in node.children:
+            if isinstance(child, Tree):
+                stack.append(child)
+            elif isinstance(child, Token) and child.end_pos >= edit.offset:
+                child.line, child.column, child.start_pos = shift(
+                    child.line, child.column, child.start_pos
+                )
+                child.end_line, child.end_column, child.end_pos = shift(
+                    child.end_line, child.end_column, child.end_pos
+                )
+
+
+def _move_positions(tree: Tree, start_pos: int, line: int, column: int):
+    # Move the positions of a tree parsed from a slice of the text to the start of the slice.
+    def move(token_line: int, token_column: int, pos: int) -> tuple[int, int, int]:
+        if token_line == 1:
+            token_column += column - 1
+        return token_line + line - 1, token_column, pos + start_pos
+
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        meta = node.meta
+        if meta.empty:
+            continue
+
+        meta.line, meta.column, meta.start_pos = move(
+            meta.line, meta.column, meta.start_pos
+        )
+        meta.end_line, meta.end_column, meta.end_pos = move(
+            meta.end_line, meta.end_column, meta.end_pos
+        )
+
+        for child in node.children:
+            if isinstance(child, Tree):
+                stack.append(child)
+            elif isinstance(child, Token):
+                child.line, child.column, child.start_pos = move(
+                    child.line, child.column, child.start_pos
+                )
+                child.end_line, child.end_column, child.end_pos = move(
+                    child.end_line, child.end_column, child.end_pos
+                )
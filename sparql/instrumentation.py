@@ -0,0 +1,145 @@
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, NamedTuple
+
+from lark import Tree
+
+from sparql.ast import Node
+
+# Formatting is only measured inside an instrument block. Outside of one, each phase costs
+# a context variable lookup.
+
+
+class PhaseTime(NamedTuple):
+    """The number of runs of a phase, and their total wall and CPU time in seconds."""
+
+    calls: int
+    wall: float
+    cpu: float
+
+
+class Profile:
+    """The measurements of the formatting done inside an instrument block.
+
+    phases maps the name of each phase that ran to its PhaseTime. The phases are data, for
+    the requests formatted without parsing by format_data, values, for the VALUES data
+    blocks read by the scanner of parse_with_values, parse and serialize. Lark's parser
+    reads the tokens from the lexer as it needs them and builds the tree as it reduces
+    the rules, so lexing, parsing and building the tree are timed together as parse.
+
+    rules counts the nodes of the parse trees by rule name, and handlers counts the calls
+    of each SparqlSerializer handler by the rule it serializes.
+    """
+
+    def __init__(self, callback: Callable[[str, float, float], None] | None = None):
+        self.phases: dict[str, PhaseTime] = {}
+        self.rules: Counter[str] = Counter()
+        self.handlers: Counter[str] = Counter()
+        self._callback = callback
+
+    def time(self, phase: str, function: Callable, *args):
+        """Call the function with the arguments and record its time under the phase.
+
+        The time is recorded even if the function raises an exception.
+
+        :param phase: The name of the phase.
+        :param function: The function that runs the phase.
+        :return: The result of the function.
+        """
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            return function(*args)
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.thread_time() - cpu
+            calls, total_wall, total_cpu = self.phases.get(phase, (0, 0.0, 0.0))
+            self.phases[phase] = PhaseTime(
+                calls + 1, total_wall + wall, total_cpu + cpu
+            )
+            if self._callback is not None:
+                self._callback(phase, wall, cpu)
+
+    def count_rules(self, tree: Tree):
+        """Add the nodes of a parse tree to the counts of their rules.
+
+        :param tree: A parse tree, which may hold typed nodes.
+        """
+        rules = self.rules
+        for subtree in tree.iter_subtrees():
+            rules[subtree.data] += 1
+            for child in subtree.children:
+                if isinstance(child, Node):
+                    rules[child.data] += 1
+
+    def to_dict(self) -> dict:
+        """Return the measurements as a dictionary of plain values, such as for JSON.
+
+        :return: The phases, with their calls and their wall and CPU times in seconds,
+            and the counts of the rules and of the handlers.
+        """
+        return {
+            "phases": {
+                phase: phase_time._asdict() for phase, phase_time in self.phases.items()
+            },
+            "rules": dict(self.rules),
+            "handlers": dict(self.handlers),
+        }
+
+
+_profile: ContextVar[Profile | None] = ContextVar("sparql_profile", default=None)
+
+
+@contextmanager
+def instrument(
+    callback: Callable[[str, float, float], None] | None = None,
+) -> Iterator[Profile]:
+    """Measure the formatting done inside the block.
+
+    The formatting done by the current thread or asyncio task is measured: the
+    format_string, format_string_explicit and format_updates functions, FormatCache,
+    format_many with a single worker, and serialize. The queries formatted on an executor
+    or in worker processes are not. The blocks can be nested, and the innermost one
+    records the measurements.
+
+    :param callback: A function called with the name of a phase, its wall time and its
+        CPU time in seconds each time a phase ends, such as to send them to a metrics
+        pipeline as they are made.
+    :return: The Profile that the measurements are recorded in.
+    """
+    profile = Profile(callback)
+    token = _profile.set(profile)
+    try:
+        yield profile
+    finally:
+        _profile.reset(token)
+
+
+def current_profile() -> Profile | None:
+    """Return the Profile of the innermost instrument block, or None outside of one."""
+    return _profile.get()
+
+
+def timed(phase: str, function: Callable, *args):
+    """Call the function with the arguments, and time it inside an instrument block.
+
+    :param phase: The name of the phase.
+    :param function: The function that runs the phase.
+    :return: The result of the function.
+    """
+    profile = _profile.get()
+    if profile is None:
+        return function(*args)
+    return profile.time(phase, function, *args)
+
+
+def count_rules(tree: Tree):
+    """Count the nodes of a parse tree by rule name inside an instrument block.
+
+    :param tree: A parse tree.
+    """
+    profile = _profile.get()
+    if profile is not None:
+        profile.count_rules(tree)
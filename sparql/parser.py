@@ -1,10 +1,314 @@
+import hashlib
+import os
+import sys
 from pathlib import Path
+from typing import Literal
 
-from lark import Lark
+import lark
+from lark import Lark, Token, Tree
+from lark.exceptions import UnexpectedInput, UnexpectedToken
+
+from sparql.compact import compact_expressions
+
+Backend = Literal["lalr", "earley"]
+
+START_RULES = ["unit", "query_unit", "update_unit"]
 
 grammar_path = current_dir = Path(__file__).parent / "grammar.lark"
 
+_UNSIGNED_NUMERIC_LITERALS = {
+    "INTEGER_POSITIVE": "INTEGER",
+    "DECIMAL_POSITIVE": "DECIMAL",
+    "DOUBLE_POSITIVE": "DOUBLE",
+    "INTEGER_NEGATIVE": "INTEGER",
+    "DECIMAL_NEGATIVE": "DECIMAL",
+    "DOUBLE_NEGATIVE": "DOUBLE",
+}
+
+
+def _resolve_lalr_lookahead(error: UnexpectedInput) -> bool:
+    """Recover from the tokens the contextual lexer picks in merged LALR(1) states.
+
+    LALR(1) merges the lookahead sets of identical states, so the contextual lexer may
+    offer terminals that are not valid at the current position. The Earley backend
+    would have chosen a different terminal for the same input, so retry with that one:
+
+    - A signed numeric literal inside an expression, e.g. "?o+1", is read as PLUS INTEGER.
+    - An ASTERIX or PLUS after a path primary, e.g. "rdfs:subClassOf*", is read as a PATH_MOD.
+
+    :param error: The error raised by the LALR(1) parser.
+    :return: True if the parse can be resumed.
+    """
+    if not isinstance(error, UnexpectedToken):
+        return False
+
+    token = error.token
+    interactive_parser = error.interactive_parser
+    choices = interactive_parser.choices()
+
+    if token.type in ("ASTERIX", "PLUS") and "PATH_MOD" in choices:
+        interactive_parser.feed_token(Token.new_borrow_pos("PATH_MOD", token, token))
+        return True
+
+    if token.type in _UNSIGNED_NUMERIC_LITERALS:
+        sign_type = "PLUS" if token.value[0] == "+" else "MINUS"
+        if sign_type in choices:
+            interactive_parser.feed_token(
+                Token(
+                    sign_type,
+                    token.value[0],
+                    token.start_pos,
+                    token.line,
+                    token.column,
+                    token.line,
+                    token.column + 1,
+                    token.start_pos + 1,
+                )
+            )
+            interactive_parser.feed_token(
+                Token(
+                    _UNSIGNED_NUMERIC_LITERALS[token.type],
+                    token.value[1:],
+                    token.start_pos + 1,
+                    token.line,
+                    token.column + 1,
+                    token.end_line,
+                    token.end_column,
+                    token.end_pos,
+                )
+            )
+            return True
+
+    return False
+
+
+INTERNED_TERMINALS = ("VAR1", "VAR2", "PNAME_LN", "PNAME_NS", "IRIREF")
+
+
+class InternPool:
+    """A bounded pool of the values of the tokens of variables, prefixed names and IRIs.
+
+    Large generated queries repeat the same variables, prefixed names and IRIs many times.
+    The pool replaces the value of each of these tokens with the first equal string it has
+    seen, so the trees share one string per distinct lexeme. When the pool holds maxsize
+    strings, it is cleared and starts again.
+    """
+
+    def __init__(self, maxsize: int = 65536):
+        self.maxsize = maxsize
+        self._values: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def intern(self, value: str) -> str:
+        values = self._values
+        interned = values.get(value)
+        if interned is None:
+            if len(values) >= self.maxsize:
+                values.clear()
+            values[value] = interned = value
+        return interned
+
+    def intern_token(self, token: Token) -> Token:
+        token.value = self.intern(token.value)
+        return token
+
+    def intern_tree(self, tree: Tree) -> Tree:
+        for token in tree.scan_values(
+            lambda value: isinstance(value, Token) and value.type in INTERNED_TERMINALS
+        ):
+            self.intern_token(token)
+        return tree
+
+
+# Shared by the parsers of get_unified_parser and get_parser.
+intern_pool = InternPool()
+
+
+class SparqlParser(Lark):
+    """A Lark parser over the SPARQL 1.1 grammar.
+
+    Both backends produce identical trees for the same input. The LALR(1) backend parses in
+    linear time with a contextual lexer, the Earley backend is kept for reference.
+    """
+
+    intern_pool: InternPool | None = None
+
+    def parse(self, text: str, start: str = None, on_error=None):
+        if self.options.parser == "lalr":
+            if on_error is None:
+                on_error = _resolve_lalr_lookahead
+            return super().parse(text, start=start, on_error=on_error)
+
+        tree = super().parse(text, start=start, on_error=on_error)
+        if self.intern_pool is not None:
+            # Earley's dynamic lexer does not support lexer callbacks.
+            self.intern_pool.intern_tree(tree)
+        return tree
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory, sparql in $XDG_CACHE_HOME or ~/.cache."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "sparql"
+
+
+def _cache_file(start: str | list[str], propagate_positions: bool) -> str | bool:
+    # Lark's default cache file is in the shared temporary directory, where another user
+    # could replace it with a pickle that runs code when it is loaded. The tables are
+    # cached in the user's own cache directory instead, in a file named by the options
+    # that change them. Lark checks the hash of the grammar and options stored in the
+    # file, and rewrites it if they differ.
+    key = repr((start, propagate_positions, lark.__version__, sys.version_info[:2]))
+    digest = hashlib.sha256((grammar + key).encode("utf-8")).hexdigest()[:16]
+    try:
+        directory = default_cache_dir() / "parsers"
+        directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+    except (OSError, RuntimeError):
+        # No home directory, or it is not writable.
+        return False
+    return str(directory / f"lalr-{digest}.cache")
+
+
+def create_parser(
+    start: str | list[str],
+    backend: Backend = "lalr",
+    cache: bool | str = True,
+    propagate_positions: bool = False,
+    intern_pool: InternPool | None = None,
+) -> SparqlParser:
+    """Create a parser for the given start rule or rules of the grammar.
+
+    The LALR(1) parse tables are cached on disk by Lark, keyed by a hash of the grammar,
+    the parser options, the Lark version and the Python version. A warm start loads the
+    tables instead of analysing the grammar again. Stale or unreadable cache files are
+    ignored and rewritten. By default, the cache files are in the parsers directory of
+    default_cache_dir, which is private to the user, and the tables are not cached if it
+    cannot be created.
+
+    :param start: The start rule, e.g. "query_unit" or "update_unit". When a list of start
+        rules is given, the rule must be passed to each parse call.
+    :param backend: The parsing algorithm, either "lalr" or "earley".
+    :param cache: Only used by the "lalr" backend. True caches to a file in the user's
+        cache directory, a string caches to that file path and False disables caching.
+    :param propagate_positions: Record the line, column and offsets of each tree in its meta.
+    :param intern_pool: Share the values of equal variable, prefixed name and IRI tokens
+        through this pool.
+    :return: The parser.
+    """
+    if backend not in ("lalr", "earley"):
+        raise ValueError(f"Unexpected backend: {backend}. Must be one of {Backend}")
+
+    if backend != "lalr":
+        cache = False
+    elif cache is True:
+        cache = _cache_file(start, propagate_positions)
+
+    lexer_callbacks = {}
+    if intern_pool is not None and backend == "lalr":
+        lexer_callbacks = {
+            terminal: intern_pool.intern_token for terminal in INTERNED_TERMINALS
+        }
+
+    parser = SparqlParser(
+        grammar,
+        start=start,
+        parser=backend,
+        cache=cache,
+        propagate_positions=propagate_positions,
+        lexer_callbacks=lexer_callbacks,
+    )
+    parser.intern_pool = intern_pool
+    return parser
+
+
+class SparqlEntryPoint:
+    """A view of the unified parser that always parses from one start rule.
+
+    All entry points of a backend share a single parser instance, so the grammar is only
+    compiled and held in memory once.
+    """
+
+    def __init__(self, parser: SparqlParser, start: str):
+        self.parser = parser
+        self.start = start
+
+    def parse(self, text: str, on_error=None) -> Tree:
+        return self.parser.parse(text, start=self.start, on_error=on_error)
+
+
+_unified_parsers: dict[str, SparqlParser] = {}
+
+
+def get_unified_parser(backend: Backend = "lalr") -> SparqlParser:
+    """Return the shared parser for all start rules, creating it on first use.
+
+    :param backend: The parsing algorithm, either "lalr" or "earley".
+    :return: The parser.
+    """
+    if backend not in _unified_parsers:
+        _unified_parsers[backend] = create_parser(
+            START_RULES, backend, intern_pool=intern_pool
+        )
+
+    return _unified_parsers[backend]
+
+
+_entry_points: dict[tuple[str, str], SparqlEntryPoint] = {}
+
+
+def get_parser(
+    start: str = "query_unit", backend: Backend = "lalr"
+) -> SparqlEntryPoint:
+    """Return the shared parser for the given start rule, creating it on first use.
+
+    :param start: One of "unit", "query_unit" or "update_unit".
+    :param backend: The parsing algorithm, either "lalr" or "earley".
+    :return: The parser.
+    """
+    if start not in START_RULES:
+        raise ValueError(
+            f"Unexpected start rule: {start}. Must be one of {START_RULES}"
+        )
+
+    if (start, backend) not in _entry_points:
+        _entry_points[(start, backend)] = SparqlEntryPoint(
+            get_unified_parser(backend), start
+        )
+
+    return _entry_points[(start, backend)]
+
+
+def parse(query: str, backend: Backend = "lalr", compact: bool = False) -> Tree:
+    """Parse a SPARQL 1.1 query or SPARQL 1.1 Update request in a single attempt.
+
+    :param query: Input query string.
+    :param backend: The parsing algorithm, either "lalr" or "earley".
+    :param compact: Drop the single-child nodes of expressions, see sparql.compact.
+    :return: A unit tree with either a query_unit or an update_unit child.
+    """
+    tree = get_unified_parser(backend).parse(query, start="unit")
+    if compact:
+        tree = compact_expressions(tree)
+    return tree
+
+
+_lazy_parsers = {
+    "sparql_parser": "query_unit",
+    "sparql_update_parser": "update_unit",
+}
+
+
+def __getattr__(name: str):
+    # sparql_parser and sparql_update_parser are built on first access.
+    if name in _lazy_parsers:
+        return get_parser(_lazy_parsers[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 with open(grammar_path, "r", encoding="utf-8") as file:
     grammar = file.read()
-    sparql_parser = Lark(grammar, start="query_unit")
-    sparql_update_parser = Lark(grammar, start="update_unit")
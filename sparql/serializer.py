@@ -1,5 +1,27 @@
+from collections import Counter
+from types import FunctionType
+from typing import Callable, Iterator, TextIO
+
 from lark import Token, Tree
-from lark.visitors import Visitor_Recursive
+from lark.visitors import Visitor
+
+from sparql.ast import (
+    IRI,
+    BlankNode,
+    DataBlockValues,
+    Literal,
+    Node,
+    SelectQuery,
+    TriplePattern,
+    Var,
+)
+from sparql.instrumentation import current_profile
+
+_TABS = tuple("\t" * indent for indent in range(16))
+
+
+def _tabs(indent: int) -> str:
+    return _TABS[indent] if 0 <= indent < len(_TABS) else "\t" * indent
 
 
 def get_prefixed_name(prefixed_name: Tree) -> str:
@@ -11,6 +33,14 @@ def get_iriref(iriref: Token) -> str:
 
 
 def get_rdf_literal(rdf_literal: Tree) -> str:
+    if isinstance(rdf_literal, Literal):
+        value = rdf_literal.value
+        if rdf_literal.language is not None:
+            value += f"@{rdf_literal.language}"
+        elif rdf_literal.datatype is not None:
+            value += f"^^{rdf_literal.datatype.value}"
+        return value
+
     value = rdf_literal.children[0].children[0].value
 
     if len(rdf_literal.children) > 1:
@@ -24,20 +54,25 @@ def get_rdf_literal(rdf_literal: Tree) -> str:
 
 
 def get_value(tree: Tree, memory: list[Token] = None) -> list[Token]:
-    """This function walks a tree recursively and only expects a single path. Multiple paths raises a ValueError."""
+    """This function walks a tree and only expects a single path. Multiple paths raises a ValueError."""
     if memory is None:
         memory = []
 
-    if isinstance(tree, Token):
-        memory.append(tree)
-    else:
-        for child in tree.children:
-            get_value(child, memory)
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Token):
+            memory.append(node)
+        else:
+            stack.extend(reversed(node.children))
 
     return memory
 
 
 def get_iri(iri: Tree) -> str:
+    if isinstance(iri, IRI):
+        return iri.value
+
     value = iri.children[0]
     if isinstance(value, Token):
         return get_iriref(value)
@@ -65,9 +100,24 @@ def get_data_block_value(data_block_value: Tree) -> str:
 
 
 def get_var(var: Tree) -> str:
+    if isinstance(var, Var):
+        return var.name
     return var.children[0].value
 
 
+def get_term(term: Var | IRI | Literal | BlankNode) -> str:
+    if isinstance(term, Var):
+        return term.name
+    elif isinstance(term, IRI):
+        return term.value
+    elif isinstance(term, Literal):
+        return get_rdf_literal(term)
+    elif isinstance(term, BlankNode):
+        return term.label
+    else:
+        raise TypeError(f"Unexpected term type: {type(term)}")
+
+
 def get_vars(vars_: list[Tree]) -> str:
     result = ""
     for i, var in enumerate(vars_):
@@ -78,15 +128,268 @@ def get_vars(vars_: list[Tree]) -> str:
     return result
 
 
-class SparqlSerializer(Visitor_Recursive):
-    def __init__(self):
-        self._result = ""
+_MAX_RECURSION_DEPTH = 100
+
+# The handlers that pick the handler of a child by its rule, mapped to the handler name of
+# each rule they accept. SparqlSerializer builds a table of the handler functions from
+# this once per class, so a handler overridden in a subclass is dispatched to.
+_CHILD_HANDLERS = {
+    "modify": {
+        "iri": "_iri",
+        "delete_clause": "_delete_clause",
+        "insert_clause": "_insert_clause",
+        "using_clause": "_using_clause",
+        "group_graph_pattern": "_group_graph_pattern",
+    },
+    "update1": {
+        "load": "_load",
+        "clear": "_clear",
+        "drop": "_drop",
+        "add": "_add",
+        "move": "_move",
+        "copy": "_copy",
+        "create": "_create",
+        "insert_data": "_insert_data",
+        "delete_data": "_delete_data",
+        "delete_where": "_delete_where",
+        "modify": "_modify",
+    },
+    "ask_query": {
+        "dataset_clause": "_dataset_clause",
+        "where_clause": "_where_clause",
+        "solution_modifier": "_solution_modifier",
+    },
+    "describe_query": {
+        "var_or_iri": "_var_or_iri",
+        "dataset_clause": "_dataset_clause",
+        "where_clause": "_where_clause",
+        "solution_modifier": "_solution_modifier",
+    },
+    "query": {
+        "select_query": "_select_query",
+        "construct_query": "_construct_query",
+        "describe_query": "_describe_query",
+        "ask_query": "_ask_query",
+    },
+    "group_condition": {
+        "built_in_call": "_built_in_call",
+        "function_call": "_function_call",
+        "group_condition_expression_as_var": "_group_condition_expression_as_var",
+        "var": "_var",
+    },
+    "order_condition": {
+        "bracketted_expression": "_bracketted_expression",
+        "constraint": "_constraint",
+        "var": "_var",
+    },
+    "solution_modifier": {
+        "group_clause": "_group_clause",
+        "having_clause": "_having",
+        "order_clause": "_order_clause",
+        "limit_offset_clauses": "_limit_offset_clauses",
+    },
+    "built_in_call": {
+        "aggregate": "_aggregate",
+        "expression": "_expression",
+        "expression_list": "_expression_list",
+        "substring_expression": "_substring_expression",
+        "str_replace_expression": "_str_replace_expression",
+        "regex_expression": "_regex_expression",
+        "exists_func": "_exists_func",
+        "not_exists_func": "_not_exists_func",
+    },
+    # Compact trees drop the single-child nodes of the expression chain, so an operand
+    # can be any node of the chain below its operator, or a value of a primary_expression.
+    "expression_term": {
+        "conditional_or_expression": "_conditional_or_expression",
+        "conditional_and_expression": "_conditional_and_expression",
+        "value_logical": "_value_logical",
+        "relational_expression": "_relational_expression",
+        "numeric_expression": "_numeric_expression",
+        "additive_expression": "_additive_expression",
+        "multiplicative_expression": "_multiplicative_expression",
+        "unary_expression": "_unary_expression",
+        "primary_expression": "_primary_expression",
+        "bracketted_expression": "_bracketted_expression",
+        "built_in_call": "_built_in_call",
+        "iri_or_function": "_iri_or_function",
+        "rdf_literal": "_rdf_literal",
+        "numeric_literal": "_rdf_literal",
+        "boolean_literal": "_rdf_literal",
+        "var": "_var",
+    },
+    "graph_term": {
+        "iri": "_iri",
+        "rdf_literal": "_rdf_literal",
+        "numeric_literal": "_numeric_literal",
+        "boolean_literal": "_boolean_literal",
+        "blank_node": "_blank_node",
+    },
+    "constraint": {
+        "bracketted_expression": "_bracketted_expression",
+        "built_in_call": "_built_in_call",
+        "function_call": "_function_call",
+    },
+    "graph_pattern_not_triples": {
+        "group_or_union_graph_pattern": "_group_or_union_graph_pattern",
+        "optional_graph_pattern": "_optional_graph_pattern",
+        "minus_graph_pattern": "_minus_graph_pattern",
+        "graph_graph_pattern": "_graph_graph_pattern",
+        "service_graph_pattern": "_service_graph_pattern",
+        "filter": "_filter",
+        "bind": "_bind",
+        "inline_data": "_inline_data",
+    },
+    "data_block_value": {
+        "iri": "_iri",
+        "rdf_literal": "_rdf_literal",
+        "numeric_literal": "_rdf_literal",
+        "boolean_literal": "_rdf_literal",
+    },
+}
+
+
+class SparqlSerializer(Visitor):
+    """Serialize a parse tree to a formatted string.
+
+    The handlers of the rules that can nest are generators. Instead of calling the handler
+    of a child, they yield it, and _run drives the handlers with an explicit stack. This
+    keeps the Python call stack flat, so the depth of the tree is not limited by the
+    recursion limit. Handlers that only delegate to one child return the child's handler
+    instead of yielding it. Handlers that choose the handler of a child by its rule look
+    it up in a table built once per class, and yield the generator it returns, if any.
+
+    By default, the output is kept in memory and read from result. If stream is given,
+    the output is written to it while the tree is visited, so that the full output is
+    never held in memory. The output is buffered until buffer_size characters have been
+    written, and the buffer is flushed to the stream when serialize returns. With a
+    buffer_size of 0, every piece of the output is written to the stream as it is made.
+    """
+
+    _handlers: dict[str, dict[str, Callable]] = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._build_handlers()
+
+    @classmethod
+    def _build_handlers(cls):
+        cls._handlers = {
+            rule: {
+                child_rule: getattr(cls, handler_name)
+                for child_rule, handler_name in child_handlers.items()
+            }
+            for rule, child_handlers in _CHILD_HANDLERS.items()
+        }
+
+    def __init__(self, stream: TextIO | None = None, buffer_size: int = 65536):
+        if buffer_size < 0:
+            raise ValueError(
+                f"Unexpected buffer_size: {buffer_size}. Must not be negative"
+            )
+
+        # The output is written as a list of chunks, which are joined when the result is
+        # read. Appending to a string instead copies the whole output each time.
+        self._chunks: list[str] = []
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._buffered = 0
+        if stream is None:
+            self._write = self._chunks.append
+        elif buffer_size == 0:
+            self._write = stream.write
+        else:
+            self._write = self._write_buffered
         super().__init__()
         self._indent = 0
 
     @property
-    def result(self):
-        return self._result
+    def result(self) -> str:
+        if self._stream is not None:
+            raise ValueError("The output was written to a stream")
+
+        if len(self._chunks) != 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0]
+
+    def _write_buffered(self, text: str):
+        self._chunks.append(text)
+        self._buffered += len(text)
+        if self._buffered >= self._buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered output to the stream."""
+        if self._stream is not None and self._chunks:
+            self._stream.write("".join(self._chunks))
+            self._chunks.clear()
+            self._buffered = 0
+
+    @property
+    def _indent(self) -> int:
+        return self._indent_level
+
+    @_indent.setter
+    def _indent(self, indent: int):
+        self._indent_level = indent
+        self._tabs = _tabs(indent)
+
+    def serialize(self, tree: Tree):
+        """Serialize a parse tree, starting at the handler of its unit.
+
+        Each node is visited once, by the handler of its parent, without walking the tree
+        to find the units first as visit_topdown does. The buffered output is flushed to
+        the stream, if any, before returning.
+
+        :param tree: A query_unit or update_unit tree, or the unit tree of the unified
+            parser.
+        """
+        if tree.data == "unit":
+            tree = tree.children[0]
+
+        if tree.data == "query_unit":
+            self.query_unit(tree)
+        elif tree.data == "update_unit":
+            self.update_unit(tree)
+        else:
+            raise ValueError(f"Unexpected tree type: {tree.data}")
+        self.flush()
+
+    def visit_topdown(self, tree: Tree) -> Tree:
+        """Visit the subtrees in pre-order, without recursion.
+
+        The query_unit and update_unit handlers serialize their whole subtree, so their
+        children are not visited. The buffered output is flushed to the stream, if any,
+        before returning. Use serialize for a parse tree, which does not walk the tree.
+        """
+        stack = [tree]
+        while stack:
+            subtree = stack.pop()
+            self._call_userfunc(subtree)
+            if subtree.data not in ("query_unit", "update_unit"):
+                for child in reversed(subtree.children):
+                    if isinstance(child, Tree):
+                        stack.append(child)
+        self.flush()
+        return tree
+
+    def _run(self, handler: Iterator, depth: int = 0):
+        # Shallow handlers are run by recursion, which is faster. Deeper than
+        # _MAX_RECURSION_DEPTH, the rest of the tree is run from an explicit stack.
+        if depth < _MAX_RECURSION_DEPTH:
+            for child in handler:
+                self._run(child, depth + 1)
+            return
+
+        stack = [handler]
+        push = stack.append
+        pop = stack.pop
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                pop()
+            else:
+                push(child)
 
     def _prologue(self, prologue: Tree):
         base_decls = list(filter(lambda x: x.data == "base_decl", prologue.children))
@@ -95,30 +398,34 @@ class SparqlSerializer(Visitor_Recursive):
         )
 
         for base_decl in base_decls:
-            self._result += f"{base_decl.children[0].children[0].value} {get_iriref(base_decl.children[1])}\n"
+            self._write(
+                f"{base_decl.children[0].children[0].value} {get_iriref(base_decl.children[1])}\n"
+            )
 
         for prefix_decl in prefix_decls:
-            self._result += f"{prefix_decl.children[0].children[0].value} {prefix_decl.children[1].children[0].value} {get_iriref(prefix_decl.children[2])}\n"
+            self._write(
+                f"{prefix_decl.children[0].children[0].value} {prefix_decl.children[1].children[0].value} {get_iriref(prefix_decl.children[2])}\n"
+            )
 
-        self._result += "\n"
+        self._write("\n")
 
     def query_unit(self, query_unit: Tree):
-        self._query(query_unit.children[0])
+        self._run(self._query(query_unit.children[0]))
 
     def update_unit(self, update_unit: Tree):
-        self._update(update_unit.children[0])
+        self._run(self._update(update_unit.children[0]))
 
     def _graph_ref(self, graph_ref: Tree):
         graph_str = graph_ref.children[0]
-        self._result += f"{graph_str} "
+        self._write(f"{graph_str} ")
         iri = graph_ref.children[1]
         self._iri(iri)
 
     def _load(self, load: Tree):
         for child in load.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "iri":
                     self._iri(child)
                 elif child.data == "graph_ref":
@@ -131,8 +438,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _graph_ref_all(self, graph_ref_all):
         value = graph_ref_all.children[0]
         if isinstance(value, Token):
-            self._result += f"{value.value} "
-        elif isinstance(value, Tree):
+            self._write(f"{value.value} ")
+        elif isinstance(value, (Tree, Node)):
             if value.data == "graph_ref":
                 self._graph_ref(value)
             else:
@@ -143,8 +450,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _clear(self, clear: Tree):
         for child in clear.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "graph_ref_all":
                     self._graph_ref_all(child)
                 else:
@@ -155,8 +462,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _drop(self, drop: Tree):
         for child in drop.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "graph_ref_all":
                     self._graph_ref_all(child)
                 else:
@@ -167,8 +474,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _graph_or_default(self, graph_or_default: Tree):
         for child in graph_or_default.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "iri":
                     self._iri(child)
                 else:
@@ -183,8 +490,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _add(self, add: Tree):
         for child in add.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "graph_or_default":
                     self._graph_or_default(child)
                 else:
@@ -195,8 +502,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _move(self, move: Tree):
         for child in move.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "graph_or_default":
                     self._graph_or_default(child)
                 else:
@@ -207,8 +514,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _copy(self, copy: Tree):
         for child in copy.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "graph_or_default":
                     self._graph_or_default(child)
                 else:
@@ -219,8 +526,8 @@ class SparqlSerializer(Visitor_Recursive):
     def _create(self, create: Tree):
         for child in create.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "graph_ref":
                     self._graph_ref(child)
                 else:
@@ -232,17 +539,17 @@ class SparqlSerializer(Visitor_Recursive):
         for child in quads_not_triples.children:
             if isinstance(child, Token):
                 if child.value == "{":
-                    self._result += "{\n"
+                    self._write("{\n")
                 elif child.value == "}":
-                    self._result += f"\n{'\t' * self._indent}}}"
+                    self._write(f"\n{self._tabs}}}")
                 else:
-                    self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                    self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "var_or_iri":
                     self._var_or_iri(child)
                 elif child.data == "triples_template":
                     self._indent += 1
-                    self._triples_template(child)
+                    yield self._triples_template(child)
                     self._indent -= 1
                 else:
                     raise ValueError(
@@ -256,71 +563,71 @@ class SparqlSerializer(Visitor_Recursive):
     def _quads(self, quads: Tree):
         for child in quads.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "triples_template":
-                    self._triples_template(child)
+                    yield self._triples_template(child)
                 elif child.data == "quads_not_triples":
-                    self._quads_not_triples(child)
+                    yield self._quads_not_triples(child)
                 else:
                     raise ValueError(f"Unexpected quads value type: {child.data}")
             else:
                 raise TypeError(f"Unexpected quads value type: {type(child)}")
 
     def _quad_data(self, quad_data: Tree):
-        self._result += "{\n"
+        self._write("{\n")
         self._indent += 1
         quads = quad_data.children[1]
-        self._quads(quads)
+        yield self._quads(quads)
         self._indent -= 1
-        self._result += f"\n{'\t' * self._indent}}}"
+        self._write(f"\n{self._tabs}}}")
 
     def _insert_data(self, insert_data: Tree):
         insert_str = insert_data.children[0]
         data_str = insert_data.children[1]
-        self._result += f"{insert_str} {data_str} "
+        self._write(f"{insert_str} {data_str} ")
         quad_data = insert_data.children[2]
-        self._quad_data(quad_data)
+        yield self._quad_data(quad_data)
 
     def _delete_data(self, delete_data: Tree):
         delete_str = delete_data.children[0]
         data_str = delete_data.children[1]
-        self._result += f"{delete_str} {data_str} "
+        self._write(f"{delete_str} {data_str} ")
         quad_data = delete_data.children[2]
-        self._quad_data(quad_data)
+        yield self._quad_data(quad_data)
 
     def _quad_pattern(self, quad_pattern: Tree):
         quads = quad_pattern.children[1]
-        self._result += "{\n"
+        self._write("{\n")
         self._indent += 1
-        self._quads(quads)
+        yield self._quads(quads)
         self._indent -= 1
-        self._result += f"\n{'\t' * self._indent}}}"
+        self._write(f"\n{self._tabs}}}")
 
     def _delete_where(self, delete_where: Tree):
         delete_str = delete_where.children[0]
         where_str = delete_where.children[1]
-        self._result += f"{delete_str} {where_str} "
+        self._write(f"{delete_str} {where_str} ")
         quad_pattern = delete_where.children[2]
-        self._quad_pattern(quad_pattern)
+        yield self._quad_pattern(quad_pattern)
 
     def _delete_clause(self, delete_clause: Tree):
         delete_str = delete_clause.children[0]
-        self._result += f"{delete_str} "
+        self._write(f"{delete_str} ")
         quad_pattern = delete_clause.children[1]
-        self._quad_pattern(quad_pattern)
+        yield self._quad_pattern(quad_pattern)
 
     def _insert_clause(self, insert_clause: Tree):
         insert_str = insert_clause.children[0]
-        self._result += f"{insert_str} "
+        self._write(f"{insert_str} ")
         quad_pattern = insert_clause.children[1]
-        self._quad_pattern(quad_pattern)
+        yield self._quad_pattern(quad_pattern)
 
     def _using_clause(self, using_clause: Tree):
         for child in using_clause.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "iri":
                     self._iri(child)
                 else:
@@ -331,101 +638,72 @@ class SparqlSerializer(Visitor_Recursive):
                 raise TypeError(f"Unexpected using_clause value type: {type(child)}")
 
     def _modify(self, modify: Tree):
+        handlers = self._handlers["modify"]
         for child in modify.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "iri":
-                    self._iri(child)
-                elif child.data == "delete_clause":
-                    self._delete_clause(child)
-                elif child.data == "insert_clause":
-                    self._insert_clause(child)
-                elif child.data == "using_clause":
-                    self._using_clause(child)
-                elif child.data == "group_graph_pattern":
-                    self._group_graph_pattern(child)
-                else:
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                handler = handlers.get(child.data)
+                if handler is None:
                     raise ValueError(f"Unexpected modify value type: {child.data}")
+                nested = handler(self, child)
+                if nested is not None:
+                    yield nested
             else:
                 raise TypeError(f"Unexpected modify value type: {type(child)}")
 
     def _update1(self, update1: Tree):
         value = update1.children[0]
-        if value.data == "load":
-            self._load(value)
-        elif value.data == "clear":
-            self._clear(value)
-        elif value.data == "drop":
-            self._drop(value)
-        elif value.data == "add":
-            self._add(value)
-        elif value.data == "move":
-            self._move(value)
-        elif value.data == "copy":
-            self._copy(value)
-        elif value.data == "create":
-            self._create(value)
-        elif value.data == "insert_data":
-            self._insert_data(value)
-        elif value.data == "delete_data":
-            self._delete_data(value)
-        elif value.data == "delete_where":
-            self._delete_where(value)
-        elif value.data == "modify":
-            self._modify(value)
-        else:
+        handler = self._handlers["update1"].get(value.data)
+        if handler is None:
             raise ValueError(f"Unexpected update1 value type: {value.data}")
+        nested = handler(self, value)
+        if nested is not None:
+            yield nested
 
     def _update(self, update: Tree):
         for child in update.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "prologue":
                     self._prologue(child)
                 elif child.data == "update1":
-                    self._update1(child)
-                elif child.data == "update":
-                    self._update(child)
+                    yield self._update1(child)
                 else:
                     raise ValueError(f"Unexpected update value type: {child.data}")
             else:
                 raise TypeError(f"Unexpected update value type: {child.data}")
 
     def _ask_query(self, ask_query: Tree):
+        handlers = self._handlers["ask_query"]
         for child in ask_query.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "dataset_clause":
-                    self._dataset_clause(child)
-                elif child.data == "where_clause":
-                    self._where_clause(child)
-                elif child.data == "solution_modifier":
-                    self._solution_modifier(child)
-                else:
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                handler = handlers.get(child.data)
+                if handler is None:
                     raise ValueError(f"Unexpected ask_query value type: {child.data}")
+                nested = handler(self, child)
+                if nested is not None:
+                    yield nested
             else:
                 raise TypeError(f"Unexpected ask_query value type: {type(child)}")
 
     def _describe_query(self, describe_query: Tree):
+        handlers = self._handlers["describe_query"]
         for child in describe_query.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "var_or_iri":
-                    self._var_or_iri(child)
-                elif child.data == "dataset_clause":
-                    self._dataset_clause(child)
-                elif child.data == "where_clause":
-                    self._where_clause(child)
-                elif child.data == "solution_modifier":
-                    self._solution_modifier(child)
-                else:
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                handler = handlers.get(child.data)
+                if handler is None:
                     raise ValueError(
                         f"Unexpected describe_query value type: {child.data}"
                     )
+                nested = handler(self, child)
+                if nested is not None:
+                    yield nested
             else:
                 raise TypeError(f"Unexpected describe_query value type: {type(child)}")
 
@@ -434,18 +712,14 @@ class SparqlSerializer(Visitor_Recursive):
         self._prologue(prologue)
 
         query_instance = query.children[1]
-        if query_instance.data == "select_query":
-            self._select_query(query_instance)
-        elif query_instance.data == "construct_query":
-            self._construct_query(query_instance)
-        elif query_instance.data == "describe_query":
-            self._describe_query(query_instance)
-        elif query_instance.data == "ask_query":
-            self._ask_query(query_instance)
-        else:
+        handler = self._handlers["query"].get(query_instance.data)
+        if handler is None:
             raise ValueError(
                 f"Unexpected query_instance value type: {query_instance.data}"
             )
+        nested = handler(self, query_instance)
+        if nested is not None:
+            yield nested
 
         values_clause = query.children[2]
         self._values_clause(values_clause)
@@ -456,7 +730,7 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _dataset_clause(self, dataset_clause: Tree):
         from_str = dataset_clause.children[0]
-        self._result += f"{from_str} "
+        self._write(f"{from_str} ")
         graph_clause = dataset_clause.children[1]
 
         if graph_clause.data == "default_graph_clause":
@@ -464,62 +738,75 @@ class SparqlSerializer(Visitor_Recursive):
             self._source_selector(source_selector)
         elif graph_clause.data == "named_graph_clause":
             named_str = graph_clause.children[0].value
-            self._result += f"{named_str} "
+            self._write(f"{named_str} ")
             source_selector = graph_clause.children[1]
             self._source_selector(source_selector)
         else:
             raise ValueError(f"Unexpected dataset_clause value: {graph_clause}")
 
-        self._result += "\n"
+        self._write("\n")
 
     def _property_list(self, property_list: Tree):
         if property_list.children:
             property_list_not_empty = property_list.children[0]
-            self._property_list_not_empty(property_list_not_empty)
+            yield self._property_list_not_empty(property_list_not_empty)
+
+    def _triple_pattern(self, triple_pattern: TriplePattern):
+        # A path triple is written with two spaces before the object, like the
+        # object_list_path of a triples_same_subject_path.
+        if triple_pattern.data == "triples_same_subject_path":
+            separator = "  "
+        else:
+            separator = " "
+        self._write(
+            f"{self._tabs}{get_term(triple_pattern.subject)} "
+            f"{get_term(triple_pattern.predicate)}{separator}"
+            f"{get_term(triple_pattern.object)} "
+        )
 
     def _triples_same_subject(self, triples_same_subject: Tree):
-        self._result += f"{'\t' * self._indent}"
+        self._write(self._tabs)
         first_value = triples_same_subject.children[0]
         second_value = triples_same_subject.children[1]
 
         if first_value.data == "var_or_term":
             self._var_or_term(first_value)
-            self._property_list_not_empty(second_value)
+            yield self._property_list_not_empty(second_value)
         elif first_value.data == "triples_node":
-            self._triples_node(first_value)
-            self._property_list(second_value)
+            yield self._triples_node(first_value)
+            yield self._property_list(second_value)
         else:
             raise ValueError(
                 f"Unexpected triples_same_subject first_value value type: {first_value.data}"
             )
 
     def _construct_triples(self, construct_triples: Tree):
-        triples_same_subject = construct_triples.children[0]
-        self._triples_same_subject(triples_same_subject)
-
-        if len(construct_triples.children) == 2:
-            self._result += " .\n"
-            nested_construct_triples = construct_triples.children[1]
-            self._construct_triples(nested_construct_triples)
+        for i, triples_same_subject in enumerate(construct_triples.children):
+            if isinstance(triples_same_subject, TriplePattern):
+                self._triple_pattern(triples_same_subject)
+            else:
+                yield self._triples_same_subject(triples_same_subject)
+            if i + 1 != len(construct_triples.children):
+                self._write(" .\n")
 
     def _construct_template(self, construct_template: Tree):
-        self._result += " {\n"
+        self._write(" {\n")
         self._indent += 1
         if len(construct_template.children) == 1:
             construct_triples = construct_template.children[0]
-            self._construct_triples(construct_triples)
+            yield self._construct_triples(construct_triples)
         self._indent -= 1
-        self._result += "\n}"
+        self._write("\n}")
 
     def _group_condition_expression_as_var(
         self, group_condition_expression_as_var: Tree
     ):
         for child in group_condition_expression_as_var.children:
             if isinstance(child, Token):
-                self._result += f"{child.value}"
-            elif isinstance(child, Tree):
+                self._write(f"{child.value}")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "expression":
-                    self._expression(child)
+                    yield self._expression(child)
                 elif child.data == "var":
                     self._var(child)
                 else:
@@ -533,21 +820,17 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _group_condition(self, group_condition: Tree):
         value = group_condition.children[0]
-        if value.data == "built_in_call":
-            self._built_in_call(value)
-        elif value.data == "function_call":
-            self._function_call(value)
-        elif value.data == "group_condition_expression_as_var":
-            self._group_condition_expression_as_var(value)
-        elif value.data == "var":
-            self._var(value)
-        else:
+        handler = self._handlers["group_condition"].get(value.data)
+        if handler is None:
             raise ValueError(f"Unexpected group_condition value type: {value.data}")
+        nested = handler(self, value)
+        if nested is not None:
+            yield nested
 
     def _group_clause(self, group_clause: Tree):
         group_str = group_clause.children[0]
         by_str = group_clause.children[1]
-        self._result += f"{'\t' * self._indent}{group_str} {by_str} "
+        self._write(f"{self._tabs}{group_str} {by_str} ")
 
         group_conditions = list(
             filter(
@@ -556,15 +839,15 @@ class SparqlSerializer(Visitor_Recursive):
             )
         )
         for group_condition in group_conditions:
-            self._group_condition(group_condition)
+            yield self._group_condition(group_condition)
 
     def _having_condition(self, having_condition: Tree):
         constraint = having_condition.children[0]
-        self._constraint(constraint)
+        return self._constraint(constraint)
 
     def _having(self, having: Tree):
         having_str = having.children[0]
-        self._result += f"\n{'\t' * self._indent}{having_str}"
+        self._write(f"\n{self._tabs}{having_str}")
 
         having_conditions = list(
             filter(
@@ -573,30 +856,29 @@ class SparqlSerializer(Visitor_Recursive):
             )
         )
         for having_condition in having_conditions:
-            self._having_condition(having_condition)
+            yield self._having_condition(having_condition)
 
     def _order_condition(self, order_condition: Tree):
+        handlers = self._handlers["order_condition"]
         for child in order_condition.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "bracketted_expression":
-                    self._bracketted_expression(child)
-                elif child.data == "constraint":
-                    self._constraint(child)
-                elif child.data == "var":
-                    self._var(child)
-                else:
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                handler = handlers.get(child.data)
+                if handler is None:
                     raise ValueError(
                         f"Unexpected order_condition value type: {child.data}"
                     )
+                nested = handler(self, child)
+                if nested is not None:
+                    yield nested
             else:
                 raise TypeError(f"Unexpected order_condition value type: {type(child)}")
 
     def _order_clause(self, order_clause: Tree):
         order_str = order_clause.children[0].value
         by_str = order_clause.children[1].value
-        self._result += f"\n{'\t' * self._indent}{order_str} {by_str} "
+        self._write(f"\n{self._tabs}{order_str} {by_str} ")
 
         order_conditions = list(
             filter(
@@ -605,21 +887,21 @@ class SparqlSerializer(Visitor_Recursive):
             )
         )
         for order_condition in order_conditions:
-            self._order_condition(order_condition)
+            yield self._order_condition(order_condition)
 
     def _limit_clause(self, limit_clause: Tree):
         limit_str = limit_clause.children[0].value
         value = limit_clause.children[1].value
-        self._result += f"\n{'\t' * self._indent}{limit_str} {value} "
+        self._write(f"\n{self._tabs}{limit_str} {value} ")
 
     def _offset_clause(self, offset_clause: Tree):
         offset_str = offset_clause.children[0].value
         value = offset_clause.children[1].value
-        self._result += f"\n{'\t' * self._indent}{offset_str} {value} "
+        self._write(f"\n{self._tabs}{offset_str} {value} ")
 
     def _limit_offset_clauses(self, limit_offset_clauses: Tree):
         for child in limit_offset_clauses.children:
-            if isinstance(child, Tree):
+            if isinstance(child, (Tree, Node)):
                 if child.data == "limit_clause":
                     self._limit_clause(child)
                 elif child.data == "offset_clause":
@@ -634,23 +916,20 @@ class SparqlSerializer(Visitor_Recursive):
                 )
 
     def _solution_modifier(self, solution_modifier: Tree):
+        handlers = self._handlers["solution_modifier"]
         for child in solution_modifier.children:
-            if child.data == "group_clause":
-                self._group_clause(child)
-            elif child.data == "having_clause":
-                self._having(child)
-            elif child.data == "order_clause":
-                self._order_clause(child)
-            elif child.data == "limit_offset_clauses":
-                self._limit_offset_clauses(child)
-            else:
+            handler = handlers.get(child.data)
+            if handler is None:
                 raise ValueError(
                     f"Unexpected solution_modifier value type: {child.data}"
                 )
+            nested = handler(self, child)
+            if nested is not None:
+                yield nested
 
     def _construct_construct_template(self, construct_construct_template: Tree):
         construct_template = construct_construct_template.children[0]
-        self._construct_template(construct_template)
+        yield self._construct_template(construct_template)
 
         dataset_clauses = list(
             filter(
@@ -667,7 +946,7 @@ class SparqlSerializer(Visitor_Recursive):
                 construct_construct_template.children,
             )
         )[0]
-        self._where_clause(where_clause)
+        yield self._where_clause(where_clause)
 
         solution_modifier = list(
             filter(
@@ -675,17 +954,17 @@ class SparqlSerializer(Visitor_Recursive):
                 construct_construct_template.children,
             )
         )[0]
-        self._solution_modifier(solution_modifier)
+        yield self._solution_modifier(solution_modifier)
 
     def _triples_template(self, triples_template):
         for child in triples_template.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, TriplePattern):
+                self._triple_pattern(child)
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "triples_same_subject":
-                    self._triples_same_subject(child)
-                elif child.data == "triples_template":
-                    self._triples_template(child)
+                    yield self._triples_same_subject(child)
                 else:
                     raise ValueError(
                         f"Unexpected triples_template value type: {child.data}"
@@ -698,18 +977,18 @@ class SparqlSerializer(Visitor_Recursive):
     def _construct_triples_template(self, construct_triples_template: Tree):
         for child in construct_triples_template.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "dataset_clause":
                     self._dataset_clause(child)
                 elif child.data == "triples_template":
-                    self._result += "{\n"
+                    self._write("{\n")
                     self._indent += 1
-                    self._triples_template(child)
+                    yield self._triples_template(child)
                     self._indent -= 1
-                    self._result += f"{'\t' * self._indent}\n}}"
+                    self._write(f"{self._tabs}\n}}")
                 elif child.data == "solution_modifier":
-                    self._solution_modifier(child)
+                    yield self._solution_modifier(child)
                 else:
                     raise ValueError(
                         f"Unexpected construct_triples_template value type: {child.data}"
@@ -721,26 +1000,26 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _construct_query(self, construct_query: Tree):
         construct_str = construct_query.children[0]
-        self._result += f"{construct_str} "
+        self._write(f"{construct_str} ")
 
         value = construct_query.children[1]
         if value.data == "construct_construct_template":
-            self._construct_construct_template(value)
+            yield self._construct_construct_template(value)
         elif value.data == "construct_triples_template":
-            self._construct_triples_template(value)
+            yield self._construct_triples_template(value)
         else:
             raise ValueError(f"Unexpected construct_query value type: {value.data}")
 
     def _string(self, string: Tree):
-        self._result += f"{string.children[0].value} "
+        self._write(f"{string.children[0].value} ")
 
     def _aggregate(self, aggregate: Tree):
         for child in aggregate.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "expression":
-                    self._expression(child)
+                    yield self._expression(child)
                 elif child.data == "string":
                     self._string(child)
                 else:
@@ -750,23 +1029,23 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _regex_expression(self, regex_expression: Tree):
         regex_str = regex_expression.children[0].value
-        self._result += regex_str
+        self._write(regex_str)
         expressions = list(
             filter(
                 lambda x: isinstance(x, Tree) and x.data == "expression",
                 regex_expression.children,
             )
         )
-        self._expression_list_common(expressions)
+        yield self._expression_list_common(expressions)
 
     def _expression_list_common(self, expressions: list[Tree]):
-        self._result += "("
+        self._write("(")
         for i, expression in enumerate(expressions):
-            self._expression(expression)
+            yield self._expression(expression)
             if i + 1 != len(expressions):
-                self._result += ", "
+                self._write(", ")
 
-        self._result += ") "
+        self._write(") ")
 
     def _expression_list(self, expression_list: Tree):
         expressions = list(
@@ -775,28 +1054,28 @@ class SparqlSerializer(Visitor_Recursive):
                 expression_list.children,
             )
         )
-        self._expression_list_common(expressions)
+        return self._expression_list_common(expressions)
 
     def _exists_func(self, exists_func: Tree):
         exists_str = exists_func.children[0].value
-        self._result += f"{'\t' * self._indent}{exists_str}"
+        self._write(f"{self._tabs}{exists_str}")
         group_graph_pattern = exists_func.children[1]
-        self._group_graph_pattern(group_graph_pattern)
+        yield self._group_graph_pattern(group_graph_pattern)
 
     def _not_exists_func(self, not_exists_func: Tree):
         not_str = not_exists_func.children[0].value
         exists_str = not_exists_func.children[1].value
-        self._result += f"{'\t' * self._indent}{not_str} {exists_str}"
+        self._write(f"{self._tabs}{not_str} {exists_str}")
         group_graph_pattern = not_exists_func.children[2]
-        self._group_graph_pattern(group_graph_pattern)
+        yield self._group_graph_pattern(group_graph_pattern)
 
     def _substring_expression(self, substring_expression: Tree):
         for child in substring_expression.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "expression":
-                    self._expression(child)
+                    yield self._expression(child)
                 else:
                     raise ValueError(
                         f"Unexpected substring_expression value type: {child.data}"
@@ -809,10 +1088,10 @@ class SparqlSerializer(Visitor_Recursive):
     def _str_replace_expression(self, str_replace_expression):
         for child in str_replace_expression.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "expression":
-                    self._expression(child)
+                    yield self._expression(child)
                 else:
                     raise ValueError(
                         f"Unexpected str_replace_expression value type: {child.data}"
@@ -823,30 +1102,19 @@ class SparqlSerializer(Visitor_Recursive):
                 )
 
     def _built_in_call(self, built_in_call: Tree):
+        handlers = self._handlers["built_in_call"]
         for child in built_in_call.children:
-            if isinstance(child, Tree):
-                if child.data == "aggregate":
-                    self._aggregate(child)
-                elif child.data == "expression":
-                    self._expression(child)
-                elif child.data == "expression_list":
-                    self._expression_list(child)
-                elif child.data == "substring_expression":
-                    self._substring_expression(child)
-                elif child.data == "str_replace_expression":
-                    self._str_replace_expression(child)
-                elif child.data == "regex_expression":
-                    self._regex_expression(child)
-                elif child.data == "exists_func":
-                    self._exists_func(child)
-                elif child.data == "not_exists_func":
-                    self._not_exists_func(child)
-                else:
+            if isinstance(child, (Tree, Node)):
+                handler = handlers.get(child.data)
+                if handler is None:
                     raise ValueError(
                         f"Unexpected built_in_call tree value type: {child.data}"
                     )
+                nested = handler(self, child)
+                if nested is not None:
+                    yield nested
             elif isinstance(child, Token):
-                self._result += f"{child.value} "
+                self._write(f"{child.value} ")
             else:
                 raise TypeError(f"Unexpected built_in_call value type: {type(child)}")
 
@@ -855,41 +1123,27 @@ class SparqlSerializer(Visitor_Recursive):
             if child.data == "iri":
                 self._iri(child)
             elif child.data == "arg_list":
-                self._arg_list(child)
+                yield self._arg_list(child)
             else:
                 raise ValueError(f"Unexpected iri_or_function value type: {child.data}")
 
+    def _expression_term(self, term: Tree):
+        handler = self._handlers["expression_term"].get(term.data)
+        if handler is None:
+            raise ValueError(f"Unexpected expression value type: {term.data}")
+        nested = handler(self, term)
+        if nested is not None:
+            yield nested
+
     def _primary_expression(self, primary_expression: Tree):
-        value = primary_expression.children[0]
-
-        if value.data == "bracketted_expression":
-            self._bracketted_expression(value)
-        elif value.data == "built_in_call":
-            self._built_in_call(value)
-        elif value.data == "iri_or_function":
-            self._iri_or_function(value)
-        elif (
-            value.data == "rdf_literal"
-            or value.data == "numeric_literal"
-            or value.data == "boolean_literal"
-        ):
-            self._rdf_literal(value)
-        elif value.data == "var":
-            self._var(value)
-        else:
-            raise ValueError(f"Unexpected primary_expression value type: {value.data}")
+        return self._expression_term(primary_expression.children[0])
 
     def _unary_expression(self, unary_expression: Tree):
         for child in unary_expression.children:
             if isinstance(child, Token):
-                self._result += f"{child.value}"
-            elif isinstance(child, Tree):
-                if child.data == "primary_expression":
-                    self._primary_expression(child)
-                else:
-                    raise ValueError(
-                        f"Unexpected unary_expression value type: {child.data}"
-                    )
+                self._write(f"{child.value}")
+            elif isinstance(child, (Tree, Node)):
+                yield self._expression_term(child)
             else:
                 raise TypeError(
                     f"Unexpected unary_expression value type: {type(child)}"
@@ -898,14 +1152,9 @@ class SparqlSerializer(Visitor_Recursive):
     def _multiplicative_expression(self, multiplicative_expression: Tree):
         for child in multiplicative_expression.children:
             if isinstance(child, Token):
-                self._result += child.value
-            elif isinstance(child, Tree):
-                if child.data == "unary_expression":
-                    self._unary_expression(child)
-                else:
-                    raise ValueError(
-                        f"Unexpected multiplicative_expression value type: {child.data}"
-                    )
+                self._write(child.value)
+            elif isinstance(child, (Tree, Node)):
+                yield self._expression_term(child)
             else:
                 raise ValueError(
                     f"Unexpected multiplicative_expression value type: {type(child)}"
@@ -914,63 +1163,40 @@ class SparqlSerializer(Visitor_Recursive):
     def _additive_expression(self, additive_expression: Tree):
         for child in additive_expression.children:
             if isinstance(child, Token):
-                self._result += child.value
-            elif isinstance(child, Tree):
-                if child.data == "multiplicative_expression":
-                    self._multiplicative_expression(child)
-                elif (
-                    child.data == "numeric_literal_positive"
-                    or child.data == "numeric_literal_negative"
-                ):
-                    self._numeric_literal(child)
-                elif child.data == "unary_expression":
-                    self._unary_expression(child)
-                else:
-                    raise ValueError(
-                        f"Unexpected additive_expression value type: {child.data}"
-                    )
+                self._write(child.value)
+            elif isinstance(child, (Tree, Node)):
+                yield self._expression_term(child)
             else:
                 raise ValueError(
                     f"Unexpected additive_expression value type: {type(child)}"
                 )
 
     def _numeric_expression(self, numeric_expression: Tree):
-        additive_expression = numeric_expression.children[0]
-        self._additive_expression(additive_expression)
+        return self._expression_term(numeric_expression.children[0])
 
     def _relational_expression(self, relational_expression: Tree):
         for child in relational_expression.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "numeric_expression":
-                    self._numeric_expression(child)
-                elif child.data == "expression_list":
-                    self._expression_list(child)
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                if child.data == "expression_list":
+                    yield self._expression_list(child)
                 else:
-                    raise ValueError(
-                        f"Unexpected relational_expression value type: {child.data}"
-                    )
+                    yield self._expression_term(child)
             else:
                 raise TypeError(
                     f"Unexpected relational_expression value type: {type(child)}"
                 )
 
     def _value_logical(self, value_logical: Tree):
-        relational_expression = value_logical.children[0]
-        self._relational_expression(relational_expression)
+        return self._expression_term(value_logical.children[0])
 
     def _conditional_and_expression(self, conditional_and_expression: Tree):
         for child in conditional_and_expression.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "value_logical":
-                    self._value_logical(child)
-                else:
-                    raise ValueError(
-                        f"Unexpected _conditional_and_expression value type: {child.data}"
-                    )
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                yield self._expression_term(child)
             else:
                 raise ValueError(
                     f"Unexpected _conditional_and_expression value type: {type(child)}"
@@ -979,37 +1205,31 @@ class SparqlSerializer(Visitor_Recursive):
     def _conditional_or_expression(self, conditional_or_expression: Tree):
         for child in conditional_or_expression.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "conditional_and_expression":
-                    self._conditional_and_expression(child)
-                else:
-                    raise ValueError(
-                        f"Unexpected _conditional_or_expression value type: {child.data}"
-                    )
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                yield self._expression_term(child)
             else:
                 raise ValueError(
                     f"Unexpected _conditional_or_expression value type: {type(child)}"
                 )
 
     def _expression(self, expression: Tree):
-        conditional_or_expression = expression.children[0]
-        self._conditional_or_expression(conditional_or_expression)
+        return self._expression_term(expression.children[0])
 
     def _select_clause_expression_as_var(self, expression_as_var: Tree):
         expression = expression_as_var.children[0]
-        self._result += "("
-        self._expression(expression)
+        self._write("(")
+        yield self._expression(expression)
         as_str = expression_as_var.children[1].value
         var = get_var(expression_as_var.children[2])
-        self._result += f" {as_str} {var}) "
+        self._write(f" {as_str} {var}) ")
 
     def _select_clause_var_or_expression(self, select_clause_var_or_expression: Tree):
         value = select_clause_var_or_expression.children[0]
         if value.data == "var":
-            self._result += f"{get_var(value)} "
+            self._write(f"{get_var(value)} ")
         elif value.data == "select_clause_expression_as_var":
-            self._select_clause_expression_as_var(value)
+            yield self._select_clause_expression_as_var(value)
         else:
             raise ValueError(
                 f"Unexpected select_clause_var_or_expression value: {select_clause_var_or_expression.data}"
@@ -1019,8 +1239,8 @@ class SparqlSerializer(Visitor_Recursive):
         for child in select_clause.children:
             if isinstance(child, Token):
                 if child.value.lower() == "select":
-                    self._result += f"{'\t' * self._indent}"
-                self._result += f"{child.value} "
+                    self._write(self._tabs)
+                self._write(f"{child.value} ")
 
         select_clause_var_or_expressions = list(
             filter(
@@ -1032,44 +1252,45 @@ class SparqlSerializer(Visitor_Recursive):
         for i, select_clause_var_or_expression in enumerate(
             select_clause_var_or_expressions
         ):
-            self._select_clause_var_or_expression(select_clause_var_or_expression)
+            yield self._select_clause_var_or_expression(select_clause_var_or_expression)
             if i + 1 != len(select_clause_var_or_expressions):
-                self._result += " "
+                self._write(" ")
 
     def _rdf_literal(self, rdf_literal: Tree):
-        self._result += f"{get_rdf_literal(rdf_literal)} "
+        self._write(f"{get_rdf_literal(rdf_literal)} ")
 
     def _numeric_literal(self, numeric_literal: Tree):
-        self._result += f"{numeric_literal.children[0].children[0].value} "
+        if isinstance(numeric_literal, Literal):
+            self._write(f"{numeric_literal.value} ")
+        else:
+            self._write(f"{numeric_literal.children[0].children[0].value} ")
 
     def _blank_node(self, blank_node: Tree):
-        self._result += f"{blank_node.children[0].value} "
+        if isinstance(blank_node, BlankNode):
+            self._write(f"{blank_node.label} ")
+        else:
+            self._write(f"{blank_node.children[0].value} ")
 
     def _boolean_literal(self, boolean_literal: Tree):
-        self._result += f"{boolean_literal.children[0].children[0].value} "
+        if isinstance(boolean_literal, Literal):
+            self._write(f"{boolean_literal.value} ")
+        else:
+            self._write(f"{boolean_literal.children[0].children[0].value} ")
 
     def _graph_term(self, graph_term: Tree):
         value = graph_term.children[0]
         if isinstance(value, Token):
-            self._result += f"{value.value} "
+            self._write(f"{value.value} ")
         else:
-            if value.data == "iri":
-                self._iri(value)
-            elif value.data == "rdf_literal":
-                self._rdf_literal(value)
-            elif value.data == "numeric_literal":
-                self._numeric_literal(value)
-            elif value.data == "boolean_literal":
-                self._boolean_literal(value)
-            elif value.data == "blank_node":
-                self._blank_node(value)
-            else:
+            handler = self._handlers["graph_term"].get(value.data)
+            if handler is None:
                 raise ValueError(f"Unexpected graph_term value type: {value.data}")
+            handler(self, value)
 
     def _var_or_term(self, var_or_term: Tree):
         value = var_or_term.children[0]
         if value.data == "var":
-            self._result += f"{get_var(value)} "
+            self._write(f"{get_var(value)} ")
         elif value.data == "graph_term":
             self._graph_term(value)
         else:
@@ -1081,28 +1302,28 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _blank_node_property_list_path(self, blank_node_property_list_path: Tree):
         property_list_not_empty = blank_node_property_list_path.children[0]
-        self._result += "[\n"
+        self._write("[\n")
         self._indent += 1
-        self._result += f"{'\t' * self._indent}"
-        self._property_list_path_not_empty(property_list_not_empty)
+        self._write(self._tabs)
+        yield self._property_list_path_not_empty(property_list_not_empty)
         self._indent -= 1
-        self._result += f"\n{'\t' * self._indent}]\n"
+        self._write(f"\n{self._tabs}]\n")
 
     def _collection_path(self, collection_path: Tree):
-        self._result += "("
+        self._write("(")
         for child in collection_path.children:
             if child.data == "graph_node_path":
-                self._graph_node_path(child)
+                yield self._graph_node_path(child)
             else:
                 raise ValueError(f"Unexpected collection_path value type: {child.data}")
-        self._result += ")"
+        self._write(")")
 
     def _triples_node_path(self, triples_node_path: Tree):
         value = triples_node_path.children[0]
         if value.data == "collection_path":
-            self._collection_path(value)
+            yield self._collection_path(value)
         elif value.data == "blank_node_property_list_path":
-            self._blank_node_property_list_path(value)
+            yield self._blank_node_property_list_path(value)
         else:
             raise ValueError(f"Unexpected triples_node_path value type: {value.data}")
 
@@ -1111,18 +1332,18 @@ class SparqlSerializer(Visitor_Recursive):
         if value.data == "var_or_term":
             self._var_or_term(value)
         elif value.data == "triples_node_path":
-            self._triples_node_path(value)
+            yield self._triples_node_path(value)
         else:
             raise ValueError(f"Unexpected graph_node_path value type: {value.data}")
 
     def _object_path(self, object_path: Tree):
         graph_node_path = object_path.children[0]
-        self._graph_node_path(graph_node_path)
+        return self._graph_node_path(graph_node_path)
 
     def _object_list_path(self, object_list_path: Tree):
-        self._result += " "
+        self._write(" ")
         object_path = object_list_path.children[0]
-        self._object_path(object_path)
+        yield self._object_path(object_path)
 
         object_list_path_others = list(
             filter(
@@ -1130,30 +1351,30 @@ class SparqlSerializer(Visitor_Recursive):
             )
         )
         for object_path_other in object_list_path_others:
-            self._result += ", "
-            self._object_path(object_path_other.children[0])
+            self._write(", ")
+            yield self._object_path(object_path_other.children[0])
 
     def _path_mod(self, path_mod: Tree):
         symbol = path_mod.children[0].value
-        self._result += symbol
+        self._write(symbol)
 
     def _path_one_in_property_set(self, path_one_in_property_set: Tree):
         if len(path_one_in_property_set.children) == 2:
-            self._result += "^"
+            self._write("^")
             value = path_one_in_property_set.children[1]
         else:
             value = path_one_in_property_set.children[0]
 
-        if isinstance(value, Tree):
-            self._result += get_iri(value)
+        if isinstance(value, Token):
+            self._write("a")
         else:
-            self._result += "a"
+            self._write(get_iri(value))
 
     def _path_negated_property_set(self, path_negated_property_set: Tree):
         for child in path_negated_property_set.children:
             if isinstance(child, Token):
-                self._result += child.value
-            elif isinstance(child, Tree):
+                self._write(child.value)
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "path_one_in_property_set":
                     self._path_one_in_property_set(child)
                 else:
@@ -1169,23 +1390,23 @@ class SparqlSerializer(Visitor_Recursive):
         value = path_primary.children[0]
         if isinstance(value, Token):
             if value.type == "A":
-                self._result += "a "
-        elif isinstance(value, Tree):
+                self._write("a ")
+        elif isinstance(value, (Tree, Node)):
             if value.data == "iri":
                 self._iri(value)
             elif value.data == "path_negated_property_set":
-                self._result += "!"
+                self._write("!")
                 self._path_negated_property_set(value)
             elif value.data == "path":
-                self._result += "("
-                self._path(value)
-                self._result += ")"
+                self._write("(")
+                yield self._path(value)
+                self._write(")")
         else:
             raise ValueError(f"Unexpected path_primary value type: {type(value)}")
 
     def _path_elt(self, path_elt: Tree):
         path_primary = path_elt.children[0]
-        self._path_primary(path_primary)
+        yield self._path_primary(path_primary)
 
         if len(path_elt.children) == 2:
             path_mod = path_elt.children[1]
@@ -1199,11 +1420,11 @@ class SparqlSerializer(Visitor_Recursive):
     def _path_elt_or_inverse(self, path_elt_or_inverse: Tree):
         if len(path_elt_or_inverse.children) == 1:
             path_elt = path_elt_or_inverse.children[0]
-            self._path_elt(path_elt)
+            yield self._path_elt(path_elt)
         elif len(path_elt_or_inverse.children) == 2:
-            self._result += "^"
+            self._write("^")
             path_elt = path_elt_or_inverse.children[1]
-            self._path_elt(path_elt)
+            yield self._path_elt(path_elt)
         else:
             raise ValueError(
                 f"Unexpected path_elt_or_inverse children size: {len(path_elt_or_inverse.children)}"
@@ -1214,44 +1435,44 @@ class SparqlSerializer(Visitor_Recursive):
             filter(lambda x: x.data == "path_elt_or_inverse", path_sequence.children)
         )
         for i, path_elt_or_inverse_elt in enumerate(path_elt_or_inverses):
-            self._path_elt_or_inverse(path_elt_or_inverse_elt)
+            yield self._path_elt_or_inverse(path_elt_or_inverse_elt)
             if i + 1 != len(path_elt_or_inverses):
-                self._result += "/"
+                self._write("/")
 
     def _path_alternative(self, path_alternative: Tree):
         path_sequences = list(
             filter(lambda x: x.data == "path_sequence", path_alternative.children)
         )
         for i, path_sequence in enumerate(path_sequences):
-            self._path_sequence(path_sequence)
+            yield self._path_sequence(path_sequence)
             if i + 1 != len(path_sequences):
-                self._result += "|"
+                self._write("|")
 
     def _path(self, path: Tree):
         path_alternative = path.children[0]
-        self._path_alternative(path_alternative)
+        return self._path_alternative(path_alternative)
 
     def _verb_path(self, verb_path: Tree):
         path = verb_path.children[0]
-        self._path(path)
+        return self._path(path)
 
     def _collection(self, collection: Tree):
         graph_nodes = list(
             filter(lambda x: x.data == "graph_node", collection.children)
         )
-        self._result += "("
+        self._write("(")
 
         for graph_node in graph_nodes:
-            self._graph_node(graph_node)
+            yield self._graph_node(graph_node)
 
-        self._result += ")"
+        self._write(")")
 
     def _verb(self, verb: Tree):
         value = verb.children[0]
-        if isinstance(value, Tree):
+        if isinstance(value, (Tree, Node)):
             self._var_or_iri(value)
         elif isinstance(value, Token):
-            self._result += "a "
+            self._write("a ")
         else:
             raise TypeError(f"Unexpected value type: {type(value)}")
 
@@ -1259,7 +1480,7 @@ class SparqlSerializer(Visitor_Recursive):
         verb = verb_object_list.children[0]
         object_list = verb_object_list.children[1]
         self._verb(verb)
-        self._object_list(object_list)
+        yield self._object_list(object_list)
 
     def _property_list_not_empty(self, property_list_not_empty: Tree):
         verb_object_lists = list(
@@ -1268,22 +1489,22 @@ class SparqlSerializer(Visitor_Recursive):
             )
         )
         for i, verb_object_list in enumerate(verb_object_lists):
-            self._verb_object_list(verb_object_list)
+            yield self._verb_object_list(verb_object_list)
             if i + 1 != len(verb_object_lists):
-                self._result += "; "
+                self._write("; ")
 
     def _blank_node_property_list(self, blank_node_property_list: Tree):
-        self._result += "["
+        self._write("[")
         value = blank_node_property_list.children[0]
-        self._property_list_not_empty(value)
-        self._result += "]"
+        yield self._property_list_not_empty(value)
+        self._write("]")
 
     def _triples_node(self, triples_node: Tree):
         value = triples_node.children[0]
         if value.data == "collection":
-            self._collection(value)
+            yield self._collection(value)
         elif value.data == "blank_node_property_list":
-            self._blank_node_property_list(value)
+            yield self._blank_node_property_list(value)
         else:
             raise ValueError(f"Unexpected triples_node value type: {value.data}")
 
@@ -1292,27 +1513,27 @@ class SparqlSerializer(Visitor_Recursive):
         if value.data == "var_or_term":
             self._var_or_term(value)
         elif value.data == "triples_node":
-            self._triples_node(value)
+            yield self._triples_node(value)
         else:
             raise ValueError(f"Unexpected graph_node value type: {value.data}")
 
     def _object(self, obj: Tree):
         graph_node = obj.children[0]
-        self._graph_node(graph_node)
+        return self._graph_node(graph_node)
 
     def _object_list(self, object_list):
         objects = list(filter(lambda x: x.data == "object", object_list.children))
         for i, obj in enumerate(objects):
-            self._object(obj)
+            yield self._object(obj)
             if i + 1 != len(objects):
-                self._result += ", "
+                self._write(", ")
 
     def _property_list_path_not_empty_rest(
         self, property_list_path_not_empty_rest: Tree
     ):
         first_value = property_list_path_not_empty_rest.children[0]
         if first_value.data == "verb_path":
-            self._verb_path(first_value)
+            yield self._verb_path(first_value)
         elif first_value.data == "verb_simple":
             self._verb_simple(first_value)
         else:
@@ -1321,30 +1542,32 @@ class SparqlSerializer(Visitor_Recursive):
             )
 
         object_list = property_list_path_not_empty_rest.children[1]
-        self._object_list(object_list)
+        yield self._object_list(object_list)
 
     def _property_list_path_not_empty_other(
         self, property_list_path_not_empty_other: Tree
     ):
-        self._result += f";\n{'\t' * (self._indent + 1)}"
+        self._write(f";\n{_tabs(self._indent + 1)}")
 
         if property_list_path_not_empty_other.children:
             property_list_path_not_empty_rest = (
                 property_list_path_not_empty_other.children[0]
             )
-            self._property_list_path_not_empty_rest(property_list_path_not_empty_rest)
+            yield self._property_list_path_not_empty_rest(
+                property_list_path_not_empty_rest
+            )
 
     def _property_list_path_not_empty(self, property_list_path_not_empty: Tree):
         first_value = property_list_path_not_empty.children[0]
         if first_value.data == "verb_path":
-            self._verb_path(first_value)
+            yield self._verb_path(first_value)
         elif first_value.data == "verb_simple":
             self._verb_simple(first_value)
         else:
             raise ValueError(f"Unexpected first_value value type: {first_value.data}")
 
         object_list_path = property_list_path_not_empty.children[1]
-        self._object_list_path(object_list_path)
+        yield self._object_list_path(object_list_path)
 
         property_list_path_not_empty_others = list(
             filter(
@@ -1353,57 +1576,59 @@ class SparqlSerializer(Visitor_Recursive):
             )
         )
         for property_list_not_empty_other in property_list_path_not_empty_others:
-            self._property_list_path_not_empty_other(property_list_not_empty_other)
+            yield self._property_list_path_not_empty_other(
+                property_list_not_empty_other
+            )
 
     def _property_list_path(self, property_list_path: Tree):
         if len(property_list_path.children) == 1:
             self._indent += 1
             property_list_path_not_empty = property_list_path.children[0]
-            self._property_list_path_not_empty(property_list_path_not_empty)
+            yield self._property_list_path_not_empty(property_list_path_not_empty)
             self._indent += 1
 
     def _triples_same_subject_path(self, triples_same_subject_path: Tree):
-        self._result += f"{'\t' * self._indent}"
+        self._write(self._tabs)
         first_value = triples_same_subject_path.children[0]
         second_value = triples_same_subject_path.children[1]
 
         if first_value.data == "var_or_term":
             self._var_or_term(first_value)
-            self._property_list_path_not_empty(second_value)
+            yield self._property_list_path_not_empty(second_value)
         elif first_value.data == "triples_node_path":
-            self._triples_node_path(first_value)
-            self._property_list_path(second_value)
+            yield self._triples_node_path(first_value)
+            yield self._property_list_path(second_value)
         else:
             raise ValueError(f"Unexpected first value value type: {first_value.data}")
 
     def _triples_block(self, triples_block: Tree):
-        triples_same_subject_path = triples_block.children[0]
-        self._triples_same_subject_path(triples_same_subject_path)
-
-        if len(triples_block.children) > 1:
-            self._result += " .\n"
-            second_triples_block = triples_block.children[1]
-            self._triples_block(second_triples_block)
+        for i, triples_same_subject_path in enumerate(triples_block.children):
+            if isinstance(triples_same_subject_path, TriplePattern):
+                self._triple_pattern(triples_same_subject_path)
+            else:
+                yield self._triples_same_subject_path(triples_same_subject_path)
+            if i + 1 != len(triples_block.children):
+                self._write(" .\n")
 
     def _optional_graph_pattern(self, optional_graph_pattern: Tree):
         optional_str = optional_graph_pattern.children[0].value
-        self._result += f"{'\t' * self._indent}{optional_str} "
+        self._write(f"{self._tabs}{optional_str} ")
 
         group_graph_pattern = optional_graph_pattern.children[1]
-        self._group_graph_pattern(group_graph_pattern)
+        yield self._group_graph_pattern(group_graph_pattern)
 
     def _inline_data(self, inline_data: Tree):
         values_str = inline_data.children[0]
-        self._result += f"{'\t' * self._indent}{values_str} "
+        self._write(f"{self._tabs}{values_str} ")
         data_block = inline_data.children[1]
         self._data_block(data_block)
-        self._result += "\n"
+        self._write("\n")
 
     def _var(self, var: Tree):
-        self._result += f"{get_var(var)} "
+        self._write(f"{get_var(var)} ")
 
     def _iri(self, iri: Tree):
-        self._result += f"{get_iri(iri)} "
+        self._write(f"{get_iri(iri)} ")
 
     def _var_or_iri(self, var_or_iri: Tree):
         value = var_or_iri.children[0]
@@ -1416,21 +1641,21 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _graph_graph_pattern(self, graph_graph_pattern: Tree):
         graph_str = graph_graph_pattern.children[0]
-        self._result += f"{'\t' * self._indent}{graph_str} "
+        self._write(f"{self._tabs}{graph_str} ")
 
         var_or_iri = graph_graph_pattern.children[1]
         self._var_or_iri(var_or_iri)
 
         group_graph_pattern = graph_graph_pattern.children[2]
-        self._group_graph_pattern(group_graph_pattern)
+        yield self._group_graph_pattern(group_graph_pattern)
 
     def _group_or_union_graph_pattern(self, group_or_union_graph_pattern: Tree):
         for child in group_or_union_graph_pattern.children:
             if isinstance(child, Token):
-                self._result += f"{'\t' * self._indent}{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{self._tabs}{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "group_graph_pattern":
-                    self._group_graph_pattern(child)
+                    yield self._group_graph_pattern(child)
                 else:
                     raise ValueError(
                         f"Unexpected group_graph_pattern value type: {child.data}"
@@ -1442,22 +1667,22 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _bracketted_expression(self, bracketted_expression: Tree):
         expression = bracketted_expression.children[0]
-        self._result += "("
-        self._expression(expression)
-        self._result += ")"
+        self._write("(")
+        yield self._expression(expression)
+        self._write(")")
 
     def _arg_list(self, arg_list: Tree):
         for i, child in enumerate(arg_list.children):
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "expression":
                     # TODO: For some reason, lark won't extract the COMMA token.
                     #   Workaround is to add our own comma for now.
-                    self._expression(child)
+                    yield self._expression(child)
                     next_child = arg_list.children[i + 1]
                     if isinstance(next_child, Tree) and next_child.data == "expression":
-                        self._result += ", "
+                        self._write(", ")
                 else:
                     raise ValueError(f"Unexpected arg_list value type: {child.data}")
             else:
@@ -1467,55 +1692,53 @@ class SparqlSerializer(Visitor_Recursive):
         iri = function_call.children[0]
         arg_list = function_call.children[1]
         self._iri(iri)
-        self._arg_list(arg_list)
+        yield self._arg_list(arg_list)
 
     def _constraint(self, constraint: Tree):
         value = constraint.children[0]
-        if value.data == "bracketted_expression":
-            self._bracketted_expression(value)
-        elif value.data == "built_in_call":
-            self._built_in_call(value)
-        elif value.data == "function_call":
-            self._function_call(value)
-        else:
+        handler = self._handlers["constraint"].get(value.data)
+        if handler is None:
             raise ValueError(f"Unexpected constraint value type: {value.data}")
+        nested = handler(self, value)
+        if nested is not None:
+            yield nested
 
     def _filter(self, filter_: Tree):
         filter_str = filter_.children[0]
-        self._result += f"{'\t' * self._indent}{filter_str} "
+        self._write(f"{self._tabs}{filter_str} ")
 
         constraint = filter_.children[1]
-        self._constraint(constraint)
-        self._result += "\n"
+        yield self._constraint(constraint)
+        self._write("\n")
 
     def _bind(self, bind: Tree):
         bind_str = bind.children[0].value
-        self._result += f"{'\t' * self._indent}{bind_str} "
-        self._result += "("
+        self._write(f"{self._tabs}{bind_str} ")
+        self._write("(")
         expression = bind.children[1]
-        self._expression(expression)
+        yield self._expression(expression)
         as_str = bind.children[2].value
         var = get_var(bind.children[3])
-        self._result += f" {as_str} {var})\n"
+        self._write(f" {as_str} {var})\n")
 
     def _minus_graph_pattern(self, minus_graph_pattern: Tree):
         minus_str = minus_graph_pattern.children[0].value
-        self._result += f"{'\t' * self._indent}{minus_str} "
+        self._write(f"{self._tabs}{minus_str} ")
         group_graph_pattern = minus_graph_pattern.children[1]
-        self._group_graph_pattern(group_graph_pattern)
+        yield self._group_graph_pattern(group_graph_pattern)
 
     def _service_graph_pattern(self, service_graph_pattern: Tree):
         for child in service_graph_pattern.children:
             if isinstance(child, Token):
                 if child.value.lower() == "service":
-                    self._result += f"{'\t' * self._indent}{child.value} "
+                    self._write(f"{self._tabs}{child.value} ")
                 else:
-                    self._result += f"{child.value} "
-            elif isinstance(child, Tree):
+                    self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "var_or_iri":
                     self._var_or_iri(child)
                 elif child.data == "group_graph_pattern":
-                    self._group_graph_pattern(child)
+                    yield self._group_graph_pattern(child)
                 else:
                     raise ValueError(
                         f"Unexpected service_graph_pattern value type: {child.data}"
@@ -1527,47 +1750,35 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _graph_pattern_not_triples(self, graph_pattern_not_triples: Tree):
         value = graph_pattern_not_triples.children[0]
-        if value.data == "group_or_union_graph_pattern":
-            self._group_or_union_graph_pattern(value)
-        elif value.data == "optional_graph_pattern":
-            self._optional_graph_pattern(value)
-        elif value.data == "minus_graph_pattern":
-            self._minus_graph_pattern(value)
-        elif value.data == "graph_graph_pattern":
-            self._graph_graph_pattern(value)
-        elif value.data == "service_graph_pattern":
-            self._service_graph_pattern(value)
-        elif value.data == "filter":
-            self._filter(value)
-        elif value.data == "bind":
-            self._bind(value)
-        elif value.data == "inline_data":
-            self._inline_data(value)
-        else:
+        handler = self._handlers["graph_pattern_not_triples"].get(value.data)
+        if handler is None:
             raise ValueError(
                 f"Unexpected graph_pattern_not_triples value type: {value.data}"
             )
+        nested = handler(self, value)
+        if nested is not None:
+            yield nested
 
     def _group_graph_pattern_sub_other(self, group_graph_pattern_sub_other: Tree):
-        self._result += "\n"
+        self._write("\n")
         for child in group_graph_pattern_sub_other.children:
-            if isinstance(child, Tree):
+            if isinstance(child, (Tree, Node)):
                 if child.data == "graph_pattern_not_triples":
-                    self._graph_pattern_not_triples(child)
+                    yield self._graph_pattern_not_triples(child)
                 elif child.data == "triples_block":
-                    self._triples_block(child)
+                    yield self._triples_block(child)
             elif isinstance(child, Token):
                 if child.type == "DOT":
-                    self._result += f"{'\t' * self._indent}.\n"
+                    self._write(f"{self._tabs}.\n")
             else:
                 raise TypeError(f"Unexpected child type: {type(child)}")
 
     def _group_graph_pattern_sub(self, group_graph_pattern_sub: Tree):
         for child in group_graph_pattern_sub.children:
             if child.data == "triples_block":
-                self._triples_block(child)
+                yield self._triples_block(child)
             elif child.data == "group_graph_pattern_sub_other":
-                self._group_graph_pattern_sub_other(child)
+                yield self._group_graph_pattern_sub_other(child)
             else:
                 raise ValueError(
                     f"Unexpected group_graph_pattern_sub_other value type: {child.data}"
@@ -1575,37 +1786,37 @@ class SparqlSerializer(Visitor_Recursive):
 
     def _sub_select(self, sub_select: Tree):
         select_clause = sub_select.children[0]
-        self._select_clause(select_clause)
+        yield self._select_clause(select_clause)
 
         where_clause = sub_select.children[1]
-        self._where_clause(where_clause)
+        yield self._where_clause(where_clause)
 
         solution_modifier = sub_select.children[2]
-        self._solution_modifier(solution_modifier)
+        yield self._solution_modifier(solution_modifier)
 
         values_clause = sub_select.children[3]
         self._values_clause(values_clause)
 
     def _group_graph_pattern(self, group_graph_pattern: Tree):
         self._indent += 1
-        self._result += f"{'\t' * (self._indent - 1)}{{\n"
+        self._write(f"{_tabs(self._indent - 1)}{{\n")
 
         value = group_graph_pattern.children[0]
         if value.data == "sub_select":
-            self._sub_select(value)
+            yield self._sub_select(value)
         elif value.data == "group_graph_pattern_sub":
-            self._group_graph_pattern_sub(value)
+            yield self._group_graph_pattern_sub(value)
         else:
             raise ValueError(f"Unexpected group_graph_pattern value type: {value.data}")
 
-        self._result += f"\n{'\t' * (self._indent - 1)}}}\n"
+        self._write(f"\n{_tabs(self._indent - 1)}}}\n")
         self._indent -= 1
 
     def _where_clause(self, where_clause: Tree):
         if len(where_clause.children) == 2:
             where_str = where_clause.children[0].value
             group_graph_pattern = where_clause.children[1]
-            self._result += f"\n{'\t' * self._indent}{where_str} "
+            self._write(f"\n{self._tabs}{where_str} ")
         elif len(where_clause.children) == 1:
             group_graph_pattern = where_clause.children[0]
         else:
@@ -1613,31 +1824,36 @@ class SparqlSerializer(Visitor_Recursive):
                 f"Unexpected where_clause children count: {len(where_clause.children)}"
             )
 
-        self._group_graph_pattern(group_graph_pattern)
+        yield self._group_graph_pattern(group_graph_pattern)
 
     def _select_query(self, select_query: Tree):
-        select_clause = select_query.children[0]
-        self._select_clause(select_clause)
-        dataset_clauses = list(
-            filter(lambda x: x.data == "dataset_clause", select_query.children)
-        )
+        if isinstance(select_query, SelectQuery):
+            select_clause = select_query.select_clause
+            dataset_clauses = select_query.dataset_clauses
+            where_clause = select_query.where_clause
+            solution_modifier = select_query.solution_modifier
+        else:
+            select_clause = select_query.children[0]
+            dataset_clauses = list(
+                filter(lambda x: x.data == "dataset_clause", select_query.children)
+            )
+            where_clause = list(
+                filter(lambda x: x.data == "where_clause", select_query.children)
+            )[0]
+            solution_modifier = list(
+                filter(lambda x: x.data == "solution_modifier", select_query.children)
+            )[0]
+
+        yield self._select_clause(select_clause)
         for dataset_clause in dataset_clauses:
             self._dataset_clause(dataset_clause)
-
-        where_clause = list(
-            filter(lambda x: x.data == "where_clause", select_query.children)
-        )[0]
-        self._where_clause(where_clause)
-
-        solution_modifier = list(
-            filter(lambda x: x.data == "solution_modifier", select_query.children)
-        )[0]
-        self._solution_modifier(solution_modifier)
+        yield self._where_clause(where_clause)
+        yield self._solution_modifier(solution_modifier)
 
     def _values_clause(self, values_clause: Tree):
         if values_clause.children:
             values_str = values_clause.children[0]
-            self._result += f"{values_str} "
+            self._write(f"{values_str} ")
 
             data_block = values_clause.children[1]
             self._data_block(data_block)
@@ -1654,20 +1870,14 @@ class SparqlSerializer(Visitor_Recursive):
     def _data_block_value(self, data_block_value: Tree):
         for child in data_block_value.children:
             if isinstance(child, Token):
-                self._result += f"{child.value} "
-            elif isinstance(child, Tree):
-                if child.data == "iri":
-                    self._iri(child)
-                elif (
-                    child.data == "rdf_literal"
-                    or child.data == "numeric_literal"
-                    or child.data == "boolean_literal"
-                ):
-                    self._rdf_literal(child)
-                else:
+                self._write(f"{child.value} ")
+            elif isinstance(child, (Tree, Node)):
+                handler = self._handlers["data_block_value"].get(child.data)
+                if handler is None:
                     raise ValueError(
                         f"Unexpected data_block_value value type: {child.data}"
                     )
+                handler(self, child)
             else:
                 raise TypeError(
                     f"Unexpected data_block_value value type: {type(child)}"
@@ -1677,12 +1887,14 @@ class SparqlSerializer(Visitor_Recursive):
         for i, child in enumerate(inline_data_one_var.children):
             if isinstance(child, Token):
                 if child.value == "{":
-                    self._result += "{\n"
+                    self._write("{\n")
                 elif child.value == "}":
-                    self._result += f"\n{'\t' * self._indent}}}"
-            elif isinstance(child, Tree):
+                    self._write(f"\n{self._tabs}}}")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "var":
                     self._var(child)
+                elif child.data == "data_block_values":
+                    self._data_block_values_one_var(child)
                 elif child.data == "data_block_value":
                     self._indent += 1
                     next_child = inline_data_one_var.children[i + 1]
@@ -1690,19 +1902,40 @@ class SparqlSerializer(Visitor_Recursive):
                         isinstance(next_child, Tree)
                         and next_child.data == "data_block_value"
                     ):
-                        self._result += f"{'\t' * self._indent}"
+                        self._write(self._tabs)
 
                     self._data_block_value(child)
                     self._indent -= 1
 
+    def _data_block_values_one_var(self, data_block_values: DataBlockValues):
+        # The same output as the data_block_value children it replaces. Every value but
+        # the last is indented.
+        values = data_block_values.rows
+        if values:
+            tabs = _tabs(self._indent + 1)
+            self._write("".join([f"{tabs}{value} " for value in values[:-1]]))
+            self._write(f"{values[-1]} ")
+
+    def _data_block_values_full(self, data_block_values: DataBlockValues):
+        # The same output as the data_block_value_group children it replaces.
+        tabs = self._tabs
+        self._write(
+            "".join(
+                [
+                    f"{tabs}({' '.join(row)} )\n" if row else f"{tabs}()\n"
+                    for row in data_block_values.rows
+                ]
+            )
+        )
+
     def _data_block_value_group(self, data_block_value_group: Tree):
         for child in data_block_value_group.children:
             if isinstance(child, Token):
                 if child.value == "(":
-                    self._result += f"{'\t' * self._indent}("
+                    self._write(f"{self._tabs}(")
                 else:
-                    self._result += f"{child.value}\n"
-            elif isinstance(child, Tree):
+                    self._write(f"{child.value}\n")
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "data_block_value":
                     self._data_block_value(child)
                 else:
@@ -1715,22 +1948,24 @@ class SparqlSerializer(Visitor_Recursive):
             self._indent += 1
             if isinstance(child, Token):
                 if child.value == "{":
-                    self._result += "{\n"
+                    self._write("{\n")
                 elif child.value == "}":
-                    self._result += f"{'\t' * (self._indent - 1)}}}"
+                    self._write(f"{_tabs(self._indent - 1)}}}")
                 elif child.value == "(":
-                    self._result += f"{child.value}"
+                    self._write(f"{child.value}")
                 elif child.value == ")":
-                    self._result += f"{child.value} "
+                    self._write(f"{child.value} ")
                 elif child.value == "()":
-                    self._result += f"{child.value} "
+                    self._write(f"{child.value} ")
                 else:
                     raise ValueError(f"Unexpected data block value: {child.value}")
-            elif isinstance(child, Tree):
+            elif isinstance(child, (Tree, Node)):
                 if child.data == "var":
                     self._var(child)
                 elif child.data == "data_block_value_group":
                     self._data_block_value_group(child)
+                elif child.data == "data_block_values":
+                    self._data_block_values_full(child)
                 else:
                     raise ValueError(
                         f"Unexpected inline_data_full value type: {child.data}"
@@ -1743,65 +1978,116 @@ class SparqlSerializer(Visitor_Recursive):
             self._indent -= 1
 
 
-class _SparqlSerializer(Visitor_Recursive):
+SparqlSerializer._build_handlers()
+
+
+class _CountingSerializer(SparqlSerializer):
+    # Counts the calls of each handler, for sparql.instrumentation.
+    def __init__(self, calls: Counter):
+        super().__init__()
+        self._calls = calls
+
+
+def _counting(rule: str, handler: Callable) -> Callable:
+    def counting_handler(self, *args):
+        self._calls[rule] += 1
+        return handler(self, *args)
+
+    return counting_handler
+
+
+for _name, _handler in list(vars(SparqlSerializer).items()):
+    if isinstance(_handler, FunctionType) and (
+        _name in ("query_unit", "update_unit")
+        or _name.startswith("_")
+        and not _name.startswith("__")
+        and _name not in ("_run", "_write_buffered")
+    ):
+        setattr(_CountingSerializer, _name, _counting(_name.lstrip("_"), _handler))
+_CountingSerializer._build_handlers()
+
+
+def _serialize(sparql_serializer: SparqlSerializer, tree: Tree) -> str:
+    sparql_serializer.serialize(tree)
+    return sparql_serializer.result
+
+
+def serialize(tree: Tree) -> str:
+    """Serialize a parse tree to a string.
+
+    :param tree: A query_unit or update_unit tree, or the unit tree of the unified parser.
+    :return: The formatted query or update request.
+    """
+    profile = current_profile()
+    if profile is None:
+        return _serialize(SparqlSerializer(), tree)
+    return profile.time(
+        "serialize", _serialize, _CountingSerializer(profile.handlers), tree
+    )
+
+
+class _SparqlSerializer(Visitor):
     def __init__(self):
-        self._result = ""
+        self._chunks: list[str] = []
+        self._write = self._chunks.append
         super().__init__()
         self._indent = 0
 
     @property
-    def result(self):
-        return self._result
+    def result(self) -> str:
+        if len(self._chunks) != 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0]
 
     def base(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def prefix(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def pname_ns(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def iriref(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def prefixed_name(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def values_clause(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def var(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def left_curly_brace(self, node: Tree):
-        self._result += " {\n"
+        self._write(" {\n")
         self._indent += 1
 
     def right_curly_brace(self, node: Tree):
-        self._result += "\n} "
+        self._write("\n} ")
         self._indent -= 1
 
     def left_parenthesis(self, node: Tree):
-        self._result += "("
+        self._write("(")
 
     def right_parenthesis(self, node: Tree):
-        self._result += ")"
+        self._write(")")
 
     def string(self, node: Tree):
-        self._result += node.children[0].value
+        self._write(node.children[0].value)
 
     def langtag(self, node: Tree):
-        self._result += f"{node.children[0].value} "
+        self._write(f"{node.children[0].value} ")
 
     def datatype(self, node: Tree):
-        self._result += "^^"
+        self._write("^^")
 
     def undef(self, node: Tree):
-        self._result += "UNDEF "
+        self._write("UNDEF ")
 
     def numeric_literal(self, node: Tree):
-        self._result += f"{node.children[0].children[0].value} "
+        self._write(f"{node.children[0].children[0].value} ")
 
     def boolean_literal(self, node: Tree):
-        self._result += f"{node.children[0].children[0].value} "
+        self._write(f"{node.children[0].children[0].value} ")
@@ -0,0 +1,139 @@
+import re
+from typing import Iterator, TextIO
+
+from lark import Tree
+
+from sparql.instrumentation import count_rules, timed
+from sparql.parser import get_parser
+
+CHUNK_SIZE = 65536
+
+_SPECIAL_CHARACTERS = re.compile(r"['\"<#{};]")
+_IRIREF = re.compile(r"<[^<>\"{}|^`\\\x00-\x20]*>")
+_IRIREF_PREFIX = re.compile(r"<[^<>\"{}|^`\\\x00-\x20]*")
+_NEWLINE = re.compile(r"[\n\r]")
+_STRINGS = {
+    "'''": re.compile(r"'''(?:[^'\\]|\\.|'(?!''))*'''", re.DOTALL),
+    '"""': re.compile(r'"""(?:[^"\\]|\\.|"(?!""))*"""', re.DOTALL),
+    "'": re.compile(r"'(?:[^'\\\n\r]|\\.)*'"),
+    '"': re.compile(r'"(?:[^"\\\n\r]|\\.)*"'),
+}
+
+
+def iter_updates(text_or_stream: str | TextIO) -> Iterator[Tree]:
+    """Parse a SPARQL 1.1 Update request one operation at a time.
+
+    The request is split on the semicolons between operations without parsing it, and
+    each operation is parsed as soon as it has been read. Only the current operation is
+    held in memory, so a stream is read in chunks rather than all at once.
+
+    Each tree is an update_unit with the prologue written before the operation and the
+    operation itself, and can be serialized on its own. Joining the serialized operations
+    with "; " gives the serialization of the whole request. Prefixes declared by earlier
+    operations stay in scope, but are not repeated in later trees.
+
+    An empty request, or the text after a trailing semicolon, yields an update_unit
+    without an operation.
+
+    :param text_or_stream: The request as a string, or a text stream to read it from.
+    :return: An iterator of update_unit trees, one per operation.
+    :raises ValueError: If a semicolon is not preceded by an operation.
+    """
+    parser = get_parser("update_unit")
+
+    for segment, is_last in _split_operations(text_or_stream):
+        tree = timed("parse", parser.parse, segment)
+        count_rules(tree)
+        if not is_last and len(tree.children[0].children) < 2:
+            raise ValueError(f"Unexpected ';' after {segment.strip()!r}")
+        yield tree
+
+
+def _split_operations(text_or_stream: str | TextIO) -> Iterator[tuple[str, bool]]:
+    # Yield the text between the semicolons that are outside of braces, strings, IRIs and
+    # comments, and whether it is the last segment. The current segment starts at start in
+    # the buffer, and the segments before it are only dropped when more input is read.
+    if isinstance(text_or_stream, str):
+        buffer, stream = text_or_stream, None
+    else:
+        buffer, stream = "", text_or_stream
+
+    start = 0
+    position = 0
+    depth = 0
+
+    while True:
+        match = _SPECIAL_CHARACTERS.search(buffer, position)
+        if match is None:
+            if stream is None:
+                yield buffer[start:], True
+                return
+            position = len(buffer) - start
+            buffer, stream = _read(buffer[start:], stream)
+            start = 0
+            continue
+
+        position = match.start()
+        char = match.group()
+
+        if char == "{":
+            depth += 1
+            position += 1
+        elif char == "}":
+            depth -= 1
+            position += 1
+        elif char == ";":
+            if depth == 0:
+                yield buffer[start:position], False
+                position += 1
+                start = position
+            else:
+                position += 1
+        else:
+            end = _skip(char, buffer, position, stream is None)
+            if end is None:
+                position -= start
+                buffer, stream = _read(buffer[start:], stream)
+                start = 0
+            else:
+                position = end
+
+
+def _read(buffer: str, stream: TextIO) -> tuple[str, TextIO | None]:
+    chunk = stream.read(CHUNK_SIZE)
+    if not chunk:
+        return buffer, None
+    return buffer + chunk, stream
+
+
+def _skip(char: str, buffer: str, position: int, eof: bool) -> int | None:
+    # Return the position after the comment, string or IRI that starts at the position,
+    # or None if more input is needed to know where it ends.
+    if char == "#":
+        end = buffer.find("\n", position)
+        if end == -1:
+            return len(buffer) if eof else None
+        return end + 1
+
+    if char == "<":
+        match = _IRIREF.match(buffer, position)
+        if match is not None:
+            return match.end()
+        if not eof and _IRIREF_PREFIX.match(buffer, position).end() == len(buffer):
+            return None
+        # A less-than operator.
+        return position + 1
+
+    if len(buffer) - position < 3 and not eof:
+        return None
+
+    quote = char * 3 if buffer.startswith(char * 3, position) else char
+    match = _STRINGS[quote].match(buffer, position)
+    if match is not None:
+        return match.end()
+    if eof:
+        # An unterminated string, which fails to parse.
+        return len(buffer)
+    if len(quote) == 3 or _NEWLINE.search(buffer, position) is None:
+        return None
+    return position + 1
@@ -0,0 +1,296 @@
+import re
+from functools import cache
+from typing import Callable, Iterator
+
+from lark import Token, Tree
+
+from sparql import parser
+from sparql.ast import DataBlockValues
+from sparql.instrumentation import count_rules, timed
+
+# Large VALUES blocks are read by a scanner instead of the parser. The query is lexed with
+# the grammar's own terminals to find the VALUES keywords outside of strings, IRIs and
+# comments, and the rows of each data block are read into a DataBlockValues node in a
+# single pass. The rows are then blanked out of the query, keeping its line breaks so
+# that the positions of the other tokens do not change, and the rest is parsed as usual.
+
+_STRINGS = (
+    "STRING_LITERAL_LONG1",
+    "STRING_LITERAL_LONG2",
+    "STRING_LITERAL1",
+    "STRING_LITERAL2",
+)
+_IRIS = ("IRIREF", "PNAME_LN", "PNAME_NS")
+_NUMERIC_LITERALS = (
+    "DOUBLE_POSITIVE",
+    "DECIMAL_POSITIVE",
+    "INTEGER_POSITIVE",
+    "DOUBLE_NEGATIVE",
+    "DECIMAL_NEGATIVE",
+    "INTEGER_NEGATIVE",
+    "DOUBLE",
+    "DECIMAL",
+    "INTEGER",
+)
+
+_IGNORE = r"(?:[ \t\n]+|#[^\n]*)"
+
+_VALUES_KEYWORD = re.compile("VALUES", re.IGNORECASE)
+
+
+class _NotValues(Exception):
+    pass
+
+
+def _terminals(names: tuple[str, ...]) -> str:
+    unified_parser = parser.get_unified_parser()
+    return "|".join(
+        unified_parser.get_terminal(name).pattern.to_regexp() for name in names
+    )
+
+
+@cache
+def _token_pattern() -> re.Pattern:
+    # The tokens that may contain the word VALUES, so that it is only found as a keyword.
+    # Any other character is a token of its own, so that the whole query can be scanned.
+    return re.compile(
+        f"(?P<IGNORE>{_IGNORE}+)"
+        f"|(?P<STRING>{_terminals(_STRINGS)})"
+        f"|(?P<IRI>{_terminals(_IRIS)})"
+        f"|(?P<VAR>{_terminals(('VAR1', 'VAR2'))})"
+        f"|(?P<LANGTAG>{_terminals(('LANGTAG',))})"
+        f"|(?P<NIL>{_terminals(('NIL',))})"
+        r"|(?P<PUNCTUATION>[(){}])"
+        r"|(?P<WORD>[A-Za-z]+)"
+        r"|(?P<OTHER>[\s\S])"
+    )
+
+
+@cache
+def _value_pattern() -> re.Pattern:
+    # A punctuation or a data block value, with the language tag or datatype of a string,
+    # after any whitespace and comments. As in sparql.data, prefixed names are tried
+    # before the keywords, and the longer numeric literals before the shorter ones.
+    return re.compile(
+        f"{_IGNORE}*+(?:"
+        f"(?P<PUNCTUATION>{_terminals(('NIL',))}|[(){{}}])"
+        f"|(?P<VALUE>{_terminals(_IRIS + _NUMERIC_LITERALS)}"
+        r"|(?:UNDEF|true|false)(?![A-Za-z0-9_]))"
+        f"|(?P<STRING>{_terminals(_STRINGS)})"
+        f"(?:{_IGNORE}*+(?:(?P<LANGTAG>{_terminals(('LANGTAG',))})"
+        f"|\\^\\^{_IGNORE}*+(?P<DATATYPE>{_terminals(_IRIS)})))?"
+        ")"
+    )
+
+
+@cache
+def _row_pattern(width: int) -> re.Pattern:
+    # A row of width values, each written without whitespace or comments inside it, which
+    # is the usual case. Each value is an atomic group, so it is matched as the lexer
+    # would read it, and the row is the tuple of the groups of the match.
+    value = (
+        f"(?>{_terminals(_STRINGS)})"
+        f"(?:{_terminals(('LANGTAG',))}|\\^\\^(?:{_terminals(_IRIS)}))?"
+        f"|{_terminals(_IRIS + _NUMERIC_LITERALS)}"
+        r"|(?:UNDEF|true|false)(?![A-Za-z0-9_])"
+    )
+    values = f"{_IGNORE}*+((?>{value}))" * width
+    return re.compile(f"{_IGNORE}*+\\({values}{_IGNORE}*+\\)")
+
+
+def _tokens(query: str, position: int) -> Iterator[tuple[str, str, int]]:
+    for token in iter(_token_pattern().scanner(query, position).match, None):
+        kind = token.lastgroup
+        if kind == "IGNORE":
+            continue
+
+        text = token.group()
+        if kind == "PUNCTUATION":
+            kind = text
+        elif kind == "WORD" and text.upper() == "VALUES":
+            kind = "VALUES"
+        yield kind, text, token.start()
+    yield "END", "", len(query)
+
+
+def _read_values(query: str, position: int, close: str) -> tuple[list[str], int]:
+    # Read the values up to the close punctuation, and the position after it.
+    match = _value_pattern().match
+    values = []
+    append = values.append
+    while True:
+        token = match(query, position)
+        if token is None:
+            raise _NotValues(f"Unexpected data block value at position {position}")
+
+        position = token.end()
+        kind = token.lastgroup
+        if kind == "VALUE":
+            append(token["VALUE"])
+        elif kind == "PUNCTUATION":
+            punctuation = token["PUNCTUATION"]
+            if punctuation != close:
+                raise _NotValues(f"Unexpected token: {punctuation!r}. Expected {close}")
+            return values, position
+        elif kind == "LANGTAG":
+            append(token["STRING"] + token["LANGTAG"])
+        elif kind == "DATATYPE":
+            append(f"{token['STRING']}^^{token['DATATYPE']}")
+        else:
+            append(token["STRING"])
+
+
+def _read_rows(
+    query: str, position: int, width: int
+) -> tuple[list[tuple[str, ...]], int]:
+    row_match = _row_pattern(width).match
+    match = _value_pattern().match
+    rows = []
+    append = rows.append
+    while True:
+        row = row_match(query, position)
+        if row is not None:
+            append(row.groups())
+            position = row.end()
+            continue
+
+        token = match(query, position)
+        punctuation = None if token is None else token["PUNCTUATION"]
+        if punctuation is None:
+            raise _NotValues(f"Unexpected data block row at position {position}")
+
+        position = token.end()
+        if punctuation == "}":
+            return rows, position
+        elif punctuation == "(":
+            values, position = _read_values(query, position, ")")
+            append(tuple(values))
+        elif punctuation[0] == "(" and "\r" not in punctuation:
+            # The parser reads an empty row as two tokens, which "\r" cannot separate.
+            append(())
+        else:
+            raise _NotValues(f"Unexpected token: {punctuation!r}. Expected a row")
+
+
+class _Scanner:
+    def __init__(self, query: str):
+        self._query = query
+        self.seek(0)
+
+    def seek(self, position: int):
+        self._tokens = _tokens(self._query, position)
+        self.kind, self.text, self.start = next(self._tokens)
+
+    def advance(self):
+        self.kind, self.text, self.start = next(self._tokens)
+
+    def _expect(self, kind: str):
+        if self.kind != kind:
+            raise _NotValues(f"Unexpected token: {self.text!r}. Expected {kind}")
+        self.advance()
+
+    def data_block(self) -> tuple[int, int, DataBlockValues]:
+        """Read a data block after its VALUES keyword, and move past it.
+
+        :return: The positions of the opening and closing braces, and the values.
+        """
+        one_var = self.kind == "VAR"
+        width = 0
+        if one_var:
+            self.advance()
+        elif self.kind == "(":
+            self.advance()
+            while self.kind == "VAR":
+                self.advance()
+                width += 1
+            self._expect(")")
+        elif self.kind == "NIL" and self.text == "()":
+            self.advance()
+        else:
+            raise _NotValues(f"Unexpected token: {self.text!r}. Expected a data block")
+
+        if self.kind != "{":
+            raise _NotValues(f"Unexpected token: {self.text!r}. Expected {{")
+        open_brace = self.start
+        if one_var:
+            rows, position = _read_values(self._query, open_brace + 1, "}")
+        else:
+            rows, position = _read_rows(self._query, open_brace + 1, width)
+
+        self.seek(position)
+        return open_brace, position - 1, DataBlockValues(tuple(rows))
+
+
+def _blank(text: str) -> str:
+    # Spaces of the same length, with as many line breaks and the same last line.
+    lines = text.count("\n")
+    last_line = len(text) - 1 - text.rfind("\n")
+    return " " * (len(text) - lines - last_line) + "\n" * lines + " " * last_line
+
+
+def _extract_values(query: str) -> tuple[str, dict[int, DataBlockValues]]:
+    if _VALUES_KEYWORD.search(query) is None:
+        return query, {}
+
+    scanner = _Scanner(query)
+    pieces = []
+    blocks = {}
+    copied = 0
+    while scanner.kind != "END":
+        if scanner.kind != "VALUES":
+            scanner.advance()
+            continue
+
+        scanner.advance()
+        try:
+            open_brace, close_brace, values = scanner.data_block()
+        except _NotValues:
+            continue
+        if values.rows:
+            pieces.append(query[copied : open_brace + 1])
+            pieces.append(_blank(query[open_brace + 1 : close_brace]))
+            blocks[open_brace] = values
+            copied = close_brace
+
+    if not blocks:
+        return query, blocks
+    pieces.append(query[copied:])
+    return "".join(pieces), blocks
+
+
+def _insert_values(tree: Tree, blocks: dict[int, DataBlockValues]) -> bool:
+    inserted = 0
+    for data_block in tree.find_data("data_block"):
+        children = data_block.children[0].children
+        for i, child in enumerate(children):
+            if isinstance(child, Token) and child.value == "{":
+                values = blocks.get(child.start_pos)
+                if values is not None:
+                    children.insert(i + 1, values)
+                    inserted += 1
+                break
+    return inserted == len(blocks)
+
+
+def parse_with_values(query: str, parse: Callable[[str], Tree] = parser.parse) -> Tree:
+    """Parse a query, reading the rows of its VALUES data blocks with a scanner.
+
+    The parser builds several trees per value of a data block, which makes large VALUES
+    blocks slow to parse. Their rows are read in a single pass instead, into a
+    DataBlockValues node that replaces the data_block_value and data_block_value_group
+    trees, and only the rest of the query is parsed. SparqlSerializer produces the same
+    output from the tree. Data blocks that the scanner does not accept are left to the
+    parser, so syntax errors are reported as usual.
+
+    :param query: Input query or update request string.
+    :param parse: The function that parses the rest of the query.
+    :return: The parse tree.
+    """
+    text, blocks = timed("values", _extract_values, query)
+    tree = timed("parse", parse, text)
+    if blocks and not _insert_values(tree, blocks):
+        # The scanner found a data block where the parser did not read one. Parse the
+        # query as written.
+        tree = timed("parse", parse, query)
+    count_rules(tree)
+    return tree
@@ -3,6 +3,7 @@ from typing import Iterator
 
 import pytest
 from _pytest.mark import ParameterSet
+from lark import Tree
 
 TEST_DIR = Path(__file__).parent
 
@@ -33,3 +34,21 @@ def files_from_data_directory(
             yield pytest.param(
                 str(value), marks=pytest.mark.xfail(reason=xfail[file_path.resolve()])
             )
+
+
+def trees_equal(tree: Tree, other: Tree) -> bool:
+    """Compare two trees like Tree.__eq__, but without recursion.
+
+    Tree.__eq__ hits the Python recursion depth limit on very deep trees.
+    """
+    stack = [(tree, other)]
+    while stack:
+        left, right = stack.pop()
+        if isinstance(left, Tree) and isinstance(right, Tree):
+            if left.data != right.data or len(left.children) != len(right.children):
+                return False
+            stack.extend(zip(left.children, right.children))
+        elif isinstance(left, Tree) or isinstance(right, Tree) or left != right:
+            return False
+
+    return True
@@ -5,6 +5,7 @@ import pytest
 
 from sparql.parser import sparql_parser, sparql_update_parser
 from sparql.serializer import SparqlSerializer
+from tests import trees_equal
 
 TEST_DIR = Path(__file__).parent
 
@@ -29,6 +30,6 @@ def test_roundtrip():
             sparql_serializer.visit_topdown(tree)
 
             new_tree = parser.parse(sparql_serializer.result)
-            assert tree == new_tree
+            assert trees_equal(tree, new_tree)
 
     return _test_roundtrip
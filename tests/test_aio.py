@@ -0,0 +1,136 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from lark.exceptions import LarkError
+
+from sparql import (
+    AsyncFormatter,
+    format_string,
+    format_string_async,
+    format_string_explicit,
+    format_string_explicit_async,
+)
+
+query = "select * where { ?s ?p ?o } limit 10"
+update = "insert data { <urn:s> <urn:p> <urn:o> }"
+
+
+def test_format_string_async():
+    async def main():
+        return await asyncio.gather(
+            format_string_async(query),
+            format_string_async(update),
+            format_string_explicit_async(query),
+            format_string_explicit_async(update, "sparql_update"),
+        )
+
+    assert asyncio.run(main()) == [
+        format_string(query),
+        format_string(update),
+        format_string_explicit(query),
+        format_string_explicit(update, "sparql_update"),
+    ]
+
+
+def test_unexpected_parser_type():
+    with pytest.raises(ValueError, match="Unexpected parser type"):
+        asyncio.run(format_string_explicit_async(query, "turtle"))
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"max_concurrency": 0}, {"max_pending": -1}], ids=str
+)
+def test_unexpected_limits(kwargs: dict):
+    with pytest.raises(ValueError, match="Unexpected"):
+        AsyncFormatter(**kwargs)
+
+
+def test_parse_error():
+    with pytest.raises(LarkError):
+        asyncio.run(format_string_async("select"))
+
+
+def test_process_pool():
+    async def main(formatter: AsyncFormatter):
+        result = await format_string_async(query, formatter)
+        with pytest.raises(ValueError):
+            await format_string_async("select", formatter)
+        return result
+
+    # The test process runs threads, so do not fork it.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        formatter = AsyncFormatter(executor)
+        assert asyncio.run(main(formatter)) == format_string(query)
+
+
+class BlockingExecutor(ThreadPoolExecutor):
+    """A thread pool whose jobs wait for an event before they start."""
+
+    def __init__(self):
+        super().__init__(1)
+        self.event = threading.Event()
+
+    def submit(self, fn, /, *args, **kwargs):
+        def job():
+            self.event.wait()
+            return fn(*args, **kwargs)
+
+        return super().submit(job)
+
+
+def test_queue_full():
+    async def main(formatter: AsyncFormatter):
+        running = asyncio.create_task(formatter.format_string(query))
+        pending = asyncio.create_task(formatter.format_string(query))
+        await asyncio.sleep(0)
+        with pytest.raises(asyncio.QueueFull):
+            await formatter.format_string(query)
+        formatter.executor.event.set()
+        return await asyncio.gather(running, pending)
+
+    with BlockingExecutor() as executor:
+        formatter = AsyncFormatter(executor, max_concurrency=1, max_pending=1)
+        assert asyncio.run(main(formatter)) == [format_string(query)] * 2
+
+
+def test_cancellation():
+    async def main(formatter: AsyncFormatter):
+        running = asyncio.create_task(formatter.format_string(query))
+        pending = asyncio.create_task(formatter.format_string(query))
+        await asyncio.sleep(0)
+        pending.cancel()
+        running.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await pending
+        with pytest.raises(asyncio.CancelledError):
+            await running
+
+        # The running job is not interrupted, and holds its slot until it is done.
+        formatter.executor.event.set()
+        return await formatter.format_string(query)
+
+    with BlockingExecutor() as executor:
+        formatter = AsyncFormatter(executor, max_concurrency=1)
+        assert asyncio.run(main(formatter)) == format_string(query)
+
+
+def test_event_loop_is_not_blocked():
+    large_query = "select * where {\n%s}" % "".join(
+        f"  ?s{i} <urn:p> ?o{i} .\n" for i in range(2000)
+    )
+
+    async def main():
+        ticks = 0
+        task = asyncio.create_task(format_string_async(large_query))
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.001)
+        return ticks, task.result()
+
+    ticks, result = asyncio.run(main())
+    assert ticks > 1
+    assert result == format_string(large_query)
@@ -0,0 +1,96 @@
+import tracemalloc
+from pathlib import Path
+
+import pytest
+from lark import Tree
+from lark.exceptions import UnexpectedInput
+
+from sparql.ast import (
+    IRI,
+    BlankNode,
+    Literal,
+    SelectQuery,
+    TriplePattern,
+    Var,
+    from_tree,
+)
+from sparql.parser import parse
+from sparql.serializer import SparqlSerializer
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+def serialize(tree: Tree) -> str:
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(tree)
+    return sparql_serializer.result
+
+
+def test_typed_nodes():
+    tree = from_tree(
+        parse(
+            """
+            PREFIX : <http://example.org/>
+            SELECT ?s FROM <g> WHERE {
+                ?s a :Person ; :name ?name .
+                _:b1 <http://example.org/age> 42 .
+                ?s :label "label"@en .
+                ?s :p/:q ?o .
+                FILTER(?o > "1"^^:int)
+            }
+            """
+        )
+    )
+    select_query = tree.children[0].children[0].children[1]
+
+    assert isinstance(select_query, SelectQuery)
+    assert select_query.dataset_clauses[0].data == "dataset_clause"
+    triples = list(select_query.where_clause.find_data("triples_block"))[0].children
+    assert isinstance(triples[0], Tree)
+    assert triples[1] == TriplePattern(
+        BlankNode("_:b1"),
+        IRI("<http://example.org/age>"),
+        Literal("42", data="numeric_literal"),
+    )
+    assert triples[2] == TriplePattern(
+        Var("?s"), IRI(":label"), Literal('"label"', language="en")
+    )
+    assert isinstance(triples[3], Tree)
+    assert Literal(
+        '"1"', datatype=IRI(":int")
+    ) in select_query.where_clause.scan_values(lambda value: isinstance(value, Literal))
+
+
+def test_typed_tree_size():
+    query = "SELECT * { " + " . ".join(f"?s{i} <p> {i}" for i in range(1000)) + " }"
+    parse(query)
+
+    tracemalloc.start()
+    tree = parse(query)
+    size = tracemalloc.get_traced_memory()[0]
+    del tree
+    start = tracemalloc.get_traced_memory()[0]
+    typed_tree = from_tree(parse(query))
+    typed_size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+
+    assert isinstance(typed_tree, Tree)
+    assert typed_size * 5 < size
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_typed_tree_serialization(file: str):
+    if "/negative/" in file:
+        pytest.skip("Negative syntax test.")
+
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+
+    try:
+        tree = parse(query)
+    except UnexpectedInput:
+        pytest.skip("Not accepted by the unified parser.")
+
+    assert serialize(from_tree(parse(query))) == serialize(tree)
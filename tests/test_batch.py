@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import pytest
+
+import sparql
+from sparql import FormatResult, format_many
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+queries = [
+    "select * where { ?s ?p ?o }",
+    "SELECT * WHERE { ?s ?p }",
+    "LOAD <http://example.org/faraway>",
+    "",
+    "ask { ?s a <http://example.org/Person> }",
+]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_format_many(workers: int):
+    results = list(format_many(iter(queries), workers=workers, chunksize=2))
+
+    assert len(results) == len(queries)
+    for query, result in zip(queries, results):
+        assert isinstance(result, FormatResult)
+        try:
+            expected = sparql.format_string(query)
+        except Exception as error:
+            assert result == FormatResult(None, str(error))
+        else:
+            assert result == FormatResult(expected, None)
+
+    assert results[1].error.startswith("Unexpected token")
+
+
+def test_format_many_corpus():
+    texts = [
+        file_path.read_text(encoding="utf-8")
+        for file_path in sorted(data_dir.glob("**/*.r[qu]"))
+    ]
+
+    assert list(format_many(texts, workers=2)) == list(format_many(texts, workers=1))
+
+
+@pytest.mark.parametrize("workers, chunksize", [(0, 1), (1, 0)])
+def test_format_many_invalid_arguments(workers: int, chunksize: int):
+    with pytest.raises(ValueError):
+        format_many(queries, workers=workers, chunksize=chunksize)
@@ -0,0 +1,141 @@
+import os
+
+import pytest
+from lark.exceptions import LarkError
+
+import sparql
+from sparql import DiskCache, FormatCache
+
+select_query = "select * where { ?s ?p ?o }"
+update_query = "LOAD <http://example.org/faraway> INTO GRAPH <localCopy>"
+
+
+def test_hits_and_misses():
+    cache = FormatCache(maxsize=2)
+
+    assert cache.format_string(select_query) == sparql.format_string(select_query)
+    assert cache.format_string(select_query) == sparql.format_string(select_query)
+    assert cache.format_string(update_query) == sparql.format_string(update_query)
+
+    assert cache.info() == (1, 2, 2, 2)
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+def test_lru_eviction():
+    cache = FormatCache(maxsize=2)
+    queries = [f"ASK {{ ?s ?p {i} }}" for i in range(3)]
+
+    cache.format_string(queries[0])
+    cache.format_string(queries[1])
+    cache.format_string(queries[0])
+    cache.format_string(queries[2])
+
+    cache.format_string(queries[0])
+    assert cache.hits == 2
+    cache.format_string(queries[1])
+    assert cache.misses == 4
+
+
+def test_parser_type_is_part_of_the_key():
+    cache = FormatCache()
+
+    cache.format_string(select_query)
+    result = cache.format_string_explicit(select_query, parser_type="sparql")
+
+    assert result == sparql.format_string_explicit(select_query)
+    assert cache.misses == 2
+
+    with pytest.raises(LarkError):
+        cache.format_string_explicit(select_query, parser_type="sparql_update")
+
+    with pytest.raises(ValueError):
+        cache.format_string_explicit(select_query, parser_type="unknown")
+
+
+def test_errors_are_not_cached():
+    cache = FormatCache()
+
+    for _ in range(2):
+        with pytest.raises(LarkError):
+            cache.format_string("select where")
+
+    assert cache.info().currsize == 0
+
+
+def test_store_trees():
+    cache = FormatCache(store_trees=True)
+
+    tree = cache.get_tree(select_query)
+    assert tree.children[0].data == "query_unit"
+    assert cache.get_tree(select_query) is tree
+    assert cache.format_string(select_query) == sparql.format_string(select_query)
+    assert cache.hits == 2
+
+    with pytest.raises(ValueError):
+        FormatCache().get_tree(select_query)
+
+
+def test_fast_paths():
+    data_query = "INSERT DATA { <a> <b> <c> }"
+    values_query = "SELECT * { ?s ?p ?o } VALUES ?s { <a> <b> }"
+
+    with sparql.instrument() as profile:
+        cache = FormatCache()
+        assert cache.format_string(data_query) == sparql.format_string(data_query)
+        assert cache.format_string(values_query) == sparql.format_string(values_query)
+
+    assert profile.phases["data"].calls == 4
+    assert profile.phases["values"].calls == 2
+    assert profile.phases["parse"].calls == 2
+
+    # The tree is kept, so the data of the update request is parsed.
+    cache = FormatCache(store_trees=True)
+    assert cache.get_tree(data_query).children[0].data == "update_unit"
+
+
+def test_clear():
+    cache = FormatCache()
+    cache.format_string(select_query)
+    cache.clear()
+
+    assert cache.info() == (0, 0, 1024, 0)
+
+
+def test_disk_cache(tmp_path):
+    cache = DiskCache(tmp_path)
+    formatted = sparql.format_string(select_query)
+
+    assert not cache.is_formatted(formatted)
+    cache.add(formatted)
+    assert cache.is_formatted(formatted)
+    assert not cache.is_formatted(select_query)
+
+    # Another instance, like one in another process, shares the entries.
+    assert DiskCache(tmp_path).is_formatted(formatted)
+
+    cache.clear()
+    assert not cache.is_formatted(formatted)
+
+
+def test_disk_cache_eviction(tmp_path):
+    cache = DiskCache(tmp_path, maxsize=2)
+    texts = [f"ASK {{ ?s ?p {i} }}" for i in range(3)]
+    for i, text in enumerate(texts):
+        cache.add(text)
+        os.utime(cache._entry_path(text), (i, i))
+
+    # A hit makes the entry the most recently used.
+    assert cache.is_formatted(texts[0])
+    cache.evict()
+
+    assert cache.is_formatted(texts[0])
+    assert not cache.is_formatted(texts[1])
+    assert cache.is_formatted(texts[2])
+
+
+def test_disk_cache_is_keyed_by_formatter(tmp_path):
+    cache = DiskCache(tmp_path)
+
+    assert cache.directory.parent == tmp_path
+    assert cache.directory.name.split("-")[-1] == sparql.cache._formatter_key()[-16:]
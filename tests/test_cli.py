@@ -0,0 +1,147 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import sparql.cli
+from sparql import format_string
+from sparql.cli import main
+
+query = "select * where { ?s ?p ?o }"
+update = "insert data { <urn:s> <urn:p> <urn:o> }"
+
+
+def formatted(text: str) -> str:
+    # Formatted files end with a newline.
+    return format_string(text).rstrip("\n") + "\n"
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path_factory, monkeypatch) -> Path:
+    cache_dir = tmp_path_factory.mktemp("cache")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_dir))
+    return cache_dir
+
+
+@pytest.fixture
+def files(tmp_path: Path) -> dict[str, Path]:
+    (tmp_path / "nested").mkdir()
+    files = {
+        "query": tmp_path / "query.rq",
+        "update": tmp_path / "nested" / "update.ru",
+        "formatted": tmp_path / "formatted.rq",
+    }
+    files["query"].write_text(query, encoding="utf-8")
+    files["update"].write_text(update, encoding="utf-8")
+    files["formatted"].write_text(formatted(query), encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("not a query", encoding="utf-8")
+    return files
+
+
+def test_stdout(files: dict[str, Path], capsys):
+    assert main([str(files["query"]), str(files["update"])]) == 0
+
+    assert capsys.readouterr().out == formatted(query) + formatted(update)
+
+
+def test_check(tmp_path: Path, files: dict[str, Path], capsys):
+    assert main(["--check", str(tmp_path)]) == 1
+
+    err = capsys.readouterr().err
+    assert f"would reformat {files['query']}" in err
+    assert f"would reformat {files['update']}" in err
+    assert str(files["formatted"]) not in err
+    assert files["query"].read_text(encoding="utf-8") == query
+
+    assert main(["--check", str(files["formatted"])]) == 0
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_in_place(tmp_path: Path, files: dict[str, Path], jobs: str):
+    assert main(["--in-place", "--jobs", jobs, str(tmp_path)]) == 0
+
+    assert files["query"].read_text(encoding="utf-8") == formatted(query)
+    assert files["update"].read_text(encoding="utf-8") == formatted(update)
+    assert main(["--check", str(tmp_path)]) == 0
+
+
+def test_diff(files: dict[str, Path], capsys):
+    assert main(["--diff", str(files["query"]), str(files["formatted"])]) == 1
+
+    out = capsys.readouterr().out
+    assert out.startswith(f"--- {files['query']}\n+++ {files['query']}\n")
+    assert f"-{query}" in out
+    assert str(files["formatted"]) not in out
+
+
+def test_glob(tmp_path: Path, files: dict[str, Path], capsys):
+    assert main(["--check", str(tmp_path / "**" / "*.ru")]) == 1
+
+    err = capsys.readouterr().err
+    assert str(files["update"]) in err
+    assert str(files["query"]) not in err
+
+
+def test_parse_error(tmp_path: Path, files: dict[str, Path], capsys):
+    bad = tmp_path / "bad.rq"
+    bad.write_text("select", encoding="utf-8")
+
+    assert main(["--in-place", str(tmp_path)]) == 1
+
+    assert f"error: cannot format {bad}" in capsys.readouterr().err
+    assert bad.read_text(encoding="utf-8") == "select"
+    assert files["query"].read_text(encoding="utf-8") == formatted(query)
+
+
+def test_cache(tmp_path: Path, files: dict[str, Path], cache_dir: Path, monkeypatch):
+    formatted_texts = []
+
+    def format_many(queries, workers):
+        formatted_texts.extend(queries)
+        return sparql.format_many(queries, workers=workers)
+
+    monkeypatch.setattr(sparql.cli, "format_many", format_many)
+
+    assert main(["--check", str(tmp_path)]) == 1
+    assert len(formatted_texts) == 3
+    assert any((cache_dir / "sparql").rglob("*"))
+
+    # Only the files that were already formatted are cached.
+    formatted_texts.clear()
+    assert main(["--in-place", str(tmp_path)]) == 0
+    assert sorted(formatted_texts) == sorted([query, update])
+
+    # The query now has the content of the formatted file, which is cached.
+    formatted_texts.clear()
+    assert main(["--check", str(tmp_path)]) == 0
+    assert formatted_texts == [formatted(update)]
+
+    formatted_texts.clear()
+    assert main(["--check", str(tmp_path)]) == 0
+    assert formatted_texts == []
+
+    assert main(["--check", "--no-cache", str(tmp_path)]) == 0
+    assert len(formatted_texts) == 3
+
+
+def test_stdin(monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO(update))
+
+    assert main(["-"]) == 0
+    assert capsys.readouterr().out == formatted(update)
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["missing.rq"],
+        ["--jobs", "0", "."],
+        ["--check", "--in-place", "."],
+        ["--in-place", "-"],
+    ],
+    ids=str,
+)
+def test_usage_error(argv: list[str]):
+    with pytest.raises(SystemExit) as excinfo:
+        main(argv)
+    assert excinfo.value.code == 2
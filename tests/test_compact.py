@@ -0,0 +1,77 @@
+from pathlib import Path
+
+import pytest
+from lark import Tree
+from lark.exceptions import UnexpectedInput
+
+from sparql.compact import (
+    EXPRESSION_PRECEDENCE,
+    compact_expressions,
+    expand_expressions,
+)
+from sparql.parser import parse
+from sparql.serializer import SparqlSerializer
+from tests import files_from_data_directory, trees_equal
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+def serialize(tree: Tree) -> str:
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(tree)
+    return sparql_serializer.result
+
+
+def test_compact_expression():
+    tree = parse("SELECT * { FILTER(?a || ?b * (1 + ?c) IN (1, 2)) }", compact=True)
+    expression = next(
+        subtree
+        for subtree in tree.iter_subtrees_topdown()
+        if subtree.data == "expression"
+    )
+
+    assert expression.children[0].data == "conditional_or_expression"
+    left, _, right = expression.children[0].children
+    assert left.data == "var"
+    assert right.data == "relational_expression"
+    assert right.children[0].data == "multiplicative_expression"
+    assert right.children[0].children[2].data == "bracketted_expression"
+    assert right.children[2].data == "expression_list"
+    for subtree in tree.iter_subtrees():
+        if subtree.data in EXPRESSION_PRECEDENCE:
+            assert len(subtree.children) > 1
+
+
+def test_compact_tree_size():
+    def expression_size(tree: Tree) -> int:
+        return sum(
+            len(list(expression.iter_subtrees()))
+            for expression in tree.find_data("expression")
+        )
+
+    query = "SELECT * { " + " ".join(f"FILTER(?o{i} > {i})" for i in range(100)) + " }"
+
+    assert expression_size(parse(query, compact=True)) * 3 < expression_size(
+        parse(query)
+    )
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_compact_roundtrip(file: str):
+    if "/negative/" in file:
+        pytest.skip("Negative syntax test.")
+
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+
+    try:
+        tree = parse(query)
+    except UnexpectedInput:
+        pytest.skip("Not accepted by the unified parser.")
+
+    compact_tree = parse(query, compact=True)
+
+    assert serialize(compact_tree) == serialize(tree)
+    assert trees_equal(compact_expressions(compact_tree), parse(query, compact=True))
+    assert trees_equal(expand_expressions(compact_tree), tree)
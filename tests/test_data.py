@@ -0,0 +1,134 @@
+import io
+from pathlib import Path
+
+import pytest
+from lark.exceptions import LarkError
+
+import sparql
+from sparql.data import format_data, write_data
+from sparql.parser import parse
+from sparql.serializer import SparqlSerializer
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+update_dir = data_dir / "sparql_test_suite_from_rdf_tests/sparql11"
+
+
+def serialize(query: str) -> str:
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(parse(query))
+    return sparql_serializer.result
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_same_output_as_full_path(file: str):
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+
+    result = format_data(query)
+    if result is None:
+        pytest.skip("Not a DATA request")
+
+    assert result == serialize(query)
+
+
+@pytest.mark.parametrize(
+    "file",
+    sorted((update_dir / "delete-data").glob("*.ru"))
+    + [
+        update_dir / f"syntax-update-1/syntax-update-{number}.ru"
+        for number in (23, 24, 25, 26, 27, 28, 29, 30, 31, 53)
+    ]
+    + [update_dir / "syntax-update-2/large-request-01.ru"],
+    ids=lambda file: file.name,
+)
+def test_data_requests_take_the_fast_path(file: Path):
+    query = file.read_text(encoding="utf-8")
+
+    result = format_data(query)
+
+    assert result is not None
+    assert result == serialize(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        """PREFIX : <http://example.org/> BASE <http://example.org/base/>
+        insert data {
+            :a :b :c , "x"@en ; a :T ; ; :n 1, -2.5, +1e3, .5, true ;
+            # A comment.
+            GRAPH <g> { :a :b :c . _:b1 :p [ ] , ( ) . } . :x :y "y"^^:dt
+            GRAPH :g2 { }
+        } ;
+        DELETE DATA { GRAPH <g> { <s> <p> '''long
+        string''' } } ;
+        """,
+        "INSERT DATA { }",
+        "INSERT DATA { <a> <b> <c> } ; PREFIX : <x:>",
+    ],
+)
+def test_same_output_as_full_path_for_all_forms(query: str):
+    result = format_data(query)
+
+    assert result is not None
+    assert result == serialize(query)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * { ?s ?p ?o }",
+        "CLEAR ALL",
+        "PREFIX : <x:>",
+        "INSERT { <a> <b> <c> } WHERE { }",
+        "INSERT DATA { <a> <b> <c> } ; CLEAR ALL",
+        "INSERT DATA { <a> <b> ?c }",
+        "INSERT DATA { GRAPH ?g { <a> <b> <c> } }",
+        "INSERT DATA { <a> <b> ( 1 2 ) }",
+        "INSERT DATA { <a> <b> [ <c> <d> ] }",
+        "INSERT DATA { <a> <b> <c> <d> <e> <f> }",
+        "INSERT DATA { <a> <b> <c> .5 <d> <e> }",
+        "INSERT DATA { <a> <b> <c> }\r\n",
+        "INSERT DATA { <a> <b> <c> ",
+    ],
+)
+def test_other_requests_take_the_full_path(query: str):
+    assert format_data(query) is None
+
+
+def test_syntax_errors_are_raised_by_the_full_path():
+    with pytest.raises(LarkError):
+        sparql.format_string("INSERT DATA { <a> <b> <c> . . }")
+
+
+def test_format_string_does_not_parse(monkeypatch):
+    def get_parser(start: str):
+        raise AssertionError("Unexpected parse")
+
+    monkeypatch.setattr(sparql.formatting, "get_parser", get_parser)
+    query = "DELETE DATA { <a> <b> <c> }"
+
+    assert sparql.format_string(query) == serialize(query)
+    assert sparql.format_string_explicit(query, "sparql_update") == serialize(query)
+
+
+@pytest.mark.parametrize("buffer_size", [0, 16, 65536])
+def test_write_data(buffer_size: int):
+    query = "INSERT DATA { " + " . ".join(f"<s> <p> {i}" for i in range(100)) + " }"
+
+    stream = io.StringIO()
+    assert write_data(query, stream, buffer_size)
+    assert stream.getvalue() == serialize(query)
+
+
+def test_write_data_full_path():
+    stream = io.StringIO()
+
+    assert not write_data("SELECT * { ?s ?p ?o }", stream)
+    assert not write_data("INSERT DATA { <a> <b> ?c }", stream)
+    assert stream.getvalue() == ""
+
+    with pytest.raises(ValueError, match="Unexpected DATA request"):
+        write_data("INSERT DATA { <a> <b> <c> . <a> <b> ?c }", stream, buffer_size=1)
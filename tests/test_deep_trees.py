@@ -0,0 +1,42 @@
+import pytest
+
+from sparql.parser import parse
+from sparql.serializer import SparqlSerializer
+from tests import trees_equal
+
+n = 5000
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * { " + " . ".join(f"?s <p> {i}" for i in range(n)) + " }",
+        "CONSTRUCT { " + " . ".join(f"?s <p> {i}" for i in range(n)) + " } WHERE { }",
+        "INSERT DATA { " + " . ".join(f"<s> <p> {i}" for i in range(n)) + " }",
+        " ; ".join(["CLEAR ALL"] * n),
+        "SELECT * { FILTER(" + "(" * 300 + "1" + ")" * 300 + ") }",
+        "SELECT * " + "{ " * 500 + "?s ?p ?o" + " }" * 500,
+    ],
+    ids=["triples", "construct", "insert_data", "updates", "brackets", "groups"],
+)
+def test_roundtrip_deep_tree(query: str):
+    tree = parse(query)
+
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(tree)
+
+    assert trees_equal(tree, parse(sparql_serializer.result))
+
+
+def test_indentation_of_deep_groups():
+    depth = 20
+    tree = parse("SELECT * " + "{ " * depth + "?s ?p ?o" + " }" * depth)
+
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(tree)
+
+    lines = sparql_serializer.result.splitlines()
+    assert "\t" * (depth - 1) + "{" in lines
+    assert "\t" * depth + "?s ?p  ?o " in lines
+    # The output is joined once, when it is first read.
+    assert sparql_serializer.result is sparql_serializer.result
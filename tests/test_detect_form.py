@@ -0,0 +1,72 @@
+from pathlib import Path
+
+import lark
+import pytest
+
+import sparql
+from sparql import detect_form
+from sparql.parser import sparql_parser, sparql_update_parser
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT * { ?s ?p ?o }", "SELECT"),
+        ("select * { ?s ?p ?o }", "SELECT"),
+        ("CONSTRUCT WHERE { ?s ?p ?o }", "CONSTRUCT"),
+        ("ASK {}", "ASK"),
+        ("DESCRIBE <http://example.org/>", "DESCRIBE"),
+        ("LOAD <http://example.org/faraway>", "UPDATE"),
+        ("INSERT DATA { <a> <b> <c> }", "UPDATE"),
+        ("WITH <g> DELETE { ?s ?p ?o } WHERE { ?s ?p ?o }", "UPDATE"),
+        ("", "UPDATE"),
+        ("PREFIX : <http://example.org/>", "UPDATE"),
+        (
+            """
+            # A comment mentioning INSERT
+            BASE <http://example.org/#base>
+            PREFIX select: <http://example.org/select#>
+            prefix:<http://example.org/>
+            SELECT * { ?s select:p ?o }
+            """,
+            "SELECT",
+        ),
+    ],
+)
+def test_detect_form(query: str, expected: str):
+    assert detect_form(query) == expected
+
+
+@pytest.mark.parametrize(
+    "query", ["VALUES ?x { 1 }", "{ ?s ?p ?o }", "PREFIX : SELECT * {}"]
+)
+def test_detect_form_unknown(query: str):
+    with pytest.raises(ValueError):
+        detect_form(query)
+
+
+def test_format_string_reports_syntax_error():
+    with pytest.raises(lark.exceptions.LarkError):
+        sparql.format_string("VALUES ?x { 1 }")
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_detect_form_matches_parser(file: str):
+    if "/negative/" in file:
+        pytest.skip("Negative syntax test.")
+
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+
+    try:
+        sparql_parser.parse(query)
+        is_update = False
+    except lark.exceptions.UnexpectedInput:
+        sparql_update_parser.parse(query)
+        is_update = True
+
+    assert (detect_form(query) == "UPDATE") == is_update
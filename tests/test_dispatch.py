@@ -0,0 +1,49 @@
+import pytest
+from lark import Tree
+
+from sparql.parser import parse
+from sparql.serializer import SparqlSerializer
+
+
+class UppercaseVarSerializer(SparqlSerializer):
+    def _var(self, var: Tree):
+        self._write(f"{var.children[0].value.upper()} ")
+
+
+def test_subclass_handlers_are_dispatched_to():
+    tree = parse("SELECT * { ?s ?p ?o FILTER(?o > 1) } ORDER BY ?s")
+
+    sparql_serializer = UppercaseVarSerializer()
+    sparql_serializer.visit_topdown(tree)
+
+    # The variable in the filter is dispatched from expression_term, and the one in the
+    # ORDER BY clause from order_condition.
+    assert "?O > 1" in sparql_serializer.result
+    assert "ORDER BY ?S" in sparql_serializer.result
+
+
+def test_subclass_handler_tables_are_separate():
+    assert (
+        UppercaseVarSerializer._handlers["expression_term"]["var"]
+        is UppercaseVarSerializer._var
+    )
+    assert SparqlSerializer._handlers["expression_term"]["var"] is SparqlSerializer._var
+
+
+@pytest.mark.parametrize(
+    "query, rule, message",
+    [
+        ("CLEAR ALL", "update1", "Unexpected update1 value type: unknown"),
+        (
+            "SELECT * { FILTER(BOUND(?x)) }",
+            "constraint",
+            "Unexpected constraint value type: unknown",
+        ),
+    ],
+)
+def test_unexpected_rule(query: str, rule: str, message: str):
+    tree = parse(query)
+    next(tree.find_data(rule)).children[0] = Tree("unknown", [])
+
+    with pytest.raises(ValueError, match=message):
+        SparqlSerializer().visit_topdown(tree)
@@ -0,0 +1,135 @@
+from pathlib import Path
+
+import pytest
+from lark import Token, Tree
+from lark.exceptions import UnexpectedInput
+
+from sparql.incremental import TextEdit, parse, reparse
+from tests import files_from_data_directory, trees_equal
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+query = """SELECT * WHERE {
+    ?s ?p ?o .
+    OPTIONAL { ?s <http://example.org/name> ?name }
+    OPTIONAL { ?s <http://example.org/mbox> ?mbox }
+}"""
+
+
+def positions(tree: Tree) -> list[tuple]:
+    result = []
+    for subtree in tree.iter_subtrees():
+        meta = subtree.meta
+        if not meta.empty:
+            result.append(
+                (subtree.data, meta.line, meta.column, meta.start_pos, meta.end_pos)
+            )
+        for child in subtree.children:
+            if isinstance(child, Token):
+                result.append(
+                    (
+                        child.type,
+                        child.line,
+                        child.column,
+                        child.start_pos,
+                        child.end_pos,
+                    )
+                )
+    return sorted(result, key=str)
+
+
+def test_reparse_splices_innermost_pattern():
+    tree = parse(query)
+    optionals = list(tree.find_data("optional_graph_pattern"))
+    offset = query.index("?name") + len("?name")
+    edit = TextEdit(offset, 0, " ; <http://example.org/nick> ?nick")
+
+    new_tree = reparse(tree, query, edit)
+    new_query = edit.apply(query)
+
+    assert new_tree is tree
+    assert new_tree == parse(new_query)
+    assert positions(new_tree) == positions(parse(new_query))
+    assert optionals[1] is list(tree.find_data("optional_graph_pattern"))[1]
+
+
+def test_reparse_crossing_braces():
+    tree = parse(query)
+    start = query.index("}")
+    end = query.index("{", start) + 1
+    edit = TextEdit(start, end - start, " . ")
+
+    new_tree = reparse(tree, query, edit)
+
+    assert new_tree is tree
+    assert new_tree == parse(edit.apply(query))
+
+
+def test_reparse_falls_back_to_full_parse():
+    tree = parse(query)
+    edit = TextEdit(query.index("WHERE"), len("WHERE "), "")
+
+    new_tree = reparse(tree, query, edit)
+
+    assert new_tree is not tree
+    assert new_tree == parse(edit.apply(query))
+
+
+@pytest.mark.parametrize(
+    "text, edit",
+    [
+        (
+            "SELECT * { ?s ?p ?o . ?a ?b ?c }",
+            TextEdit(len("SELECT * { ?s ?p ?o "), 0, "#"),
+        ),
+        (
+            "SELECT * { OPTIONAL { ?s ?p ?o . ?a ?b ?c } }",
+            TextEdit(len("SELECT * { OPTIONAL { ?s ?p ?o "), 0, "# "),
+        ),
+    ],
+    ids=["group", "nested group"],
+)
+def test_reparse_comment_runs_past_candidate(text: str, edit: TextEdit):
+    tree = parse(text)
+
+    with pytest.raises(UnexpectedInput):
+        parse(edit.apply(text))
+    with pytest.raises(UnexpectedInput):
+        reparse(tree, text, edit)
+
+
+def test_reparse_invalid_edit():
+    tree = parse(query)
+    expected = positions(tree)
+    edit = TextEdit(query.index("?name"), 0, "OPTIONAL")
+
+    with pytest.raises(UnexpectedInput):
+        reparse(tree, query, edit)
+
+    assert tree == parse(query)
+    assert positions(tree) == expected
+
+    with pytest.raises(ValueError):
+        reparse(tree, query, TextEdit(len(query), 1, ""))
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_reparse_matches_full_parse(file: str):
+    if "/negative/" in file:
+        pytest.skip("Negative syntax test.")
+
+    with open(file, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    offset = text.rfind("}")
+    if offset == -1:
+        pytest.skip("No group graph pattern.")
+
+    edit = TextEdit(offset, 0, "\n# edited\n")
+    try:
+        expected = parse(edit.apply(text))
+    except UnexpectedInput:
+        pytest.skip("The edit is inside a literal.")
+
+    assert trees_equal(reparse(parse(text), text, edit), expected)
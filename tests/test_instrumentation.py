@@ -0,0 +1,108 @@
+import json
+from collections import Counter
+
+import pytest
+from lark.exceptions import UnexpectedInput
+
+import sparql
+from sparql.instrumentation import current_profile
+from sparql.parser import parse
+
+query = "SELECT * { ?s ?p ?o FILTER(?o > 1) } VALUES ?s { <a> <b> }"
+
+
+def test_phases():
+    with sparql.instrument() as profile:
+        result = sparql.format_string(query)
+        sparql.format_string("INSERT DATA { <a> <b> <c> }")
+
+    assert result == sparql.format_string(query)
+    assert {
+        phase: phase_time.calls for phase, phase_time in profile.phases.items()
+    } == {
+        "data": 2,
+        "values": 1,
+        "parse": 1,
+        "serialize": 1,
+    }
+    for phase_time in profile.phases.values():
+        assert phase_time.wall >= 0
+        assert phase_time.cpu >= 0
+
+
+def test_callback():
+    calls = []
+
+    with sparql.instrument(lambda *args: calls.append(args)):
+        sparql.format_string_explicit(query)
+
+    assert [phase for phase, wall, cpu in calls] == ["values", "parse", "serialize"]
+
+
+def test_rules_and_handlers():
+    with sparql.instrument() as profile:
+        sparql.format_string("SELECT * { ?s ?p ?o } ORDER BY ?s")
+
+    tree = parse("SELECT * { ?s ?p ?o } ORDER BY ?s")
+    assert profile.rules == Counter(subtree.data for subtree in tree.iter_subtrees())
+    assert profile.handlers["query_unit"] == 1
+    assert profile.handlers["order_condition"] == 1
+    assert profile.handlers["triples_block"] == 1
+
+
+def test_data_block_values_are_counted():
+    with sparql.instrument() as profile:
+        sparql.format_string(query)
+
+    assert profile.rules["data_block_values"] == 1
+    assert profile.handlers["data_block_values_one_var"] == 1
+
+
+@pytest.mark.parametrize(
+    "format_function",
+    [
+        lambda text: list(sparql.format_updates(text)),
+        lambda text: sparql.FormatCache().format_string(text),
+    ],
+    ids=["format_updates", "FormatCache"],
+)
+def test_other_entry_points(format_function):
+    with sparql.instrument() as profile:
+        format_function("CLEAR ALL")
+
+    assert profile.phases["parse"].calls == 1
+    assert profile.phases["serialize"].calls == 1
+    assert profile.rules["clear"] == 1
+
+
+def test_errors_are_timed():
+    with sparql.instrument() as profile:
+        with pytest.raises(UnexpectedInput):
+            sparql.format_string("SELECT * {")
+
+    assert profile.phases["parse"].calls == 1
+    assert "serialize" not in profile.phases
+
+
+def test_nested_blocks():
+    assert current_profile() is None
+    with sparql.instrument() as outer:
+        with sparql.instrument() as inner:
+            sparql.format_string(query)
+        assert current_profile() is outer
+    assert current_profile() is None
+
+    assert not outer.phases
+    assert inner.phases["serialize"].calls == 1
+
+
+def test_to_dict():
+    with sparql.instrument() as profile:
+        sparql.format_string(query)
+
+    result = json.loads(json.dumps(profile.to_dict()))
+
+    assert result["phases"]["parse"]["calls"] == 1
+    assert set(result["phases"]["parse"]) == {"calls", "wall", "cpu"}
+    assert result["rules"]["var"] == profile.rules["var"]
+    assert result["handlers"]["query_unit"] == 1
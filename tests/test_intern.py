@@ -0,0 +1,55 @@
+import pytest
+from lark import Token
+
+from sparql.parser import INTERNED_TERMINALS, InternPool, create_parser, parse
+
+query = """
+PREFIX : <http://example.org/>
+SELECT ?s ?name WHERE {
+    ?s a :Person ; :name ?name .
+    ?s <http://example.org/knows> ?o .
+    ?o <http://example.org/knows> ?s .
+    ?o :name "?s" .
+}
+"""
+
+
+def interned_values(tree) -> dict[str, list[str]]:
+    values = {}
+    for token in tree.scan_values(lambda value: isinstance(value, Token)):
+        if token.type in INTERNED_TERMINALS:
+            values.setdefault(token.value, []).append(token.value)
+    return values
+
+
+@pytest.mark.parametrize("backend", ["lalr", "earley"])
+def test_equal_values_are_shared(backend: str):
+    parser = create_parser("query_unit", backend=backend, intern_pool=InternPool())
+    tree = parser.parse(query)
+
+    values = interned_values(tree)
+    assert len(values["?s"]) == 4
+    assert len(values["<http://example.org/knows>"]) == 2
+    for same_values in values.values():
+        assert all(value is same_values[0] for value in same_values)
+
+    assert tree == create_parser("query_unit", backend=backend).parse(query)
+
+
+def test_shared_pool():
+    first = parse(query)
+    second = parse(query)
+
+    assert interned_values(first)["?s"][0] is interned_values(second)["?s"][0]
+
+
+def test_bounded_pool():
+    pool = InternPool(maxsize=2)
+    parser = create_parser("query_unit", intern_pool=pool)
+    tree = parser.parse(query)
+
+    assert 0 < len(pool) <= 2
+    assert tree == create_parser("query_unit").parse(query)
+
+    pool.clear()
+    assert len(pool) == 0
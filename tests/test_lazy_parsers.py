@@ -0,0 +1,28 @@
+import subprocess
+import sys
+
+from sparql.parser import get_parser
+
+
+def test_import_does_not_build_parsers():
+    code = (
+        "import sparql, sparql.parser\n"
+        "assert not sparql.parser._unified_parsers\n"
+        "sparql.format_string_explicit('ASK {}')\n"
+        "assert list(sparql.parser._unified_parsers) == ['lalr']\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_module_attributes_are_shared_parsers():
+    from sparql.parser import sparql_parser, sparql_update_parser
+
+    assert sparql_parser is get_parser("query_unit")
+    assert sparql_update_parser is get_parser("update_unit")
+
+
+def test_package_attributes_are_shared_parsers():
+    import sparql
+
+    assert sparql.sparql_parser is get_parser("query_unit")
+    assert sparql.sparql_update_parser is get_parser("update_unit")
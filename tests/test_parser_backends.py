@@ -0,0 +1,123 @@
+from pathlib import Path
+
+import lark
+import pytest
+
+from sparql.parser import create_parser, sparql_parser, sparql_update_parser
+from tests import files_from_data_directory, trees_equal
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+earley_parser = create_parser("query_unit", backend="earley")
+earley_update_parser = create_parser("update_unit", backend="earley")
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_identical_trees(file: str):
+    if "/negative/" in file:
+        pytest.skip("Negative syntax test.")
+
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+
+    try:
+        tree = sparql_parser.parse(query)
+        earley_tree = earley_parser.parse(query)
+    except (
+        lark.exceptions.UnexpectedCharacters,
+        lark.exceptions.UnexpectedInput,
+    ):
+        tree = sparql_update_parser.parse(query)
+        earley_tree = earley_update_parser.parse(query)
+
+    assert trees_equal(tree, earley_tree)
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * { VALUES ?x { 1 3.5 } }",
+        "SELECT * { VALUES ?x { -1 +2 3.0 } }",
+        "SELECT * { ?s ?p 3.5e2, 1e3, .5, 4.5, -2.25, +0.5E-1 }",
+        "SELECT * { FILTER(?x = 3.5 + 1.25e-3 - -2.5 * 10.0) }",
+        "SELECT * {} LIMIT 35 OFFSET 12",
+    ],
+)
+def test_identical_trees_for_numeric_literals(query: str):
+    assert trees_equal(sparql_parser.parse(query), earley_parser.parse(query))
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT * { FILTER(?o+1 = -3) }", ["PLUS", "INTEGER", "MINUS", "INTEGER"]),
+        ("SELECT * { ?s ?p -3 }", ["INTEGER_NEGATIVE"]),
+        ("SELECT * { <a> <b>+11 }", ["INTEGER_POSITIVE"]),
+        ("SELECT * { ?s rdfs:subClassOf* ?o }", ["PATH_MOD"]),
+        ("SELECT * { ?s :p+/:q ?o }", ["PATH_MOD"]),
+        ("SELECT * { VALUES ?x { 1 3.5 } }", ["INTEGER", "DECIMAL"]),
+        (
+            "SELECT * { VALUES ?x { -1 +2 3.0 } }",
+            ["INTEGER_NEGATIVE", "INTEGER_POSITIVE", "DECIMAL"],
+        ),
+    ],
+)
+def test_lexing_matches_earley(query: str, expected: list[str]):
+    interesting = {
+        "PLUS",
+        "MINUS",
+        "INTEGER",
+        "INTEGER_POSITIVE",
+        "INTEGER_NEGATIVE",
+        "DECIMAL",
+        "PATH_MOD",
+    }
+    for parser in (sparql_parser, earley_parser):
+        tree = parser.parse(query)
+        token_types = [
+            token.type for token in tree.scan_values(lambda x: x.type in interesting)
+        ]
+        assert token_types == expected
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        create_parser("query_unit", backend="cyk")
+
+
+def test_cached_parser(tmp_path):
+    cache_file = tmp_path / "sparql_parser.cache"
+    query = "SELECT * { ?s ?p ?o FILTER(?o+1 > 2) }"
+
+    parser = create_parser("query_unit", cache=str(cache_file))
+    assert cache_file.exists()
+
+    cached_parser = create_parser("query_unit", cache=str(cache_file))
+    assert cached_parser.parse(query) == parser.parse(query)
+
+
+def test_default_cache_is_private(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    query = "SELECT * { ?s ?p ?o }"
+
+    parser = create_parser("query_unit")
+
+    cache_dir = tmp_path / "sparql/parsers"
+    assert cache_dir.stat().st_mode & 0o777 == 0o700
+    assert len(list(cache_dir.iterdir())) == 1
+
+    cached_parser = create_parser("query_unit")
+    assert cached_parser.parse(query) == parser.parse(query)
+    create_parser("update_unit")
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_unwritable_cache_dir(tmp_path, monkeypatch):
+    cache_home = tmp_path / "not_a_directory"
+    cache_home.write_text("")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+
+    parser = create_parser("query_unit")
+
+    assert parser.parse("SELECT * { ?s ?p ?o }").data == "query_unit"
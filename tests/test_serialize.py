@@ -0,0 +1,59 @@
+import io
+from pathlib import Path
+
+import pytest
+from lark import Tree
+from lark.exceptions import UnexpectedInput
+
+from sparql.parser import get_parser, parse
+from sparql.serializer import SparqlSerializer, serialize
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+def visit_topdown(tree: Tree) -> str:
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(tree)
+    return sparql_serializer.result
+
+
+@pytest.mark.parametrize("file", list(files_from_data_directory(data_dir)))
+def test_same_output_as_visit_topdown(file: str):
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+    try:
+        tree = parse(query)
+    except UnexpectedInput:
+        pytest.skip("Not parseable")
+
+    assert serialize(tree) == visit_topdown(tree)
+    # The tree of a dedicated parser starts at its unit.
+    assert serialize(tree.children[0]) == visit_topdown(tree)
+
+
+@pytest.mark.parametrize(
+    "query, start",
+    [("SELECT * { ?s ?p ?o }", "query_unit"), ("CLEAR ALL ; CLEAR ALL", "update_unit")],
+)
+def test_dedicated_parsers(query: str, start: str):
+    tree = get_parser(start).parse(query)
+
+    assert serialize(tree) == visit_topdown(tree)
+
+
+def test_stream():
+    tree = parse("SELECT * { ?s ?p ?o }")
+    stream = io.StringIO()
+
+    SparqlSerializer(stream).serialize(tree)
+
+    assert stream.getvalue() == visit_topdown(tree)
+
+
+def test_unexpected_tree():
+    tree = next(parse("SELECT * { ?s ?p ?o }").find_data("group_graph_pattern"))
+
+    with pytest.raises(ValueError, match="Unexpected tree type: group_graph_pattern"):
+        serialize(tree)
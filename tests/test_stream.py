@@ -0,0 +1,73 @@
+import io
+from pathlib import Path
+
+import pytest
+from lark.exceptions import UnexpectedInput
+
+from sparql.parser import parse
+from sparql.serializer import SparqlSerializer
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+class RecordingStream(io.StringIO):
+    """A text stream that records the size of each write."""
+
+    def __init__(self):
+        super().__init__()
+        self.writes = []
+
+    def write(self, text: str) -> int:
+        self.writes.append(len(text))
+        return super().write(text)
+
+
+def serialize(query: str) -> str:
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(parse(query))
+    return sparql_serializer.result
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+@pytest.mark.parametrize("buffer_size", [0, 64])
+def test_stream_output_is_identical(file: str, buffer_size: int):
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+    try:
+        tree = parse(query)
+    except UnexpectedInput:
+        pytest.skip("Not parseable")
+
+    stream = io.StringIO()
+    sparql_serializer = SparqlSerializer(stream, buffer_size)
+    sparql_serializer.visit_topdown(tree)
+
+    assert stream.getvalue() == serialize(query)
+
+
+def test_buffer_size():
+    query = "INSERT DATA { " + " . ".join(f"<s> <p> {i}" for i in range(1000)) + " }"
+
+    stream = RecordingStream()
+    SparqlSerializer(stream, buffer_size=1024).visit_topdown(parse(query))
+
+    assert stream.getvalue() == serialize(query)
+    assert len(stream.writes) > 1
+    # Each write is the buffer, which is flushed once it reaches buffer_size.
+    assert all(size < 1024 + 100 for size in stream.writes)
+
+
+def test_result_is_not_kept():
+    stream = io.StringIO()
+    sparql_serializer = SparqlSerializer(stream)
+    sparql_serializer.visit_topdown(parse("select * { ?s ?p ?o }"))
+
+    with pytest.raises(ValueError, match="stream"):
+        sparql_serializer.result
+
+
+def test_unexpected_buffer_size():
+    with pytest.raises(ValueError, match="Unexpected buffer_size"):
+        SparqlSerializer(io.StringIO(), buffer_size=-1)
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+import sparql
+from sparql.parser import get_parser, get_unified_parser, parse
+from sparql.serializer import SparqlSerializer
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("SELECT * { ?s ?p ?o }", "query_unit"),
+        ("PREFIX : <http://example.org/> ASK { ?s :p ?o }", "query_unit"),
+        ("LOAD <http://example.org/faraway> INTO GRAPH <localCopy>", "update_unit"),
+        ("PREFIX : <http://example.org/>", "update_unit"),
+        ("", "update_unit"),
+    ],
+)
+def test_unit_reports_match(query: str, expected: str):
+    tree = parse(query)
+    assert tree.data == "unit"
+    assert tree.children[0].data == expected
+
+
+def test_entry_points_share_parser():
+    assert get_parser("query_unit").parser is get_unified_parser()
+    assert get_parser("update_unit").parser is get_unified_parser()
+
+
+def test_unknown_start_rule():
+    with pytest.raises(ValueError):
+        get_parser("group_graph_pattern")
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_unit_serializes_like_entry_points(file: str):
+    if "/negative/" in file:
+        pytest.skip("Negative syntax test.")
+
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+
+    tree = parse(query)
+    start = tree.children[0].data
+
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(get_parser(start).parse(query))
+
+    assert sparql.format_string(query) == sparql_serializer.result
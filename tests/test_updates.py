@@ -0,0 +1,75 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import sparql
+from sparql import updates
+from sparql.updates import iter_updates
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+@pytest.mark.parametrize(
+    "request_string, expected",
+    [
+        ("", 1),
+        ("CLEAR ALL", 1),
+        ("CLEAR ALL ;", 2),
+        (
+            "PREFIX : <http://example.org/> INSERT DATA { :s :p :o ; :q 'a;b' } ; CLEAR ALL",
+            2,
+        ),
+        (
+            "DELETE { ?s ?p ?o } WHERE { ?s ?p ?o FILTER(?o < 1) } ; # a ; comment\n CLEAR ALL",
+            2,
+        ),
+        ('INSERT DATA { <a;b> <p> """;\n""" } ; LOAD <http://example.org/faraway>', 2),
+    ],
+)
+def test_operations(request_string: str, expected: int):
+    trees = list(iter_updates(request_string))
+
+    assert len(trees) == expected
+    assert all(tree.data == "update_unit" for tree in trees)
+    assert "; ".join(sparql.format_updates(request_string)) == sparql.format_string(
+        request_string
+    )
+
+
+@pytest.mark.parametrize(
+    "request_string", ["CLEAR ALL ; ; CLEAR ALL", "PREFIX : <http://example.org/> ;"]
+)
+def test_semicolon_without_operation(request_string: str):
+    with pytest.raises(ValueError):
+        list(iter_updates(request_string))
+
+
+def test_first_operation_before_end_of_stream(monkeypatch):
+    monkeypatch.setattr(updates, "CHUNK_SIZE", 16)
+    stream = io.StringIO("CLEAR ALL ;\n" + "CLEAR DEFAULT ;\n" * 1000 + "CLEAR ALL")
+
+    trees = iter_updates(stream)
+    next(trees)
+
+    assert stream.tell() < 64
+    assert len(list(trees)) == 1001
+
+
+@pytest.mark.parametrize("file", [*files_from_data_directory(data_dir)])
+def test_format_updates_matches_format_string(file: str, monkeypatch):
+    if not file.endswith(".ru") or "/negative/" in file:
+        pytest.skip("Not a SPARQL 1.1 Update request.")
+
+    with open(file, "r", encoding="utf-8") as f:
+        request_string = f.read()
+
+    expected = sparql.format_string(request_string)
+
+    assert "; ".join(sparql.format_updates(request_string)) == expected
+
+    monkeypatch.setattr(updates, "CHUNK_SIZE", 7)
+    with open(file, "r", encoding="utf-8") as f:
+        assert "; ".join(sparql.format_updates(f)) == expected
@@ -0,0 +1,183 @@
+from pathlib import Path
+
+import pytest
+from lark import Tree
+from lark.exceptions import UnexpectedInput
+
+import sparql
+from sparql.ast import DataBlockValues
+from sparql.parser import get_parser, parse
+from sparql.serializer import SparqlSerializer
+from sparql.values import parse_with_values
+from tests import files_from_data_directory
+
+current_dir = Path(__file__).parent
+data_dir = current_dir / "data"
+
+
+def serialize(tree: Tree) -> str:
+    sparql_serializer = SparqlSerializer()
+    sparql_serializer.visit_topdown(tree)
+    return sparql_serializer.result
+
+
+def data_block_values(tree: Tree) -> list[DataBlockValues]:
+    return [
+        child
+        for data_block in tree.find_data("data_block")
+        for child in data_block.children[0].children
+        if isinstance(child, DataBlockValues)
+    ]
+
+
+def files_with_values(directory: Path) -> list[str]:
+    # The other files are parsed as written.
+    return [
+        file
+        for file in files_from_data_directory(directory)
+        if "values" in Path(file).read_text(encoding="utf-8", errors="replace").lower()
+    ]
+
+
+@pytest.mark.parametrize("file", files_with_values(data_dir))
+def test_same_output_as_full_path(file: str):
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+    try:
+        expected = serialize(parse(query))
+    except UnexpectedInput:
+        pytest.skip("Not parseable")
+
+    assert serialize(parse_with_values(query)) == expected
+
+
+@pytest.mark.parametrize(
+    "file", list(files_from_data_directory(data_dir / "values_clause")), ids=str
+)
+def test_values_clauses_take_the_fast_path(file: str):
+    with open(file, "r", encoding="utf-8") as f:
+        query = f.read()
+
+    tree = parse_with_values(query)
+
+    assert data_block_values(tree)
+    assert serialize(tree) == serialize(parse(query))
+
+
+@pytest.mark.parametrize(
+    "query, rows",
+    [
+        (
+            "SELECT * { VALUES ?x { <a> :b c:d 1 -2.5 +1e3 .5 true UNDEF } }",
+            ("<a>", ":b", "c:d", "1", "-2.5", "+1e3", ".5", "true", "UNDEF"),
+        ),
+        (
+            """SELECT * {} values (?a $b) {
+                ("x"@en-GB 'y'^^xsd:string)
+                ( "x" @en '''long
+                string''' ^^ # A comment.
+                <dt> )
+                () ( ) (1) (1 2 3)
+            }""",
+            (
+                ('"x"@en-GB', "'y'^^xsd:string"),
+                ('"x"@en', "'''long\n                string'''^^<dt>"),
+                (),
+                (),
+                ("1",),
+                ("1", "2", "3"),
+            ),
+        ),
+        ("SELECT * {} VALUES () { () }", ((),)),
+        ("ASK { VALUES ?x { 12 } }", ("12",)),
+        ("SELECT * {} VALUES (?x ?y) { (12) }", (("12",),)),
+    ],
+)
+def test_rows(query: str, rows: tuple):
+    tree = parse_with_values(query)
+
+    assert data_block_values(tree) == [DataBlockValues(rows)]
+    assert serialize(tree) == serialize(parse(query))
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * { VALUES ?x { 1 2 } VALUES ?y { } } VALUES ?z { 3 4 }",
+        "SELECT * { { SELECT * {} VALUES (?a ?b) { (1 2) } } } VALUES (?c) { (3) }",
+        "PREFIX values: <x:> SELECT * { values:a ?p '''VALUES ?x { 1 }''' } VALUES ?x { 2 }",
+        "INSERT { ?a <b> ?c } WHERE { VALUES (?a ?c) { (1 2) (UNDEF 'x'@en) } }",
+    ],
+)
+def test_same_output_as_full_path_for_all_forms(query: str):
+    assert serialize(parse_with_values(query)) == serialize(parse(query))
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "SELECT * {} VALUES ?x { ?y }",
+        "SELECT * {} VALUES ?x { undef }",
+        "SELECT * {} VALUES ?x { _:b }",
+        "SELECT * {} VALUES ?x { (1) }",
+        "SELECT * {} VALUES (?x) { 1 }",
+        "SELECT * {} VALUES (?x) { (\r) }",
+        "SELECT * {} VALUES ?x { 1 ",
+    ],
+)
+def test_other_data_blocks_take_the_full_path(query: str):
+    with pytest.raises(UnexpectedInput):
+        parse(query)
+    with pytest.raises(UnexpectedInput):
+        parse_with_values(query)
+
+
+def test_values_keyword_in_comments_and_strings():
+    query = """SELECT * {
+        # VALUES ?x { 1 }
+        ?s <p#VALUES> "VALUES ?x { 1 }", '''
+        VALUES ?x { 1 }'''
+    }"""
+
+    tree = parse_with_values(query)
+
+    assert not data_block_values(tree)
+    assert tree == parse(query)
+
+
+def test_positions_are_kept():
+    rows = "\n".join(f"(<urn:x:{i}> {i})" for i in range(100))
+    query = f"SELECT * {{ }}\nVALUES (?x ?y) {{\n{rows} }} LIMIT"
+
+    with pytest.raises(UnexpectedInput) as full_error:
+        parse(query)
+    with pytest.raises(UnexpectedInput) as error:
+        parse_with_values(query)
+
+    assert (error.value.line, error.value.column) == (
+        full_error.value.line,
+        full_error.value.column,
+    )
+
+
+def test_entry_point():
+    query = "SELECT * { ?s ?p ?o } VALUES ?s { <a> <b> }"
+    query_parser = get_parser("query_unit")
+
+    tree = parse_with_values(query, query_parser.parse)
+
+    assert tree.data == "query_unit"
+    assert serialize(tree) == serialize(query_parser.parse(query))
+
+
+def test_large_values_block():
+    rows = " ".join(f'(<urn:x:{i}> "label {i}"@en {i})' for i in range(5000))
+    query = f"SELECT * {{ ?s ?p ?o }} VALUES (?s ?label ?n) {{ {rows} }}"
+    expected = serialize(parse(query))
+
+    values = data_block_values(parse_with_values(query))
+    assert len(values) == 1
+    assert len(values[0].rows) == 5000
+
+    assert sparql.format_string(query) == expected
+    assert sparql.format_string_explicit(query) == expected